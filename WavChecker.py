@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 import copy
+import concurrent.futures
+import functools
+import multiprocessing
+from array import array
 import os.path
 
 import xxhash
@@ -16,7 +20,13 @@ import math
 from pathlib import Path
 import traceback
 import datetime
-import wave_bwf_rf64
+
+import pcmreader
+import qtreader
+import mxfreader
+import framehash
+import frameanalyzer
+import pcmalign
 
 
 from PySide2.QtCore import QThread
@@ -29,7 +39,7 @@ from PySide2.QtCore import QDir
 from PySide2 import QtCore
 
 class WavChecker(QThread, QObject):
-    __version__ = "1.5.0"
+    __version__ = "1.6.0"
 
     MODE_INTERLEAVE = "InterLeave"
     MODE_2CH = "2ch(multi mono)"
@@ -123,6 +133,23 @@ class WavChecker(QThread, QObject):
     OPDICT_CINEXCHECK = "CINEXCHECK"  # cineXtools bug check
     # v130
     OPDICT_SELECTINDEX = "SELECTINDEX" # Interleave select channel
+    # v160
+    OPDICT_FFMPEGPIPE = "FFMPEGPIPE"  # ffmpeg writes raw pcm to stdout and hash it directly(no temp wav) True or False
+    OPDICT_NATIVEREADER = "NATIVEREADER"  # read pcm of QT/MXF directly without ffmpeg True or False
+    OPDICT_NATIVEBYTEORDER = "NATIVEBYTEORDER"  # big endian src and org are hashed without byteswap True or False
+    OPDICT_HASHWORKERS = "HASHWORKERS"  # number of channels hashed at once(1 = sequential)
+    OPDICT_HASHPOOL = "HASHPOOL"  # HASHPOOL_THREAD or HASHPOOL_PROCESS
+    OPDICT_HASHSHARDS = "HASHSHARDS"  # number of segments of one wav hashed at once(1 = not split)
+    OPDICT_TWOPHASE = "TWOPHASE"  # hash only total first, every frame is hashed only when total is not same. True or False
+    OPDICT_COARSEDIFF = "COARSEDIFF"  # TWOPHASE second pass hashes frames only in differ seconds. True or False
+    OPDICT_SLIPCHECK = "SLIPCHECK"  # align src and org when not same, report sample insert/drop. True or False
+    OPDICT_XCORR = "XCORR"  # cinex offset by FFT cross correlation when no bit exact resync. True or False
+    OPDICT_SILENCEDB = "SILENCEDB"  # MUON check near silence threshold dBFS(float), None is not checked
+    OPDICT_NULLDB = "NULLDB"  # MUON check channel pair(L+R) null residual threshold dBFS(float), None is not checked
+    OPDICT_CHANNELDIGESTS = "CHANNELDIGESTS"  # interleave wav is also hashed every channel for differ channel. True or False
+
+    HASHPOOL_THREAD = "thread"
+    HASHPOOL_PROCESS = "process"
 
 
     BASELIGHT_TAGS_AUDIO_HANDLER_NAME = 'Libquicktime Sound Media Handler'  # baselight output QT audio meta marker
@@ -214,6 +241,10 @@ class WavChecker(QThread, QObject):
                                                            "-i", None, "-acodec", "copy" ,"/tmp/testFC.wav",
                                                            "-i", None, "-acodec", "copy" ,"/tmp/testLFE.wav"]
 
+        # v160
+        # raw pcm to stdout(pipe mode). map,filter args are inserted at 7, "-t" at 6, "-ss" at 4(input) or 6(output)
+        self.ffmpeg_pipe_cmdlist = [WavChecker.FFMPEGPATH, "-v", "warning", "-nostats", "-i", None, "-vn",
+                                    "-acodec", None, "-f", None, "pipe:1"]
 
         self.mode = None  # QThread::Run() purpose
         self.opdict = {}
@@ -225,8 +256,9 @@ class WavChecker(QThread, QObject):
 
         self.aformat = ""  # source or org audio codec name = ex:pcm_s24le
 
-        self.checksumframes_org = [[] for _ in range(8)]  # checksum list entry max 8ch=2ch(LR) + 5.1ch
-        self.checksumframes_muon = []                     # V130 checksum list for muon check only
+        self.checksumframes_org = [array('Q') for _ in range(8)]  # checksum list entry max 8ch=2ch(LR) + 5.1ch
+        self.checksumframes_muon = array('Q')                     # V130 checksum list for muon check only
+        # v160 frame checksum is xxhash3 intdigest(uint64) array, not hexdigest str list.
 
         # ex:23.98fps 48khz -> 1frame =  48048sample per entry.
         # ex:24fps 48khz -> 1frame =  48000sample per entry.
@@ -248,6 +280,10 @@ class WavChecker(QThread, QObject):
         # v122
         self.cinexdiffbytes_tail = [[] for _ in range(8)]  # OPDICT_CINEXCHECK cinexbug diffbytes(bytearray) tail data
 
+        # v160 OPDICT_COARSEDIFF
+        self.hashresults = [None for _ in range(8)]  # framehash.FrameHashResult of two phase first pass(coarse digests)
+        self.descendruns = [None for _ in range(8)]  # coarse unit runs hashed every frame at second pass
+
     def reset(self):
 
         self.SRCPATHS.clear()
@@ -259,7 +295,7 @@ class WavChecker(QThread, QObject):
         self.checksums.clear()
         self.aformat = ""
         self.checksumframes_org.clear()
-        self.checksumframes_muon.clear() # V130
+        self.checksumframes_muon = array('Q') # V130
         self.lastframe.clear()
         self.lastprevframe.clear()
 
@@ -273,6 +309,10 @@ class WavChecker(QThread, QObject):
         # v122
         self.cinexdiffbytes_tail = [[] for _ in range(8)]
 
+        # v160
+        self.hashresults = [None for _ in range(8)]
+        self.descendruns = [None for _ in range(8)]
+
         WavChecker.PROGRESS_MAX_FFMPEG = 0
         WavChecker.PROGRESS_FFMPEG_SRC = 0
         WavChecker.PROGRESS_FFMPEG_ORG = 0
@@ -412,6 +452,57 @@ class WavChecker(QThread, QObject):
                 else:
                     orgffmpegworker = None
 
+                # v160 native reader / pipe mode
+                # wavworker reads QT pcm directly(or hashes ffmpeg stdout), no temp wav and no ffmpeg wait.
+                srcsource = None
+                orgsource = None
+
+                if srcffmpegworker:
+                    selectchannel = self.opdict.get(self.OPDICT_SELECTINDEX, 0)
+                    if self.opdict.get(self.OPDICT_SOURCEWAVFORCE16BIT):
+                        srcaformat = "pcm_s16le"
+                    else:
+                        srcaformat = self.aformat
+                    sources = None
+                    if self.usenative():
+                        sources = self.native_sources(self.SRCPATHS[0], [("SRC", selectchannel, None)], srcaformat)
+                    if not sources and self.usepipe():
+                        sources = self.pipe_sources(self.SRCPATHS[0],
+                                                    [("SRC", ["-map", "0:a:" + str(selectchannel)])],
+                                                    None, srcaformat, streamindex=selectchannel,
+                                                    inputargs=["-guess_layout_max", "0"])
+                    if sources:
+                        srcsource = sources[0]
+                        srcffmpegworker = None
+
+                if orgffmpegworker:
+                    sources = None
+                    if self.usenative():
+                        sources = self.native_sources(self.ORGPATHS[0], [("ORG", 0, None)], self.aformat, trim=False)
+                    if not sources and self.usepipe():
+                        sources = self.pipe_sources(self.ORGPATHS[0], [("ORG", ["-map", "0:a:0"])],
+                                                    None, self.aformat, trim=False,
+                                                    inputargs=["-guess_layout_max", "0"])
+                    if sources:
+                        orgsource = sources[0]
+                        orgffmpegworker = None
+
+                # v160 src and org are both big endian QT, compare pcm in file byte order(no byteswap).
+                # QT source may be wrapped by head skip/honben(TrimSource), the byte order is of the QT source.
+                srcchain = pcmreader.source_chain(srcsource)
+                orgchain = pcmreader.source_chain(orgsource)
+                if self.opdict.get(self.OPDICT_NATIVEBYTEORDER) and isinstance(srcchain[-1], qtreader.QtSource) \
+                        and isinstance(orgchain[-1], qtreader.QtSource) \
+                        and srcchain[-1].track.bigendian and orgchain[-1].track.bigendian:
+                    if any(isinstance(source, pcmreader.Force16BitSource) for source in srcchain + orgchain):
+                        # 16bit conversion reads little endian pcm
+                        self.__msgandlogging(str(self.MODE_INTERLEAVE) + ":big endian src/org, 16bit conversion, byteswap")
+                    else:
+                        srcchain[-1].littleendian = False
+                        orgchain[-1].littleendian = False
+                        self.__msgandlogging(str(self.MODE_INTERLEAVE) + ":big endian src/org, no byteswap:"
+                                             + str(srcsource) + " " + str(orgsource))
+
                 srcwavworker = WavChecker(self.mainwin, self.SRC_FILE)
                 srcwavworker.SRCPATH = self.SRCPATHS.copy()
                 srcwavworker.opdict = self.opdict.copy()
@@ -429,6 +520,10 @@ class WavChecker(QThread, QObject):
 
                 orgwavworker.orgpathindex = 0
 
+                # v160
+                if orgsource:
+                    orgwavworker.ORGPATHS[0] = orgsource
+
                 # maybe org is shorter than src.
                 if orgffmpegworker:
                     orgffmpegworker.start()
@@ -475,6 +570,9 @@ class WavChecker(QThread, QObject):
 
                 if srcffmpegworker:
                     srcwavworker.SRCPATHS[0] = srcffmpegworker.ffmpeg_single_interleave_cmdlist[-1]
+                # v160
+                elif srcsource:
+                    srcwavworker.SRCPATHS = [srcsource]
                 else:
                     srcwavworker.SRCPATHS[0] = self.SRCPATHS[0]
 
@@ -525,6 +623,12 @@ class WavChecker(QThread, QObject):
                         WavChecker.CHECKEDSTATUS = 0  # success
                         WavChecker.STATUSMESSAGE = "インタリーブチェックモード正常終了"
                     else:
+                        # v160 two phase check, every frame is hashed only when total is not same.
+                        if not self.__hashframes_again(self.MODE_INTERLEAVE, srcwavworker, orgwavworker):
+                            self.SIG_STOPTIMER.emit()
+                            WavChecker.ISRUNNING = False
+                            return
+
                         self.__msgandlogging(level=logging.ERROR,
                                              msg=str(self.MODE_INTERLEAVE) + "インタリーブチェックモードエラー終了")
                         WavChecker.STATUSMESSAGE = "インタリーブチェックモードエラー終了"
@@ -549,7 +653,8 @@ class WavChecker(QThread, QObject):
                                                                               srcwavworker.lastframe[0],
                                                                               orgwavworker.lastframe[0],
                                                                               srcwavworker.lastprevframe[0],
-                                                                              orgwavworker.lastprevframe[0])
+                                                                              orgwavworker.lastprevframe[0],
+                                                                              srcresult=srcwavworker.hashresults[0], orgresult=orgwavworker.hashresults[0])
 
                 else:
 
@@ -586,113 +691,34 @@ class WavChecker(QThread, QObject):
                     orgffmpegworker = None
 
                     # QT
-                    srcffmpegworker = WavChecker(self.mainwin, self.SRC_FILE)
-                    srcffmpegworker.SRCPATHS = self.SRCPATHS.copy()
-                    srcffmpegworker.opdict = self.opdict.copy()
-                    srcffmpegworker.mode = self.MODE_FFMPEG_51ch
-                    srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[4] = ""
-                    if srcffmpegworker.opdict.get(self.OPDICT_SOURCEWAVFORCE16BIT):
-
+                    if self.opdict.get(self.OPDICT_SOURCEWAVFORCE16BIT):
                         self.aformat = "pcm_s16le"
-                        srcffmpegworker.aformat = self.aformat
-                    else:
-                        srcffmpegworker.aformat = self.aformat
-
-                    srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[8] = self.aformat
-                    srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[16] = os.path.join(WavChecker.TEMPDIR, "FL.wav")
-                    srcwavpathlist.append(srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[16])
-
-                    srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[18] = self.aformat
-                    srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[21] = os.path.join(WavChecker.TEMPDIR, "FR.wav")
-                    srcwavpathlist.append(srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[21])
-
-                    srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[23] = self.aformat
-                    srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[26] = os.path.join(WavChecker.TEMPDIR, "FC.wav")
-                    srcwavpathlist.append(srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[26])
-
-                    srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[28] = self.aformat
-                    srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[31] = os.path.join(WavChecker.TEMPDIR, "LFE.wav")
-                    srcwavpathlist.append(srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[31])
-
-                    srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[33] = self.aformat
-                    srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[36] = os.path.join(WavChecker.TEMPDIR, "BL.wav")
-                    srcwavpathlist.append(srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[36])
-
-                    srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[38] = self.aformat
-                    srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[41] = os.path.join(WavChecker.TEMPDIR, "BR.wav")
-                    srcwavpathlist.append(srcffmpegworker.ffmpeg_51ch_multimono_cmdlist[41])
-
-                    # v140
-                    if not srcffmpegworker.opdict.get(self.OPDICT_VIDEOSRCORGSWAP):
-
-                        # V113
-                        # head skip
-                        if srcffmpegworker.opdict.get(self.OPDICT_VIDEOHEADSKIPSEC):
-                            # "-ss"
-                            head_sssec = srcffmpegworker.opdict.get(self.OPDICT_VIDEOHEADSKIPSEC)
-                            # time insert
-                            srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(14, str(head_sssec))
-                            srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(14, "-ss")
-                            insert_index_ss += 2
-
-                            srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(19 + insert_index_ss, str(head_sssec))
-                            srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(19 + insert_index_ss, "-ss")
-                            insert_index_ss += 2
-
-                            srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(24 + insert_index_ss, str(head_sssec))
-                            srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(24 + insert_index_ss, "-ss")
-                            insert_index_ss += 2
-
-                            srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(29 + insert_index_ss, str(head_sssec))
-                            srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(29 + insert_index_ss, "-ss")
-                            insert_index_ss += 2
 
-                            srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(34 + insert_index_ss, str(head_sssec))
-                            srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(34 + insert_index_ss, "-ss")
-                            insert_index_ss += 2
-
-                            srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(39 + insert_index_ss, str(head_sssec))
-                            srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(39 + insert_index_ss, "-ss")
-                            insert_index_ss += 2
-
-                        # honben
-                        if srcffmpegworker.opdict.get(self.OPDICT_VIDEOHONBENSEC):
-                            toffset = 0
-
-                            if insert_index_ss == 0:
-                                toffset = 2 # without ss option
-                            else:
-                                toffset = 4 # with ss option
-
-                                # "-t"
-                                tail_sssec = srcffmpegworker.opdict.get(self.OPDICT_VIDEOHONBENSEC)
-
-                                srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(14, str(tail_sssec))
-                                srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(14, "-t")
-                                insert_index_t += toffset
-
-                                srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(insert_index_t + 19, str(tail_sssec))
-                                srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(insert_index_t + 19, "-t")
-                                insert_index_t += toffset
-
-                                srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(insert_index_t + 24, str(tail_sssec))
-                                srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(insert_index_t + 24, "-t")
-                                insert_index_t += toffset
-
-                                srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(insert_index_t + 29, str(tail_sssec))
-                                srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(insert_index_t + 29, "-t")
-                                insert_index_t += toffset
-
-                                srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(insert_index_t + 34, str(tail_sssec))
-                                srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(insert_index_t + 34, "-t")
-                                insert_index_t += toffset
+                    # v160 one interleave temp wav(no channelsplit),
+                    # srcwavworker de-interleaves every channel from the same read of it.
+                    # channel order of interleave is FL FR FC LFE BL BR only in 5.1 layout,
+                    # other layouts(5.1(side), unknown...) are split by channel name(channelsplit).
+                    # -ss/-t are output options and honben is used only with head skip, same as 5.1ch multimono.
+                    srcinterleave = self.channel_layout(self.SRCPATHS[0]) == "5.1"
+                    if srcinterleave:
+                        srcffmpegworker = self.interleave_ffmpegworker(
+                            self.SRCPATHS[0], self.aformat, QFileInfo(self.SRCPATHS[0]).fileName() + "_SRC.wav",
+                            trim=not self.opdict.get(self.OPDICT_VIDEOSRCORGSWAP), outputseek=True, honbenalone=False)
+                        srcwavpathlist = self.channel_sources(srcffmpegworker.ffmpeg_single_interleave_cmdlist[-1],
+                                                              ["FL", "FR", "FC", "LFE", "BL", "BR"])
+                    else:
+                        self.__msgandlogging("src channel layout is not 5.1, channelsplit by ffmpeg.")
+                        srcffmpegworker, srcwavpathlist = self.channelsplit_ffmpegworker(
+                            ["FL", "FR", "FC", "LFE", "BL", "BR"],
+                            trim=not self.opdict.get(self.OPDICT_VIDEOSRCORGSWAP), honbenalone=False)
 
-                                srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(insert_index_t + 39, str(tail_sssec))
-                                srcffmpegworker.ffmpeg_51ch_multimono_cmdlist.insert(insert_index_t + 39, "-t")
-                                insert_index_t += toffset
+                    # v160 src org swap, org wav is read only in head skip/honben range(no -acodec copy temp wav)
+                    # cinex preprocess needs wav path.
+                    if self.opdict.get(self.OPDICT_VIDEOSRCORGSWAP) and not self.opdict.get(self.OPDICT_CINEXCHECK):
+                        orgwavpathlist = self.swap_org_sources(self.ORGPATHS, honbenalone=False) or []
 
                     # v140 src org swap
-                    else:
+                    if self.opdict.get(self.OPDICT_VIDEOSRCORGSWAP) and not orgwavpathlist:
                         # swap src head and honben sec to org wav
                         orgffmpegworker = WavChecker(self.mainwin, self.ORG_FILE)
                         orgffmpegworker.ORGPATHS = self.ORGPATHS.copy()
@@ -790,6 +816,24 @@ class WavChecker(QThread, QObject):
                 else:
                     # wav. 5.1ch wav(single) to 6ch mono? ffmpeg?
                     srcffmpegworker = None
+                    srcinterleave = False
+
+                # v160 native reader / pipe mode. interleave is read from QT track(or one ffmpeg stdout)
+                # and every channel is de-interleaved from the same read.
+                sources = None
+                if srcinterleave and self.usenative():
+                    sources = self.native_sources(self.SRCPATHS[0], [("51ch", 0, None)], self.aformat,
+                                                  trim=not self.opdict.get(self.OPDICT_VIDEOSRCORGSWAP),
+                                                  honbenalone=False)
+                if srcinterleave and not sources and self.usepipe():
+                    sources = self.pipe_sources(self.SRCPATHS[0], [("51ch", ["-map", "0:a:0"])], None, self.aformat,
+                                                trim=not self.opdict.get(self.OPDICT_VIDEOSRCORGSWAP),
+                                                outputseek=True, honbenalone=False)
+                if sources:
+                    srcwavpathlist = self.channel_sources(sources[0], ["FL", "FR", "FC", "LFE", "BL", "BR"])
+                    srcffmpegworker = None
+                    # no extraction phase
+                    WavChecker.PROGRESS_FFMPEG_SRC = self.opdict[self.OPDICT_SRCWAVFILESIZE]
 
                 WavChecker.PROGRESS_MAX_FFMPEG += self.opdict[self.OPDICT_SRCWAVFILESIZE]
 
@@ -805,7 +849,7 @@ class WavChecker(QThread, QObject):
                 orgwavworker.opdict = self.opdict.copy()
 
                 # v140
-                if orgffmpegworker:
+                if orgwavpathlist:
                     orgwavworker.ORGPATHS = orgwavpathlist.copy()
                     orgwavworker.checksums[self.ORG_FILE] = orgwavpathlist.copy()
                 else:
@@ -862,6 +906,10 @@ class WavChecker(QThread, QObject):
                     srcwavworker.SRCPATHS.append(srcwavpathlist[3])
                     srcwavworker.SRCPATHS.append(srcwavpathlist[4])
                     srcwavworker.SRCPATHS.append(srcwavpathlist[5])
+                # v160
+                elif srcwavpathlist:
+                    # pipe check
+                    srcwavworker.SRCPATHS = srcwavpathlist.copy()
                 else:
                     # wav direct check
                     srcwavworker.SRCPATHS[0] = self.SRCPATH
@@ -900,6 +948,12 @@ class WavChecker(QThread, QObject):
                         WavChecker.CHECKEDSTATUS = 0  # success
                         WavChecker.STATUSMESSAGE = "5.1chチェックモード正常終了"
                     else:
+                        # v160 two phase check, every frame is hashed only when total is not same.
+                        if not self.__hashframes_again(self.MODE_51CH, srcwavworker, orgwavworker):
+                            self.SIG_STOPTIMER.emit()
+                            WavChecker.ISRUNNING = False
+                            return
+
 
                         self.work_wavbytelen = srcwavworker.work_wavbytelen
                         self.work_nchannels = srcwavworker.work_nchannels
@@ -928,7 +982,8 @@ class WavChecker(QThread, QObject):
                                                                       srcwavworker.lastframe[0],
                                                                       orgwavworker.lastframe[0],
                                                                       srcwavworker.lastprevframe[0],
-                                                                      orgwavworker.lastprevframe[0])
+                                                                      orgwavworker.lastprevframe[0],
+                                                                      srcresult=srcwavworker.hashresults[0], orgresult=orgwavworker.hashresults[0])
 
                                 # override total error level
                                 if curr_retcode > WavChecker.CHECKEDSTATUS:
@@ -947,7 +1002,8 @@ class WavChecker(QThread, QObject):
                                                                       srcwavworker.lastframe[1],
                                                                       orgwavworker.lastframe[1],
                                                                       srcwavworker.lastprevframe[1],
-                                                                      orgwavworker.lastprevframe[1])
+                                                                      orgwavworker.lastprevframe[1],
+                                                                      srcresult=srcwavworker.hashresults[1], orgresult=orgwavworker.hashresults[1])
 
                                 # override total error level
                                 if curr_retcode > WavChecker.CHECKEDSTATUS:
@@ -966,7 +1022,8 @@ class WavChecker(QThread, QObject):
                                                                       srcwavworker.lastframe[2],
                                                                       orgwavworker.lastframe[2],
                                                                       srcwavworker.lastprevframe[2],
-                                                                      orgwavworker.lastprevframe[2])
+                                                                      orgwavworker.lastprevframe[2],
+                                                                      srcresult=srcwavworker.hashresults[2], orgresult=orgwavworker.hashresults[2])
 
                                 # override total error level
                                 if curr_retcode > WavChecker.CHECKEDSTATUS:
@@ -985,7 +1042,8 @@ class WavChecker(QThread, QObject):
                                                                       srcwavworker.lastframe[3],
                                                                       orgwavworker.lastframe[3],
                                                                       srcwavworker.lastprevframe[3],
-                                                                      orgwavworker.lastprevframe[3])
+                                                                      orgwavworker.lastprevframe[3],
+                                                                      srcresult=srcwavworker.hashresults[3], orgresult=orgwavworker.hashresults[3])
 
                                 # override total error level
                                 if curr_retcode > WavChecker.CHECKEDSTATUS:
@@ -1004,7 +1062,8 @@ class WavChecker(QThread, QObject):
                                                                       srcwavworker.lastframe[4],
                                                                       orgwavworker.lastframe[4],
                                                                       srcwavworker.lastprevframe[4],
-                                                                      orgwavworker.lastprevframe[4])
+                                                                      orgwavworker.lastprevframe[4],
+                                                                      srcresult=srcwavworker.hashresults[4], orgresult=orgwavworker.hashresults[4])
 
                                 # override total error level
                                 if curr_retcode > WavChecker.CHECKEDSTATUS:
@@ -1023,7 +1082,8 @@ class WavChecker(QThread, QObject):
                                                                       srcwavworker.lastframe[5],
                                                                       orgwavworker.lastframe[5],
                                                                       srcwavworker.lastprevframe[5],
-                                                                      orgwavworker.lastprevframe[5])
+                                                                      orgwavworker.lastprevframe[5],
+                                                                      srcresult=srcwavworker.hashresults[5], orgresult=orgwavworker.hashresults[5])
                                 # override total error level
                                 if curr_retcode > WavChecker.CHECKEDSTATUS:
                                     WavChecker.CHECKEDSTATUS = curr_retcode
@@ -1211,6 +1271,26 @@ class WavChecker(QThread, QObject):
                     WavChecker.ISRUNNING = False
                     return
 
+                # v160 native reader / pipe mode. each mono audio track is read from QT(or ffmpeg stdout).
+                srcsources = None
+                chnames = ["L", "R", "FL", "FR", "FC", "LFE", "BL", "BR"][:len(self.ORGPATHS)]
+                if self.usenative():
+                    srcsources = self.native_sources(self.SRCPATHS[0],
+                                                     [(chname, index, None)
+                                                      for index, chname in enumerate(chnames)],
+                                                     self.aformat, honbenalone=False)
+                if not srcsources and self.usepipe():
+                    # probe the last mapped stream(all mono tracks must exist)
+                    srcsources = self.pipe_sources(self.SRCPATHS[0],
+                                                   [(chname, ["-map", "0:a:" + str(index)])
+                                                    for index, chname in enumerate(chnames)],
+                                                   1, self.aformat, streamindex=len(chnames) - 1,
+                                                   outputseek=True, honbenalone=False)
+                if srcsources:
+                    srcffmpegworker = None
+                    # no extraction phase
+                    WavChecker.PROGRESS_FFMPEG_SRC = self.opdict[self.OPDICT_SRCWAVFILESIZE]
+
                 srcwavworker = WavChecker(self.mainwin, self.SRC_FILE)
                 srcwavworker.SRCPATHS = self.SRCPATHS.copy()
                 srcwavworker.opdict = self.opdict.copy()
@@ -1262,7 +1342,10 @@ class WavChecker(QThread, QObject):
                 # temporary wav check
                 srcwavworker.SRCPATHS.clear()
 
-                if len(self.ORGPATHS) == 2:
+                # v160
+                if srcsources:
+                    srcwavworker.SRCPATHS.extend(srcsources)
+                elif len(self.ORGPATHS) == 2:
                     # 2ch
                     srcwavworker.SRCPATHS.append(srcffmpegworker.ffmpeg_8ch_multimono_cmdlist_2ch[14])
                     srcwavworker.SRCPATHS.append(srcffmpegworker.ffmpeg_8ch_multimono_cmdlist_2ch[19])
@@ -1354,6 +1437,12 @@ class WavChecker(QThread, QObject):
                         WavChecker.CHECKEDSTATUS = 0  # success
                         WavChecker.STATUSMESSAGE = "OAチェックモード正常終了"
                     else:
+                        # v160 two phase check, every frame is hashed only when total is not same.
+                        if not self.__hashframes_again(self.MODE_8CH_OA, srcwavworker, orgwavworker):
+                            self.SIG_STOPTIMER.emit()
+                            WavChecker.ISRUNNING = False
+                            return
+
 
                         self.work_wavbytelen = srcwavworker.work_wavbytelen
                         self.work_nchannels = srcwavworker.work_nchannels
@@ -1391,7 +1480,8 @@ class WavChecker(QThread, QObject):
                                                                       orgwavworker.lastframe[0],
                                                                       srcwavworker.lastprevframe[0],
                                                                       orgwavworker.lastprevframe[0],
-                                                                      0)
+                                                                      0,
+                                                                      srcresult=srcwavworker.hashresults[0], orgresult=orgwavworker.hashresults[0])
 
                                 # override total error level
                                 if curr_retcode > WavChecker.CHECKEDSTATUS:
@@ -1411,7 +1501,8 @@ class WavChecker(QThread, QObject):
                                                                       orgwavworker.lastframe[1],
                                                                       srcwavworker.lastprevframe[1],
                                                                       orgwavworker.lastprevframe[1],
-                                                                      1)
+                                                                      1,
+                                                                      srcresult=srcwavworker.hashresults[1], orgresult=orgwavworker.hashresults[1])
 
                                 # override total error level
                                 if curr_retcode > WavChecker.CHECKEDSTATUS:
@@ -1433,7 +1524,8 @@ class WavChecker(QThread, QObject):
                                                                           orgwavworker.lastframe[2],
                                                                           srcwavworker.lastprevframe[2],
                                                                           orgwavworker.lastprevframe[2],
-                                                                          2)
+                                                                          2,
+                                                                          srcresult=srcwavworker.hashresults[2], orgresult=orgwavworker.hashresults[2])
 
                                     # override total error level
                                     if curr_retcode > WavChecker.CHECKEDSTATUS:
@@ -1453,7 +1545,8 @@ class WavChecker(QThread, QObject):
                                                                           orgwavworker.lastframe[3],
                                                                           srcwavworker.lastprevframe[3],
                                                                           orgwavworker.lastprevframe[3],
-                                                                          3)
+                                                                          3,
+                                                                          srcresult=srcwavworker.hashresults[3], orgresult=orgwavworker.hashresults[3])
 
                                     # override total error level
                                     if curr_retcode > WavChecker.CHECKEDSTATUS:
@@ -1473,7 +1566,8 @@ class WavChecker(QThread, QObject):
                                                                           orgwavworker.lastframe[4],
                                                                           srcwavworker.lastprevframe[4],
                                                                           orgwavworker.lastprevframe[4],
-                                                                          4)
+                                                                          4,
+                                                                          srcresult=srcwavworker.hashresults[4], orgresult=orgwavworker.hashresults[4])
 
                                     # override total error level
                                     if curr_retcode > WavChecker.CHECKEDSTATUS:
@@ -1493,7 +1587,8 @@ class WavChecker(QThread, QObject):
                                                                           orgwavworker.lastframe[5],
                                                                           srcwavworker.lastprevframe[5],
                                                                           orgwavworker.lastprevframe[5],
-                                                                          5)
+                                                                          5,
+                                                                          srcresult=srcwavworker.hashresults[5], orgresult=orgwavworker.hashresults[5])
 
                                     # override total error level
                                     if curr_retcode > WavChecker.CHECKEDSTATUS:
@@ -1513,7 +1608,8 @@ class WavChecker(QThread, QObject):
                                                                           orgwavworker.lastframe[6],
                                                                           srcwavworker.lastprevframe[6],
                                                                           orgwavworker.lastprevframe[6],
-                                                                          6)
+                                                                          6,
+                                                                          srcresult=srcwavworker.hashresults[6], orgresult=orgwavworker.hashresults[6])
 
                                     # override total error level
                                     if curr_retcode > WavChecker.CHECKEDSTATUS:
@@ -1533,7 +1629,8 @@ class WavChecker(QThread, QObject):
                                                                           orgwavworker.lastframe[7],
                                                                           srcwavworker.lastprevframe[7],
                                                                           orgwavworker.lastprevframe[7],
-                                                                          7)
+                                                                          7,
+                                                                          srcresult=srcwavworker.hashresults[7], orgresult=orgwavworker.hashresults[7])
                                     # override total error level
                                     if curr_retcode > WavChecker.CHECKEDSTATUS:
                                         WavChecker.CHECKEDSTATUS = curr_retcode
@@ -1574,52 +1671,32 @@ class WavChecker(QThread, QObject):
 
                 if (QFileInfo(self.SRCPATHS[0]).suffix() == "mov" or QFileInfo(self.SRCPATHS[0]).suffix() == "mxf"):
                     # QT
-                    srcffmpegworker = WavChecker(self.mainwin, self.SRC_FILE)
-                    srcffmpegworker.SRCPATHS = self.SRCPATHS.copy()
-                    srcffmpegworker.opdict = self.opdict.copy()
-                    srcffmpegworker.mode = self.MODE_FFMPEG_2ch
-                    srcffmpegworker.ffmpeg_2ch_multimono_cmdlist[4] = ""
-
-                    if srcffmpegworker.opdict.get(self.OPDICT_SOURCEWAVFORCE16BIT):
+                    if self.opdict.get(self.OPDICT_SOURCEWAVFORCE16BIT):
                         self.aformat = "pcm_s16le"
-                        srcffmpegworker.aformat = self.aformat
+
+                    # v160 one interleave temp wav(no channelsplit),
+                    # srcwavworker de-interleaves L/R from the same read of it.
+                    # other than stereo layout is split by channel name(channelsplit).
+                    # -ss/-t are output options, same as 2ch multimono.
+                    srcinterleave = self.channel_layout(self.SRCPATHS[0]) == "stereo"
+                    if srcinterleave:
+                        srcffmpegworker = self.interleave_ffmpegworker(
+                            self.SRCPATHS[0], self.aformat, QFileInfo(self.SRCPATHS[0]).fileName() + "_SRC.wav",
+                            trim=not self.opdict.get(self.OPDICT_VIDEOSRCORGSWAP), outputseek=True)
+                        srcwavpathlist = self.channel_sources(srcffmpegworker.ffmpeg_single_interleave_cmdlist[-1],
+                                                              ["FL", "FR"])
                     else:
-                        srcffmpegworker.aformat = self.aformat
-                    srcffmpegworker.ffmpeg_2ch_multimono_cmdlist[8] = self.aformat
-                    srcffmpegworker.ffmpeg_2ch_multimono_cmdlist[16] = os.path.join(WavChecker.TEMPDIR, "FL.wav")
-                    # V140
-                    srcwavpathlist.append(srcffmpegworker.ffmpeg_2ch_multimono_cmdlist[16])
-                    srcffmpegworker.ffmpeg_2ch_multimono_cmdlist[18] = self.aformat
-                    srcffmpegworker.ffmpeg_2ch_multimono_cmdlist[21] = os.path.join(WavChecker.TEMPDIR, "FR.wav")
-                    srcwavpathlist.append(srcffmpegworker.ffmpeg_2ch_multimono_cmdlist[21])
-
-                    # v140
-                    if not srcffmpegworker.opdict.get(self.OPDICT_VIDEOSRCORGSWAP):
-                        # V113
-                        # head skip
-                        if srcffmpegworker.opdict.get(self.OPDICT_VIDEOHEADSKIPSEC):
-                            # "-ss"
-                            head_sssec = srcffmpegworker.opdict.get(self.OPDICT_VIDEOHEADSKIPSEC)
-                            # time insert
-                            srcffmpegworker.ffmpeg_2ch_multimono_cmdlist.insert(14, str(head_sssec))
-                            srcffmpegworker.ffmpeg_2ch_multimono_cmdlist.insert(14, "-ss")
-                            insert_index += 2
-                            srcffmpegworker.ffmpeg_2ch_multimono_cmdlist.insert(19 + insert_index, str(head_sssec))
-                            srcffmpegworker.ffmpeg_2ch_multimono_cmdlist.insert(19 + insert_index, "-ss")
+                        self.__msgandlogging("src channel layout is not stereo, channelsplit by ffmpeg.")
+                        srcffmpegworker, srcwavpathlist = self.channelsplit_ffmpegworker(
+                            ["FL", "FR"], trim=not self.opdict.get(self.OPDICT_VIDEOSRCORGSWAP))
 
-                        # honben
-                        if srcffmpegworker.opdict.get(self.OPDICT_VIDEOHONBENSEC):
+                    # v160 src org swap, org wav is read only in head skip/honben range(no -acodec copy temp wav)
+                    # cinex preprocess needs wav path.
+                    if self.opdict.get(self.OPDICT_VIDEOSRCORGSWAP) and not self.opdict.get(self.OPDICT_CINEXCHECK):
+                        orgwavpathlist = self.swap_org_sources(self.ORGPATHS) or []
 
-                            # "-t"
-                            tail_sssec = srcffmpegworker.opdict.get(self.OPDICT_VIDEOHONBENSEC)
-                            # time insert
-                            srcffmpegworker.ffmpeg_2ch_multimono_cmdlist.insert(14, str(tail_sssec))
-                            srcffmpegworker.ffmpeg_2ch_multimono_cmdlist.insert(14, "-t")
-                            insert_index += 2
-                            srcffmpegworker.ffmpeg_2ch_multimono_cmdlist.insert(insert_index + 19, str(tail_sssec))
-                            srcffmpegworker.ffmpeg_2ch_multimono_cmdlist.insert(insert_index + 19, "-t")
                     # v140 src org swap
-                    else:
+                    if self.opdict.get(self.OPDICT_VIDEOSRCORGSWAP) and not orgwavpathlist:
                         # swap src head and honben sec to org wav
                         orgffmpegworker = WavChecker(self.mainwin, self.ORG_FILE)
                         orgffmpegworker.ORGPATHS = self.ORGPATHS.copy()
@@ -1673,7 +1750,24 @@ class WavChecker(QThread, QObject):
 
                 else:
                     # Internal error:
-                    pass
+                    srcffmpegworker = None
+                    srcinterleave = False
+
+                # v160 native reader / pipe mode. interleave is read from QT track(or one ffmpeg stdout)
+                # and L/R are de-interleaved from the same read.
+                sources = None
+                if srcinterleave and self.usenative():
+                    sources = self.native_sources(self.SRCPATHS[0], [("2ch", 0, None)], self.aformat,
+                                                  trim=not self.opdict.get(self.OPDICT_VIDEOSRCORGSWAP))
+                if srcinterleave and not sources and self.usepipe():
+                    sources = self.pipe_sources(self.SRCPATHS[0], [("2ch", ["-map", "0:a:0"])], None, self.aformat,
+                                                trim=not self.opdict.get(self.OPDICT_VIDEOSRCORGSWAP),
+                                                outputseek=True)
+                if sources:
+                    srcwavpathlist = self.channel_sources(sources[0], ["FL", "FR"])
+                    srcffmpegworker = None
+                    # no extraction phase
+                    WavChecker.PROGRESS_FFMPEG_SRC = self.opdict[self.OPDICT_SRCWAVFILESIZE]
 
                 srcwavworker = WavChecker(self.mainwin, self.SRC_FILE)
                 srcwavworker.SRCPATHS = self.SRCPATHS.copy()
@@ -1688,7 +1782,7 @@ class WavChecker(QThread, QObject):
                 orgwavworker.checksums[self.ORG_FILE] = orgwavworker.ORGPATHS
 
                 # v140
-                if orgffmpegworker:
+                if orgwavpathlist:
                     orgwavworker.ORGPATHS = orgwavpathlist.copy()
                     orgwavworker.checksums[self.ORG_FILE] = orgwavpathlist.copy()
                 else:
@@ -1738,7 +1832,8 @@ class WavChecker(QThread, QObject):
 
                 # check normal exit?
 
-                if srcffmpegworker:
+                # v160 srcwavpathlist is pipe sources in pipe mode
+                if srcffmpegworker or srcwavpathlist:
                     # temporary wav check
                     srcwavworker.SRCPATHS = srcwavpathlist
                 else:
@@ -1773,6 +1868,12 @@ class WavChecker(QThread, QObject):
                         WavChecker.CHECKEDSTATUS = 0  # success
                         WavChecker.STATUSMESSAGE = "2ch(multi mono)チェックモード正常終了"
                     else:
+                        # v160 two phase check, every frame is hashed only when total is not same.
+                        if not self.__hashframes_again(self.MODE_2CH, srcwavworker, orgwavworker):
+                            self.SIG_STOPTIMER.emit()
+                            WavChecker.ISRUNNING = False
+                            return
+
 
                         self.work_wavbytelen = srcwavworker.work_wavbytelen
                         self.work_nchannels = srcwavworker.work_nchannels
@@ -1796,7 +1897,8 @@ class WavChecker(QThread, QObject):
                                                                       srcwavworker.lastframe[0],
                                                                       orgwavworker.lastframe[0],
                                                                       srcwavworker.lastprevframe[0],
-                                                                      orgwavworker.lastprevframe[0])
+                                                                      orgwavworker.lastprevframe[0],
+                                                                      srcresult=srcwavworker.hashresults[0], orgresult=orgwavworker.hashresults[0])
 
                                 if curr_retcode > WavChecker.CHECKEDSTATUS:
                                     WavChecker.CHECKEDSTATUS = curr_retcode
@@ -1813,7 +1915,8 @@ class WavChecker(QThread, QObject):
                                                                       srcwavworker.lastframe[1],
                                                                       orgwavworker.lastframe[1],
                                                                       srcwavworker.lastprevframe[1],
-                                                                      orgwavworker.lastprevframe[1])
+                                                                      orgwavworker.lastprevframe[1],
+                                                                      srcresult=srcwavworker.hashresults[1], orgresult=orgwavworker.hashresults[1])
 
                                 if curr_retcode > WavChecker.CHECKEDSTATUS:
                                     WavChecker.CHECKEDSTATUS = curr_retcode
@@ -1896,6 +1999,22 @@ class WavChecker(QThread, QObject):
 
                 WavChecker.PROGRESS_MAX_FFMPEG += self.opdict[self.OPDICT_SRCWAVFILESIZE]
 
+                # v160 native reader / pipe mode, 2 mono streams are read directly(QT track or ffmpeg stdout)
+                # and interleaved by wavworker(pcmreader.InterleaveSource), no join and no temp wav.
+                srcsource = None
+                sources = None
+                if self.usenative():
+                    sources = self.native_sources(self.SRCPATHS[0], [("L", 0, None), ("R", 1, None)], self.aformat)
+                    if sources and any(pcmreader.source_chain(source)[-1].track.nchannels != 1
+                                       for source in sources):
+                        self.__msgandlogging("native reader:audio track is not mono, join is done by ffmpeg.")
+                        sources = None
+                if not sources and self.usepipe():
+                    sources = self.pipe_sources(self.SRCPATHS[0], [("L", ["-map", "0:a:0"]), ("R", ["-map", "0:a:1"])],
+                                                1, self.aformat, streamindex=1, outputseek=True)
+                if sources:
+                    srcsource = pcmreader.InterleaveSource(sources, QFileInfo(self.SRCPATHS[0]).fileName() + "_SRC")
+
                 srcwavworker = WavChecker(self.mainwin, self.SRC_FILE)
                 srcwavworker.SRCPATH = self.SRCPATHS.copy()
                 srcwavworker.opdict = self.opdict.copy()
@@ -1915,9 +2034,10 @@ class WavChecker(QThread, QObject):
 
                 # maybe org is shorter than src.
 
-                srcffmpegworker.start()
-                WavChecker.STATUSMESSAGE = "srcffmpegworker started."
-                self.__msgandlogging(str(self.MODE_MULTIMONO_INTERLEAVE_DANIEL) + ":srcffmpegworker start() command")
+                if not srcsource:
+                    srcffmpegworker.start()
+                    WavChecker.STATUSMESSAGE = "srcffmpegworker started."
+                    self.__msgandlogging(str(self.MODE_MULTIMONO_INTERLEAVE_DANIEL) + ":srcffmpegworker start() command")
 
                 if WavChecker.REQ_CANCEL:
                     self.__msgandlogging(level=logging.ERROR,
@@ -1935,10 +2055,11 @@ class WavChecker(QThread, QObject):
 
                 self.__msgandlogging(str(self.MODE_MULTIMONO_INTERLEAVE_DANIEL) + ":orgwavworker start()")
 
-                self.__msgandlogging(str(self.MODE_MULTIMONO_INTERLEAVE_DANIEL) + ":srcffmpegworker wait() start.")
-                WavChecker.STATUSMESSAGE = "srcffmpegworker process waiting."
-                srcffmpegworker.wait()
-                self.__msgandlogging(str(self.MODE_MULTIMONO_INTERLEAVE_DANIEL) + ":srcffmpegworker wait() done.")
+                if not srcsource:
+                    self.__msgandlogging(str(self.MODE_MULTIMONO_INTERLEAVE_DANIEL) + ":srcffmpegworker wait() start.")
+                    WavChecker.STATUSMESSAGE = "srcffmpegworker process waiting."
+                    srcffmpegworker.wait()
+                    self.__msgandlogging(str(self.MODE_MULTIMONO_INTERLEAVE_DANIEL) + ":srcffmpegworker wait() done.")
 
                 if WavChecker.REQ_CANCEL:
                     self.__msgandlogging(level=logging.ERROR,
@@ -1980,8 +2101,11 @@ class WavChecker(QThread, QObject):
 
                 # src wavworker wav check path settings
 
-                srcwavworker.SRCPATHS.clear()
-                srcwavworker.SRCPATHS.append(srcffmpegworker.ffmpeg_8ch_multimono_cmdlist_interleave2ch[-1])
+                if srcsource:
+                    srcwavworker.SRCPATHS = [srcsource]
+                else:
+                    srcwavworker.SRCPATHS.clear()
+                    srcwavworker.SRCPATHS.append(srcffmpegworker.ffmpeg_8ch_multimono_cmdlist_interleave2ch[-1])
 
                 # force end ffmpeg progress bar.
                 WavChecker.PROGRESS_FFMPEG_ORG = self.opdict.get(WavChecker.OPDICT_ORGWAVFILESIZE, 0)
@@ -2021,6 +2145,12 @@ class WavChecker(QThread, QObject):
                         WavChecker.CHECKEDSTATUS = 0  # success
                         WavChecker.STATUSMESSAGE = "マルチモノ＜ー＞インタリーブチェック 正常終了"
                     else:
+                        # v160 two phase check, every frame is hashed only when total is not same.
+                        if not self.__hashframes_again(self.MODE_MULTIMONO_INTERLEAVE_DANIEL, srcwavworker, orgwavworker):
+                            self.SIG_STOPTIMER.emit()
+                            WavChecker.ISRUNNING = False
+                            return
+
                         self.__msgandlogging(level=logging.ERROR, msg=str(
                             self.MODE_MULTIMONO_INTERLEAVE_DANIEL) + "マルチモノ＜ー＞インタリーブチェックエラー終了")
                         WavChecker.STATUSMESSAGE = "マルチモノ＜ー＞インタリーブチェック エラー終了"
@@ -2054,7 +2184,8 @@ class WavChecker(QThread, QObject):
                                                                   srcwavworker.lastframe[0],
                                                                   orgwavworker.lastframe[0],
                                                                   srcwavworker.lastprevframe[0],
-                                                                  orgwavworker.lastprevframe[0])
+                                                                  orgwavworker.lastprevframe[0],
+                                                                  srcresult=srcwavworker.hashresults[0], orgresult=orgwavworker.hashresults[0])
 
                 else:
 
@@ -2142,9 +2273,12 @@ class WavChecker(QThread, QObject):
                                                                           srcwavworker.checksumframes_org[0],
                                                                           srcwavworker.checksumframes_muon,
                                                                           srcwavworker.lastframe[0],
-                                                                          srcwavworker.checksumframes_muon[-1],
+                                                                          bytes(len(srcwavworker.lastframe[0])),
                                                                           srcwavworker.lastprevframe[0],
-                                                                          srcwavworker.checksumframes_muon[-2])
+                                                                          bytes(len(srcwavworker.lastprevframe[0])))
+
+                    # v160 near silence and phase inversion(null residual) check
+                    self.__check_levels(srcwavworker, len(self.SRCPATHS))
 
                 else:
                     self.__msgandlogging(level=logging.ERROR, msg=str(
@@ -2160,10 +2294,17 @@ class WavChecker(QThread, QObject):
 
             elif self.mode == self.MODE_WAVHASHING_SRC or self.mode == self.MODE_WAVHASHING_ORG:
 
+                # v160
+                totalonly = bool(self.opdict.get(WavChecker.OPDICT_TWOPHASE))
+                paths = self.SRCPATHS if self.name == self.SRC_FILE else self.ORGPATHS
+                analyzers = ()
+                if self.opdict.get(WavChecker.OPDICT_CHANNELDIGESTS) and len(paths) == 1:
+                    # interleave, differ channel from the same read
+                    analyzers = (frameanalyzer.ChannelDigestAnalyzer.name,)
                 if self.name == self.SRC_FILE:
-                    self.proc_wavhash4(self.SRCPATHS)
+                    self.proc_wavhash4(self.SRCPATHS, totalonly, analyzers)
                 elif self.name == self.ORG_FILE:
-                    self.proc_wavhash4(self.ORGPATHS)
+                    self.proc_wavhash4(self.ORGPATHS, totalonly, analyzers)
                 else:
                     self.__msgandlogging(level=logging.ERROR, msg=str(self.mode) + ":" + "Internal error:")
             # V130
@@ -2172,7 +2313,9 @@ class WavChecker(QThread, QObject):
                 WavChecker.PROGRESS_MAX_ORGWAV = 100
                 WavChecker.PROGRESS_ORGWAV = 100
 
-                self.proc_wavhash4(self.SRCPATHS)
+                # v160 silence map is made in the same read as frame hash
+                self.proc_wavhash4(self.SRCPATHS, analyzers=(frameanalyzer.PeakAnalyzer.name,
+                                                             frameanalyzer.NullAnalyzer.name))
                 self.proc_wavhash_muon(self.checksumframes_org[0],self.SRCPATHS)
 
             elif self.mode == self.MODE_FFMPEG_INTERLEAVE:
@@ -2218,7 +2361,8 @@ class WavChecker(QThread, QObject):
 
         try:
             # v140
-            srcwf = wave_bwf_rf64.open(srcwavpath, mode='rb')
+            # v160 memory mapped reader
+            srcwf = pcmreader.open_pcm(srcwavpath)
         except Exception as e:
             self.__msgandlogging(level=logging.ERROR, msg=srcwavpath + ":srcwav open error, detail:" + str(e))
             WavChecker.REQ_CANCEL = True
@@ -2226,7 +2370,8 @@ class WavChecker(QThread, QObject):
 
         try:
             # v140
-            orgwf = wave_bwf_rf64.open(orgwavpath, mode='rb')
+            # v160 memory mapped reader
+            orgwf = pcmreader.open_pcm(orgwavpath)
         except Exception as e:
             self.__msgandlogging(level=logging.ERROR, msg=orgwavpath + ":orgwav open error, detail:" + str(e))
             WavChecker.REQ_CANCEL = True
@@ -2236,7 +2381,6 @@ class WavChecker(QThread, QObject):
         diff_bytesarray_head = bytearray() # src head data
         diff_bytesarray_tail = bytearray() # org last data
 
-        firstdiffer = True
         srcwksecbytes = None
         orgwksecbytes = None
 
@@ -2290,74 +2434,81 @@ class WavChecker(QThread, QObject):
         self.__msgandlogging("preprocess center check time = {0}".format(elapsed_time))
 
         # V111
+        # v160 first differ sample is located in differ block by numpy compare(no 1sample stepping)
+        framesize = srcwf.getnchannels() * srcwf.getsampwidth()
         oneblock = srcwf.getframerate() * 3 # zakkuri 1MiB kurai = 48000(khz) * 24bit(3byte) * 2(LR) = 281.5*3 = 900KiB
         self.__msgandlogging("preprocess large block chcecking started length = {0}".format(oneblock))
-        while True:
+        diffpos = None
+        while diffpos is None:
 
             if WavChecker.REQ_CANCEL:
                 return
 
+            blockstart = srcindex
             src1sample = srcwf.readframes(oneblock)
-            srcindex += int(len(src1sample) / (srcwf.getnchannels() * srcwf.getsampwidth()))
+            org1sample = orgwf.readframes(oneblock)
+            srcindex += int(len(src1sample) / framesize)
 
             WavChecker.STATUSMESSAGE = "cinex ズレ検出を実行中 {0}sample/{1}sample ".format(srcindex,srcwf.getnframes())
 
-            if firstdiffer:
-                org1sample = orgwf.readframes(oneblock)
-                # orgindex += oneblock
-                orgindex += int(len(org1sample) / (orgwf.getnchannels() * orgwf.getsampwidth()))
-
-            if src1sample == org1sample and firstdiffer:
+            if src1sample == org1sample:
                 if not src1sample and not org1sample:
                     self.__msgandlogging(level=logging.ERROR,
                                          msg="入力されたSourceとOriginalの音は同一のデータです。Sourceがcinexで処理されたデータかどうか確認してください。")
                     return
                 continue
 
-            else:  # diff detected
-
-                if firstdiffer:
-                    # SAWA differ length is 5sec (=min wav length is 10sec upper ...)
-                    if oneblock != 1:
-                        srcwf.setpos(srcwf.tell() - oneblock) # 1block rewind
-                        orgwf.setpos(orgwf.tell() - oneblock) # 1block rewind
-                        srcindex -= oneblock
-                        orgindex -= oneblock
-                        oneblock = 1
-                        self.__msgandlogging("preprocess 1sample checking started..")
-                        continue
-
-                    orgwksecbytes = org1sample + orgwf.readframes(orgwf.getframerate() * 10 - 1)
-                    firstdiffer = False
-                    orgwksec_xxhash64.update(orgwksecbytes)
-                    orgwksec_digest = orgwksec_xxhash64.hexdigest()
-                    self.__msgandlogging("orgwksec_digest = {0} orgpos = {1}".format(orgwksec_digest, orgindex))
+            diffpos = blockstart + pcmalign.first_difference(src1sample, org1sample, framesize)
 
-                else:
-                    curpos = srcwf.tell()
-                    # differ length is 10sec (for WOWOW onair)
-                    srcwksecbytes = src1sample + srcwf.readframes(srcwf.getframerate() * 10 - 1)
-                    srcwf.setpos(curpos)
+        orgindex = diffpos + 1
+        self.__msgandlogging("preprocess first differ sample = {0}".format(diffpos))
 
-                    srcwksec_xxhash64.update(srcwksecbytes)
-                    srcwksec_digest = srcwksec_xxhash64.hexdigest()
+        # v160 rolling hash resync
+        # src position of org 10sec(from first differ sample) is searched in one pass,
+        # same result as 1sample stepping(xxhash of src 10sec every sample).
+        WavChecker.STATUSMESSAGE = "cinex ズレ検出を実行中 {0}sample/{1}sample ".format(diffpos,srcwf.getnframes())
+        diffsamplenum = pcmalign.find_resync(srcwf, orgwf, diffpos, orgwf.getframerate() * 10,
+                                             cancelled=lambda: WavChecker.REQ_CANCEL)
+        if WavChecker.REQ_CANCEL:
+            return
 
-                    if srcwksec_digest == orgwksec_digest:
+        # v160 not bit exact around insert(gain change etc.), offset by cross correlation
+        if diffsamplenum is None and self.opdict.get(WavChecker.OPDICT_XCORR):
+            WavChecker.STATUSMESSAGE = "cinex ズレ検出を実行中(相互相関)"
+            offset, confidence, windows = pcmalign.xcorr_offset(srcwf, orgwf, cancelled=lambda: WavChecker.REQ_CANCEL)
+            if WavChecker.REQ_CANCEL:
+                return
+            for orgpos, lag, coef in windows:
+                self.__msgandlogging("xcorr window orgpos = {0} offset = {1} correlation = {2:.4f}".format(orgpos, lag, coef))
+
+            if offset is not None and offset > 0:
+                self.__msgandlogging(level=logging.WARN,
+                                     msg="ビット一致する位置がないため、相互相関でズレを検出しました。ズレサンプル数={0} 信頼度={1:.2f}".format(
+                                         offset, confidence))
+                diffsamplenum = offset
+            elif offset is not None:
+                self.__msgandlogging(level=logging.ERROR,
+                                     msg="相互相関の結果、SourceはOriginalより{0}サンプル欠落しているため、cinexズレとして補正できません。信頼度={1:.2f}".format(
+                                         -offset, confidence))
+                return None
 
-                        self.__msgandlogging("src1sec and org1sec matched! srcsamplepos = {0} orgsamplepos = {1} diff_samplenum = {2}".format(
-                            srcindex,orgindex,srcindex - orgindex))
-                        break
-                    else:
-                        srcwksec_xxhash64.reset()
+        if diffsamplenum is None:
+            self.__msgandlogging(level=logging.ERROR,
+                                 msg="cinexズレ検出に失敗しました。Originalの{0}サンプル目以降と一致する位置がSourceにありません。".format(diffpos))
+            return None
 
-                diff_bytesarray_head.extend(src1sample)
+        srcindex = diffpos + diffsamplenum + 1
+        self.__msgandlogging("src1sec and org1sec matched! srcsamplepos = {0} orgsamplepos = {1} diff_samplenum = {2}".format(
+            srcindex,orgindex,srcindex - orgindex))
 
+        srcwf.setpos(diffpos)
+        diff_bytesarray_head.extend(srcwf.readframes(diffsamplenum))
 
         # v122 org tail sample save.
         # org last sample located
         diffsamplenum = int(len(diff_bytesarray_head) / (orgwf.getnchannels() * orgwf.getsampwidth()))
         orgwf.setpos(orgwf.getnframes() - diffsamplenum)
-        diff_bytesarray_tail = orgwf.readframes(diffsamplenum)
+        diff_bytesarray_tail = bytes(orgwf.readframes(diffsamplenum))
 
         current_time = datetime.datetime.now()
         elapsed_time = current_time - start_time
@@ -2366,85 +2517,340 @@ class WavChecker(QThread, QObject):
 
         return (diff_bytesarray_head,orgindex,diff_bytesarray_tail)
 
-    def proc_wavhash4(self, paths):
+    # v160
+    def __hashframes_again(self, modestr, srcwavworker, orgwavworker):
 
-        self.__msgandlogging(":proc_wavhash4 start()")
+        # two phase check second pass.
+        # first pass(OPDICT_TWOPHASE) hashed only total, hash every frame of src and org for error position.
+        # return False if canceled or failed.
+        if not self.opdict.get(WavChecker.OPDICT_TWOPHASE):
+            return True
 
-        i = 0  # channel index
+        self.__msgandlogging(level=logging.INFO,
+                             msg=str(modestr) + ":全体ハッシュが一致しないため、フレーム単位のハッシュを計算します")
+        WavChecker.STATUSMESSAGE = "frame hashing"
 
-        for path in paths:
+        WavChecker.PROGRESS_SRCWAV = 0
+        WavChecker.PROGRESS_ORGWAV = 0
 
-            progress = 0  # progress(byte)
-            j = 0  # frame index
+        # v160 coarse diff, frames are hashed only in differ coarse units(and last units) of each path
+        if self.opdict.get(WavChecker.OPDICT_COARSEDIFF):
+            for i in range(len(srcwavworker.hashresults)):
+                srcresult = srcwavworker.hashresults[i]
+                orgresult = orgwavworker.hashresults[i]
+                if srcresult is None or orgresult is None or srcresult.coarseframes != orgresult.coarseframes:
+                    continue
+                srcwavworker.descendruns[i] = framehash.descend_runs(srcresult.coarse, orgresult.coarse)
+                orgwavworker.descendruns[i] = framehash.descend_runs(orgresult.coarse, srcresult.coarse)
+                self.__msgandlogging("ch{0}:coarse diff src={1}/{2} org={3}/{4} units".format(
+                    i, sum(end - start for start, end in srcwavworker.descendruns[i]), len(srcresult.coarse),
+                    sum(end - start for start, end in orgwavworker.descendruns[i]), len(orgresult.coarse)))
+
+        for worker in (orgwavworker, srcwavworker):
+            worker.opdict[WavChecker.OPDICT_TWOPHASE] = False
+            worker.start()
+
+        orgwavworker.wait()
+        srcwavworker.wait()
+
+        if WavChecker.REQ_CANCEL:
+            self.__msgandlogging(level=logging.ERROR,
+                                 msg=str(modestr) + "src or org wavチェックをキャンセルしました.")
+            return False
 
+        if not orgwavworker.checksums or not srcwavworker.checksums:
+            self.__msgandlogging(level=logging.ERROR, msg=str(modestr) + ":フレーム単位のハッシュ計算に失敗しました")
+            WavChecker.CHECKEDSTATUS = 2  # failed
+            return False
+
+        self.__msgandlogging(str(modestr) + ":" + pprint.pformat(orgwavworker.checksums))
+        self.__msgandlogging(str(modestr) + ":" + pprint.pformat(srcwavworker.checksums))
+
+        return True
+
+    def proc_wavhash4(self, paths, totalonly=False, analyzers=()):
+
+        self.__msgandlogging(":proc_wavhash4 start() totalonly={0}".format(totalonly))
+
+        # v160 source wav is converted to 16bit while reading(same pcm as ffmpeg pcm_s16le), no ffmpeg re-encode.
+        # ffmpeg and native reader outputs are already 16bit.
+        if self.name == self.SRC_FILE and self.opdict.get(self.OPDICT_SOURCEWAVFORCE16BIT):
+            paths = [pcmreader.Force16BitSource(path) if isinstance(path, str) else path for path in paths]
+
+        # v160 per path(channel) hash runs in worker pool if OPDICT_HASHWORKERS > 1
+        workers = self.opdict.get(self.OPDICT_HASHWORKERS) or 1
+        pooltype = self.opdict.get(self.OPDICT_HASHPOOL) or self.HASHPOOL_THREAD
+        # v160 one path is also split to OPDICT_HASHSHARDS segments of frame boundary
+        # (coarse unit boundary of totalonly, two phase check first pass).
+        shards = self.opdict.get(self.OPDICT_HASHSHARDS) or 1
+        # v160 coarse diff second pass, only differ coarse units(about 1 second) are hashed every frame.
+        descend = not totalonly and any(runs is not None for runs in self.descendruns)
+        if descend and shards > 1:
+            # differ units are already segments, total is of first pass
+            self.__msgandlogging("hash shards are not used for coarse diff(differ units are hashed).")
+            shards = 1
+        if shards > 1:
+            # SRC and ORG total must be same kind whether path was split or not(pipe).
+            self.__msgandlogging("hash shards={0}, total is xxh3 of {1} digests.".format(
+                shards, "coarse unit" if totalonly else "frame"))
+        fps = self.opdict[self.OPDICT_FPS]
+        cinexcheck = bool(self.opdict.get(WavChecker.OPDICT_CINEXCHECK))
+
+        # v160 channels of one interleave(pcmreader.ChannelSource) are hashed from one read of it(split),
+        # path group = path indices hashed by the same tasks. cinex corrected channel is hashed alone.
+        groups = []
+        groupofsource = {}
+        for i in range(len(paths)):
+            if isinstance(paths[i], pcmreader.ChannelSource) and not self.cinexdiffbytes_head[i] \
+                    and not self.cinexdiffbytes_tail[i] and not self.cinexdiffpos_head[i]:
+                if paths[i].source in groupofsource:
+                    groups[groupofsource[paths[i].source]].append(i)
+                    continue
+                groupofsource[paths[i].source] = len(groups)
+            groups.append([i])
+        # hashed path of group, interleave of split group
+        grouppaths = [paths[group[0]].source if len(group) > 1 else paths[group[0]] for group in groups]
+
+        # hash task = (group index, segment or None(whole path))
+        tasks = []
+        grouptasks = []
+        groupframeindices = [None] * len(groups)
+        progressmax_fixed = None
+        for g, group in enumerate(groups):
+            i = group[0]
+            segments = None
+            groupruns = [self.descendruns[j] for j in group]
+            if descend and None not in groupruns:
+                # frames of every channel of group are hashed by the same read
+                groupruns = framehash.merge_runs([run for runs in groupruns for run in runs])
+                hashresult = self.hashresults[i]
+                framesize = hashresult.sampwidth * hashresult.nchannels * len(group)
+                if pcmreader.is_pipe(grouppaths[g]):
+                    # pipe can't seek, it is hashed whole and not differ frames are cleared after.
+                    progressmax_fixed = (progressmax_fixed or 0) + hashresult.progressmax * len(group)
+                else:
+                    segments = []
+                    groupframeindices[g] = []
+                    for start, end in groupruns:
+                        segstart = hashresult.startpos + start * hashresult.coarsesamples
+                        if end < len(hashresult.coarse):
+                            count = (end - start) * hashresult.coarsesamples
+                            segbytes = count * framesize
+                        else:
+                            count = None  # to end
+                            segbytes = (hashresult.endpos - segstart) * framesize
+                        segments.append((segstart, count))
+                        groupframeindices[g].append(start * hashresult.coarseframes)
+                        progressmax_fixed = (progressmax_fixed or 0) + segbytes
+                self.__msgandlogging(str(grouppaths[g]) + ":coarse diff units={0}".format(groupruns))
+            if shards > 1 and workers > 1:
+                try:
+                    segments = framehash.plan_segments(grouppaths[g], fps, shards, len(self.cinexdiffbytes_head[i]),
+                                                       totalonly)
+                except Exception as e:
+                    # open error is reported by hash task
+                    self.__msgandlogging(str(grouppaths[g]) + ":segment plan error, detail:" + str(e))
+            if segments:
+                self.__msgandlogging(str(grouppaths[g]) + ":hash segments={0}".format(segments))
+            if len(group) > 1:
+                self.__msgandlogging(str(grouppaths[g]) + ":{0}ch from one read".format(len(group)))
+            grouptasks.append([])
+            for segment in segments or [None]:
+                grouptasks[g].append(len(tasks))
+                tasks.append((g, segment))
+
+        workers = min(workers, len(tasks))
+
+        if self.name == self.SRC_FILE:
+            progress_base = WavChecker.PROGRESS_SRCWAV
+        else:  # ORG_FILE
+            progress_base = WavChecker.PROGRESS_ORGWAV
+
+        # progress(byte) of each task, progress bar is base + sum of them.
+        taskprogress = [0] * len(tasks)
+        chprogress_per = [0] * len(groups)
+        chprogress_10_str = [10] * len(groups)
+
+        def hashargs(k):
+            g, segment = tasks[k]
+            i = groups[g][0]
+            return (grouppaths[g], fps, cinexcheck, len(self.cinexdiffbytes_head[i]),
+                    bytes(self.cinexdiffbytes_tail[i]), self.cinexdiffpos_head[i], segment, totalonly,
+                    tuple(analyzers))
+
+        def hashsplit(k):
+            return len(groups[tasks[k][0]]) > 1
+
+        def hashprogress(k, result, readbytes):
+            g = tasks[k][0]
+            if readbytes == 0 and result.progress == 0:
+                # opened
+                if progressmax_fixed is not None:
+                    pass
+                elif self.name == self.SRC_FILE:
+                    WavChecker.PROGRESS_MAX_SRCWAV = result.progressmax * len(paths) // len(groups[g])
+                else:  # ORG_FILE
+                    WavChecker.PROGRESS_MAX_ORGWAV = result.progressmax * len(paths) // len(groups[g])
+                chprogress_per[g] = (result.progressmax / 100) * 10
+                return
+
+            taskprogress[k] = result.progress
+            if self.name == self.SRC_FILE:
+                WavChecker.PROGRESS_SRCWAV = progress_base + sum(taskprogress)
+            else:  # ORG_FILE
+                WavChecker.PROGRESS_ORGWAV = progress_base + sum(taskprogress)
+
+            # Get a progress log in 10% increments.
+            progress = sum(taskprogress[t] for t in grouptasks[g])
+            while progress > chprogress_per[g] * chprogress_10_str[g] / 10 and chprogress_10_str[g] <= 100:
+                if workers > 1:
+                    self.__msgandlogging(level=logging.INFO, msg=":ch{0} {1}%".format(g, str(chprogress_10_str[g])))
+                else:
+                    self.__msgandlogging(level=logging.INFO, msg=":{0}%".format(str(chprogress_10_str[g])))
+                chprogress_10_str[g] += 10
+
+        def hashcancelled():
+            return WavChecker.REQ_CANCEL
+
+        if progressmax_fixed is not None:
+            if self.name == self.SRC_FILE:
+                WavChecker.PROGRESS_MAX_SRCWAV = progressmax_fixed
+            else:  # ORG_FILE
+                WavChecker.PROGRESS_MAX_ORGWAV = progressmax_fixed
+
+        taskresults = [None] * len(tasks)
+
+        if workers > 1 and pooltype == self.HASHPOOL_PROCESS:
+            # no progress callback over process, progress is updated when each task is done.
+            self.__msgandlogging("hash process pool workers={0}".format(workers))
+            # running tasks stop at next block when cancelevent is set
+            cancelevent = multiprocessing.Event()
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers,
+                                                              initializer=framehash.init_process,
+                                                              initargs=(cancelevent,))
             try:
-                # v140
-                wf = wave_bwf_rf64.open(path)
-            except Exception as e:
-                # it's almost non-standard wav reading...
-                self.__msgandlogging(level=logging.ERROR, msg=path + ":wav open error, detail:" + str(e))
+                futures = {executor.submit(framehash.hash_source_process, *hashargs(k), split=hashsplit(k)): k
+                           for k in range(len(tasks))}
+                pending = set(futures)
+                while pending:
+                    done, pending = concurrent.futures.wait(pending, timeout=0.5)
+                    for future in done:
+                        k = futures[future]
+                        taskresults[k] = future.result()
+                        if taskresults[k].error is None:
+                            hashprogress(k, taskresults[k], 0)
+                            hashprogress(k, taskresults[k], taskresults[k].progress)
+                    if WavChecker.REQ_CANCEL:
+                        cancelevent.set()
+                        break
+            finally:
+                # canceled: don't wait running tasks, pending tasks are not started
+                executor.shutdown(wait=not cancelevent.is_set(), cancel_futures=True)
+
+        elif workers > 1:
+            # xxhash releases GIL while hashing, mmap read is also outside GIL.
+            self.__msgandlogging("hash thread pool workers={0}".format(workers))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(framehash.hash_source, *hashargs(k), split=hashsplit(k),
+                                           progress=functools.partial(hashprogress, k), cancelled=hashcancelled)
+                           for k in range(len(tasks))]
+                for k, future in enumerate(futures):
+                    taskresults[k] = future.result()
 
-                self.checksums.clear()
-                return (self.checksums)
+        else:
+            for k in range(len(tasks)):
+                taskresults[k] = framehash.hash_source(*hashargs(k), split=hashsplit(k),
+                                                       progress=functools.partial(hashprogress, k),
+                                                       cancelled=hashcancelled)
+                if taskresults[k].error is not None or WavChecker.REQ_CANCEL:
+                    break
 
-            self.__msgandlogging(path + ":" + pprint.pformat(wf.getparams()))
+        if WavChecker.REQ_CANCEL:
+            # canceled tasks return partial results(stopped at a block), nothing is stitched or saved.
+            self.__msgandlogging(level=logging.WARN, msg=":proc_wavhash4 canceled")
+            return (self.checksums)
 
-            progress_max_total = wf.getnframes() * wf.getsampwidth() * wf.getnchannels()
+        results = [None] * len(paths)
+        for g, group in enumerate(groups):
+            groupresults = [taskresults[k] for k in grouptasks[g]]
+            if None in groupresults:
+                # canceled
+                break
+            for i in group:
+                if len(group) > 1:
+                    # channel of split result(open error is result itself)
+                    pathresults = [result.channels[paths[i].channel] if result.error is None else result
+                                   for result in groupresults]
+                else:
+                    pathresults = groupresults
+                if groupframeindices[g] is not None:
+                    results[i] = framehash.stitch_results(pathresults, cinexcheck, self.cinexdiffpos_head[i],
+                                                          groupframeindices[g], self.hashresults[i].framecount)
+                elif len(pathresults) == 1:
+                    results[i] = pathresults[0]
+                else:
+                    results[i] = framehash.stitch_results(pathresults, cinexcheck, self.cinexdiffpos_head[i])
+                if results[i].error is None:
+                    results[i].path = paths[i]
+                if descend and self.descendruns[i] is not None and results[i].error is None:
+                    if groupframeindices[g] is None or len(group) > 1:
+                        # runs of other channels of group are also hashed
+                        results[i].digests = framehash.keep_runs(results[i].digests, self.descendruns[i],
+                                                                 self.hashresults[i].coarseframes)
+                    # total of first pass(same stream digest as org/src first pass)
+                    results[i].total = self.hashresults[i].total
+                if shards > 1 and results[i].error is None:
+                    # SRC and ORG total must be same kind whether path was split or not(pipe).
+                    results[i].total = framehash.digests_total(results[i].coarse if totalonly else results[i].digests)
+
+        # results are applied in path order, same as sequential hashing.
+        for i, result in enumerate(results):
+
+            if result is None:
+                # canceled
+                break
 
-            self.work_wavbytelen = wf.getsampwidth()
-            self.work_nchannels = wf.getnchannels()
-            self.work_samplerate = wf.getframerate()
+            path = result.path
 
-            self.__msgandlogging("wf.chunksize(header data LL)={0}byte　progress_max_total={1}byte".format(
-                wf.getchunksize(), progress_max_total))
+            if result.error is not None:
+                # it's almost non-standard wav reading...
+                self.__msgandlogging(level=logging.ERROR, msg=str(path) + ":wav open error, detail:" + str(result.error))
 
-            ma_fps = float(self.opdict[self.OPDICT_FPS])
-            duration = self.opdict[self.OPDICT_MAXDURATION]
-            samplerate = wf.getframerate()
+                self.checksums.clear()
+                return (self.checksums)
 
-            if samplerate == 44100:
-                ma_fps = 30  # force 30 = 44100/30 = 1470(sample)
+            self.__msgandlogging(str(path) + ":" + pprint.pformat(result.params))
 
-            elif self.opdict[self.OPDICT_FPS] == "23.98" or self.opdict[self.OPDICT_FPS] == "29.97":
+            self.work_wavbytelen = result.sampwidth
+            self.work_nchannels = result.nchannels
+            self.work_samplerate = result.samplerate
 
-                # syakuchou
-                if self.opdict[self.OPDICT_FPS] == "23.98":
-                    ma_fps = 24  # syakuchou
-                else:
-                    # 29.97 only
-                    ma_fps = 30  # syakuchou
-            else:
-                pass
+            self.__msgandlogging("wf.chunksize(header data LL)={0}byte　progress_max_total={1}byte".format(
+                result.chunksize, result.progressmax))
 
-            oneframe_sz = int(samplerate / ma_fps)
+            samplerate = result.samplerate
+            oneframe_sz = result.oneframe_sz
+            cadence = result.cadence
 
             if samplerate == 44100:
-                self.__msgandlogging("1frame_sz = {0} as {1}fps(44100hz fix no tc mode)".format(oneframe_sz, ma_fps))
+                self.__msgandlogging("1frame_sz = {0} as {1}fps(44100hz fix no tc mode)".format(oneframe_sz, 30))
 
             elif self.opdict[self.OPDICT_FPS] == "23.98":
 
-                self.__msgandlogging("1frame_sz = {0} as {1}fps".format(oneframe_sz + int(oneframe_sz / 1000),
-                                                                        self.opdict[self.OPDICT_FPS]))
-            elif self.opdict[self.OPDICT_FPS] == "29.97":
+                self.__msgandlogging("1frame_sz = {0} as {1}fps".format(cadence[0], self.opdict[self.OPDICT_FPS]))
 
-                # protools sample cycle list
-                # 48khz               96khz
-                # 1frame = 2(sample), 3(sample)
-                # 2frame = 1        , 3
-                # 3frame = 2        , 4
-                # 4frame = 1        , 3
-                # 5frame = 2        , 3
+            elif self.opdict[self.OPDICT_FPS] == "29.97":
 
                 if samplerate == 48000:
                     self.__msgandlogging(
-                        "1frame_sz protools sample pattern = {0}/{1}/{0}/{1}/{0} as {2}fps".format(oneframe_sz + 2,
-                                                                                                   oneframe_sz + 1,
+                        "1frame_sz protools sample pattern = {0}/{1}/{0}/{1}/{0} as {2}fps".format(cadence[0],
+                                                                                                   cadence[1],
                                                                                                    self.opdict[
                                                                                                        self.OPDICT_FPS]))
                 elif samplerate == 96000:
                     self.__msgandlogging(
-                        "1frame_sz protools sample pattern = {0}/{0}/{1}/{0}/{0} as {2}fps".format(oneframe_sz + 3,
-                                                                                                   oneframe_sz + 4,
+                        "1frame_sz protools sample pattern = {0}/{0}/{1}/{0}/{0} as {2}fps".format(cadence[0],
+                                                                                                   cadence[2],
                                                                                                    self.opdict[
                                                                                                        self.OPDICT_FPS]))
                 else:
@@ -2454,183 +2860,67 @@ class WavChecker(QThread, QObject):
                 # 24,30,high framerate etc...???
                 self.__msgandlogging("1frame_sz = {0} as {1}fps".format(oneframe_sz, self.opdict[self.OPDICT_FPS]))
 
-            time_start = time.perf_counter()
-
-            xxhash64_total = xxhash.xxh3_64()
-            xxhash64_total.reset()
-
-            xxhash64_1frame = xxhash.xxh3_64()
-            xxhash64_1frame.reset()
-
-            if self.name == self.SRC_FILE:
-                WavChecker.PROGRESS_MAX_SRCWAV = progress_max_total * len(paths)
-            else:  # ORG_FILE
-                WavChecker.PROGRESS_MAX_ORGWAV = progress_max_total * len(paths)
-
-            progress_max = progress_max_total
-
-            progress_10per = ((progress_max / 100) * 10)
-            progress_10_str = 10
-            progress_per = progress_10per
-
-            oneframe_sz_byte = oneframe_sz * wf.getsampwidth() * wf.getnchannels()
-
-            oneframe_varsz = 0  # for 23.98 29.97 pattern
-            fiveframe_count = 0  # for 29.97 pattern
-
-            if self.opdict[self.OPDICT_FPS] == "23.98":
-                # 23.98s is oneframe_sz + 1000/1 sample
-                oneframe_varsz = int(oneframe_sz / 1000)  # 48000 -> 2(2002), 96000 -> 4(4004)
-
-            elif self.opdict[self.OPDICT_FPS] == "29.97":
-
-                # 29.97
-                if samplerate == 48000:
-                    oneframe_varsz = 2  # 48khz first frame 21212 in first 2
-                elif samplerate == 96000:
-                    oneframe_varsz = 3  # 96khz first frame 33433 in first 3
-                else:
-                    oneframe_varsz = 0  # undefined.
-            else:
-                # no needs adjust
-                pass
-
-            # generate empty list
-            self.checksumframes_org[i] = []
-
-            oneblock = None
-            cinexdiffbytes_wk = copy.deepcopy(self.cinexdiffbytes_head[i])
-            prev_pos = 0
-            while True:
+            self.__msgandlogging("block size = {0}sample({1}frames)".format(result.blocksamples, result.blockframes))
 
+            if result.shortframe is not None:
                 # v110
-                if cinexdiffbytes_wk:
-                    # v122 for cinex bug head skip src diff wav.
-                    diff_frames = int(len(cinexdiffbytes_wk) / (wf.getsampwidth() * wf.getnchannels()))
-                    # src skip
-                    # cinex diff yomisute
-                    wf.readframes(diff_frames)
-                    # mark yomisute ato ichi
-                    prev_pos = wf.tell()
-                    oneblock = wf.readframes(oneframe_sz + oneframe_varsz)
-                    # print("src skip frames = {0}".format(prev_pos))
-                    cinexdiffbytes_wk = None
-                else:
-                    prev_pos = wf.tell()
-                    oneblock = wf.readframes(oneframe_sz + oneframe_varsz)
-
-                progress += len(oneblock)
-
-                if self.opdict[self.OPDICT_FPS] == "29.97":
-                    # 29.97 sample pattern for Protools algorithm
-                    # protools sample cycle list
-                    # 48khz               96khz
-                    # 1frame = 2(sample), 3(sample)
-                    # 2frame = 1        , 3
-                    # 3frame = 2        , 4
-                    # 4frame = 1        , 3
-                    # 5frame = 2        , 3
-
-                    if samplerate == 48000:
-                        if fiveframe_count % 2 == 0:
-                            oneframe_varsz = 1  # current 1602,next 1601
-                        else:
-                            oneframe_varsz = 2  # current 1601,next 1602
-                        fiveframe_count += 1
-                        if fiveframe_count == 5:
-                            fiveframe_count = 0
-                            oneframe_varsz = 2  # current 1602,next 1602 (1loop)
-
-                    # 96khz
-                    elif samplerate == 96000:
-                        if fiveframe_count == 1:
-                            oneframe_varsz = 4  # current 3203 next 3204
-                        else:
-                            oneframe_varsz = 3  # current 3204 or 3203 next 3203
-                        fiveframe_count += 1
-                        if fiveframe_count == 5:
-                            fiveframe_count = 0
-                            oneframe_varsz = 3  # current 3203 next 3203 (1loop)
-                    else:
-                        # undefined.
-                        pass
-
-                if self.name == self.SRC_FILE:
-                    WavChecker.PROGRESS_SRCWAV += len(oneblock)
-                else:  # ORG_FILE
-                    WavChecker.PROGRESS_ORGWAV += len(oneblock)
-
-                # Get a progress log in 10% increments.
-                if progress > progress_per:
-                    self.__msgandlogging(level=logging.INFO, msg=":{0}%".format(str(progress_10_str)))
-                    progress_per += progress_10per
-                    progress_10_str += 10
-
-                # no read data
-                if not oneblock or WavChecker.REQ_CANCEL:
-                    break
-
-                # lastframe is not satisfyed 1frame samples?
-                if len(oneblock) < oneframe_sz_byte and len(oneblock) != 0:
-
-                    # v110
-                    if not self.opdict.get(WavChecker.OPDICT_CINEXCHECK):
-                        self.__msgandlogging(level=logging.WARN,
-                                             msg="最終フレームのサンプル数が1フレーム未満しか存在しません。最終フレームのサンプル数={0}、パス={1}".format(
-                                                 str(len(oneblock) / (wf.getsampwidth() * wf.getnchannels())), path))
-                    # v122 kokokara
-                    else:
-                        # cinex zure hosei from org ketsu data
-                        oneblock += self.cinexdiffbytes_tail[i]
-                        if len(oneblock) < oneframe_sz_byte:
-                            self.__msgandlogging(level=logging.WARN,
-                                                 msg="cinexズレ補正を実施したにもかかわらず最終フレームのサンプル数が1フレーム未満になっています。cinexの挙動変わったかもしれないよ？".format(
-                                                     str(len(oneblock) / (wf.getsampwidth() * wf.getnchannels())),
-                                                     path))
-                    # v122 kokomade
-
-
-                # save lastframe and lastprevframe SRC or ORG
-                self.lastprevframe[i] = self.lastframe[i]
-                self.lastframe[i] = oneblock
+                if not self.opdict.get(WavChecker.OPDICT_CINEXCHECK):
+                    self.__msgandlogging(level=logging.WARN,
+                                         msg="最終フレームのサンプル数が1フレーム未満しか存在しません。最終フレームのサンプル数={0}、パス={1}".format(
+                                             str(result.shortframe), str(path)))
+                # v122
+                elif result.cinexshort:
+                    self.__msgandlogging(level=logging.WARN,
+                                         msg="cinexズレ補正を実施したにもかかわらず最終フレームのサンプル数が1フレーム未満になっています。cinexの挙動変わったかもしれないよ？")
 
-                # xxhash64 total digest update
-                xxhash64_total.update(oneblock)
+            # v160 uint64 array of intdigest
+            self.checksumframes_org[i] = result.digests
+            # v160 coarse digests for two phase second pass, source and frame position for sample diff
+            self.hashresults[i] = result
 
-                # xxhash64_1frame digest save
-                xxhash64_1frame.update(oneblock)
-                self.checksumframes_org[i].append(xxhash64_1frame.hexdigest())
+            # save lastframe and lastprevframe SRC or ORG
+            if result.lastframe is not None:
+                if result.lastprevframe is not None:
+                    self.lastprevframe[i] = result.lastprevframe
+                else:
+                    self.lastprevframe[i] = self.lastframe[i]
+                self.lastframe[i] = result.lastframe
 
-                if self.opdict.get(WavChecker.OPDICT_CINEXCHECK) and self.cinexdiffpos_head[i]:
-                    if self.cinexdiffpos_head[i] >= prev_pos and self.cinexdiffpos_head[i] <= wf.tell():
-                        self.cinexdiffpos_head[i] = None
-                        self.cinexdiff_frameindex[i] = j
+            # v160 cinex diff frame index from sample position
+            if result.cinexindex is not None:
+                self.cinexdiffpos_head[i] = None
+                self.cinexdiff_frameindex[i] = result.cinexindex
 
-                j = j + 1
-                xxhash64_1frame.reset()
+            # v160 pipe source returns ffmpeg returncode
+            if result.returncode and not WavChecker.REQ_CANCEL:
+                self.__msgandlogging(level=logging.ERROR,
+                                     msg=str(path) + ":ffmpeg pipe error, returncode={0} detail:{1}".format(
+                                         result.returncode, result.pipeerrors))
+                self.checksums.clear()
+                return (self.checksums)
 
             if len(paths) == 1:
                 # Interleave? or mono?
-                self.checksums[WavChecker.MODE_INTERLEAVE] = xxhash64_total.hexdigest()
+                self.checksums[WavChecker.MODE_INTERLEAVE] = result.total
 
             elif len(paths) == 6:
                 if i == 0:
-                    self.checksums[WavChecker.FL] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.FL] = result.total
                     self.checksums[WavChecker.MODE_51CH] = self.checksums[WavChecker.FL]
                 elif i == 1:
-                    self.checksums[WavChecker.FR] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.FR] = result.total
                     self.checksums[WavChecker.MODE_51CH] += self.checksums[WavChecker.FR]
                 elif i == 2:
-                    self.checksums[WavChecker.FC] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.FC] = result.total
                     self.checksums[WavChecker.MODE_51CH] += self.checksums[WavChecker.FC]
                 elif i == 3:
-                    self.checksums[WavChecker.LFE] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.LFE] = result.total
                     self.checksums[WavChecker.MODE_51CH] += self.checksums[WavChecker.LFE]
                 elif i == 4:
-                    self.checksums[WavChecker.RL] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.RL] = result.total
                     self.checksums[WavChecker.MODE_51CH] += self.checksums[WavChecker.RL]
                 elif i == 5:
-                    self.checksums[WavChecker.RR] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.RR] = result.total
                     self.checksums[WavChecker.MODE_51CH] += self.checksums[WavChecker.RR]
                 else:
                     self.__msgandlogging(self.name + "内部矛盾エラー:5.1ch以上の処理をしようとしています")
@@ -2639,14 +2929,14 @@ class WavChecker(QThread, QObject):
             elif len(paths) == 2:
 
                 if i == 0:
-                    self.checksums[WavChecker.FL] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.FL] = result.total
                     self.checksums[WavChecker.MODE_2CH] = self.checksums[WavChecker.FL]
-                    self.checksums[WavChecker.L] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.L] = result.total
                     self.checksums[WavChecker.MODE_8CH_OA] = self.checksums[WavChecker.L]
                 elif i == 1:
-                    self.checksums[WavChecker.FR] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.FR] = result.total
                     self.checksums[WavChecker.MODE_2CH] += self.checksums[WavChecker.FR]
-                    self.checksums[WavChecker.R] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.R] = result.total
                     self.checksums[WavChecker.MODE_8CH_OA] += self.checksums[WavChecker.R]
                 else:
                     self.__msgandlogging("内部矛盾エラー:L/Rモード選択内部矛盾、開発者に連絡してください")
@@ -2655,28 +2945,28 @@ class WavChecker(QThread, QObject):
             elif len(paths) == 8:
 
                 if i == 0:
-                    self.checksums[WavChecker.L] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.L] = result.total
                     self.checksums[WavChecker.MODE_8CH_OA] = self.checksums[WavChecker.L]
                 elif i == 1:
-                    self.checksums[WavChecker.R] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.R] = result.total
                     self.checksums[WavChecker.MODE_8CH_OA] += self.checksums[WavChecker.R]
                 elif i == 2:
-                    self.checksums[WavChecker.FL] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.FL] = result.total
                     self.checksums[WavChecker.MODE_8CH_OA] += self.checksums[WavChecker.FL]
                 elif i == 3:
-                    self.checksums[WavChecker.FR] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.FR] = result.total
                     self.checksums[WavChecker.MODE_8CH_OA] += self.checksums[WavChecker.FR]
                 elif i == 4:
-                    self.checksums[WavChecker.FC] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.FC] = result.total
                     self.checksums[WavChecker.MODE_8CH_OA] += self.checksums[WavChecker.FC]
                 elif i == 5:
-                    self.checksums[WavChecker.LFE] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.LFE] = result.total
                     self.checksums[WavChecker.MODE_8CH_OA] += self.checksums[WavChecker.LFE]
                 elif i == 6:
-                    self.checksums[WavChecker.RL] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.RL] = result.total
                     self.checksums[WavChecker.MODE_8CH_OA] += self.checksums[WavChecker.RL]
                 elif i == 7:
-                    self.checksums[WavChecker.RR] = xxhash64_total.hexdigest()
+                    self.checksums[WavChecker.RR] = result.total
                     self.checksums[WavChecker.MODE_8CH_OA] += self.checksums[WavChecker.RR]
                 else:
                     self.__msgandlogging(self.name + "内部矛盾エラー:OA 8ch以上の処理をしようとしています")
@@ -2690,143 +2980,204 @@ class WavChecker(QThread, QObject):
             self.__msgandlogging(str(self.checksums))
 
             # print(frameslist)
+            # v160 throughput for comparing with disk bandwidth
             self.__msgandlogging(
-                "proc_wavhash4:ch={0:d} checksum calc time={1:.2f}".format(i, time.perf_counter() - time_start))
-            i = i + 1
+                "proc_wavhash4:ch={0:d} checksum calc time={1:.2f} throughput={2:.1f}MiB/s".format(
+                    i, result.elapsed, result.progress / (1024 * 1024) / max(result.elapsed, 0.000001)))
 
         return (self.checksums)
 
     # V130
     def proc_wavhash_muon(self,framehashlist,srcpaths):
 
-        # Note:this function Prerequisites "wav" virtual 29.97fps and 48khz
+        # v160 silence map(peak of every frame and channel) is made by proc_wavhash4 with frame hash,
+        # any samplerate and fps(no zero filled 29.97 pattern frame).
+        # muon frame digest is same as src if the frame is digital silence, else digest of zero filled frame.
+        result = self.hashresults[0]
+        peaks = None if result is None else result.analyses.get(frameanalyzer.PeakAnalyzer.name)
+        if peaks is None:
+            self.__msgandlogging(level=logging.ERROR, msg=str(srcpaths[0]) + ":silence map error.")
+            self.checksums.clear()
+            return self.checksums
+
+        framesize = result.sampwidth * result.nchannels
+        loudframes = frameanalyzer.loud_frames(peaks)
+
+        self.checksumframes_muon = array('Q', framehashlist)
+        zerodigests = {}  # frame bytes -> digest of zero filled frame
+        for i in loudframes:
+            if i == len(framehashlist) - 1:
+                framebytes = len(self.lastframe[0])
+            else:
+                framebytes = (framehash.frame_start(i + 1, result.cadence) - framehash.frame_start(i, result.cadence)) * framesize
+            if framebytes not in zerodigests:
+                zerodigests[framebytes] = xxhash.xxh3_64_intdigest(bytes(framebytes))
+            self.checksumframes_muon[i] = zerodigests[framebytes]
+
+        # v160 float pcm peak is float(full scale 1.0)
+        floatsamples = pcmreader.is_float(result.params)
+        for ch, (peak, loudnum) in enumerate(frameanalyzer.channel_levels(peaks)):
+            self.__msgandlogging(level=logging.ERROR if loudnum else logging.INFO,
+                                 msg="ch{0}: 最大ピーク = {1} ({2:.1f}dBFS) 無音でないフレーム数 = {3}".format(
+                                     ch + 1, peak, frameanalyzer.peak_dbfs(peak, result.sampwidth, floatsamples),
+                                     loudnum))
+
+        if loudframes:
+            self.checksums[self.MODE_MUON_CHECK] = framehash.digests_total(self.checksumframes_muon)
+        else:
+            self.checksums[self.MODE_MUON_CHECK] = self.checksums[self.MODE_INTERLEAVE]
+
+        return
+
+    # v160
+    def __check_channels(self, srcresult, orgresult, errsections, frametc):
+
+        # error sections of every channel from per channel frame digests(frameanalyzer chdigests)
+        # hashed in the same read as interleave frame digests.
+        srcdigests = srcresult.analyses.get(frameanalyzer.ChannelDigestAnalyzer.name)
+        orgdigests = orgresult.analyses.get(frameanalyzer.ChannelDigestAnalyzer.name)
+        if srcdigests is None or orgdigests is None or srcdigests.shape[1] != orgdigests.shape[1] \
+                or srcdigests.shape[1] < 2:
+            return
+
+        for ch, runs in enumerate(framehash.channel_mismatch_runs(srcdigests, orgdigests, errsections)):
+            if not runs:
+                self.__msgandlogging(level=logging.INFO, msg="ch{0}: 相違なし".format(ch + 1))
+                continue
+            for runnum, (start, end) in enumerate(runs):
+                self.__msgandlogging(level=logging.ERROR,
+                                     msg="ch{0}: エラーセクション{1}: 検出開始TC= {2} 検出終了TC = {3}".format(
+                                         ch + 1, runnum, frametc(start), frametc(end)))
+
+    # v160
+    def __check_slips(self, srcresult, orgresult, frametc):
+
+        # src and org are aligned by anchor hash(pcmalign.match_regions),
+        # same regions and insert/drop between them are reported with TC and sample.
+        if pcmreader.is_pipe(srcresult.path) or pcmreader.is_pipe(orgresult.path):
+            self.__msgandlogging(level=logging.WARN, msg="ffmpegパイプ入力のため、サンプルズレ検出をスキップしました。")
+            return
+
+        if srcresult.sampwidth * srcresult.nchannels != orgresult.sampwidth * orgresult.nchannels:
+            return
+
+        def sampletc(pos, result):
+            frameindex, sample = framehash.sample_frame(pos - result.startpos, result.cadence)
+            # sample index is 1 origin
+            return "TC {0} の{1}サンプル目".format(frametc(frameindex), sample + 1)
+
+        WavChecker.STATUSMESSAGE = "サンプルズレ検出を実行中"
+        time_start = time.perf_counter()
 
         try:
-            # v140
-            wf = wave_bwf_rf64.open(srcpaths[0])
+            srcwf = pcmreader.open_pcm(srcresult.path)
+            try:
+                orgwf = pcmreader.open_pcm(orgresult.path)
+                try:
+                    regions = pcmalign.match_regions(srcwf, orgwf, srcresult.startpos, orgresult.startpos,
+                                                     cancelled=lambda: WavChecker.REQ_CANCEL)
+                    srcend = srcwf.getnframes()
+                    orgend = orgwf.getnframes()
+                finally:
+                    orgwf.close()
+            finally:
+                srcwf.close()
         except Exception as e:
-            # it's almost non-standard wav reading...
-            self.__msgandlogging(level=logging.ERROR, msg=srcpaths[0] + ":wav open error, detail:" + str(e))
-            self.checksums.clear()
-            return self.checksums
+            self.__msgandlogging(level=logging.WARN, msg="サンプルズレ検出に失敗しました。detail:" + str(e))
+            return
 
-        wavbytelen = wf.getsampwidth()
-        nchannels  = wf.getnchannels()
-        samplerate = wf.getframerate()
-        onesamplebyteslen = wavbytelen * nchannels
+        if regions is None:
+            return
 
+        self.__msgandlogging("slip check time = {0:.3f}sec regions = {1}".format(
+            time.perf_counter() - time_start, len(regions)))
 
-        if samplerate == 48000 or samplerate == 96000:
-            oneframebyteslen = int((samplerate / 30) * onesamplebyteslen)
-            # print("onesamplebytelen:{0}".format(oneframebyteslen))
-        else:
-            self.__msgandlogging(level=logging.ERROR, msg=srcpaths[0] + "samplerate can't support!!:wav open error.")
-            self.checksums.clear()
-            return self.checksums
+        for regionnum, (srcpos, orgpos, length) in enumerate(regions):
+            self.__msgandlogging(level=logging.INFO,
+                                 msg="一致区間{0}: SRC {1} - {2} ORG {3} - {4} ズレ = {5:+d}サンプル".format(
+                                     regionnum, sampletc(srcpos, srcresult), sampletc(srcpos + length - 1, srcresult),
+                                     sampletc(orgpos, orgresult), sampletc(orgpos + length - 1, orgresult),
+                                     srcpos - srcresult.startpos - (orgpos - orgresult.startpos)))
+
+        slips = pcmalign.region_slips(regions, srcresult.startpos, orgresult.startpos, srcend, orgend)
+        for srcpos, orgpos, srcgap, orggap in slips:
+            if srcgap > orggap:
+                self.__msgandlogging(level=logging.ERROR,
+                                     msg="サンプルズレ(挿入): SRC {0} から {1}サンプルが挿入されています。(ORG {2})".format(
+                                         sampletc(srcpos, srcresult), srcgap - orggap, sampletc(orgpos, orgresult)))
+            elif srcgap < orggap:
+                self.__msgandlogging(level=logging.ERROR,
+                                     msg="サンプルズレ(欠落): SRC {0} で {1}サンプルが欠落しています。(ORG {2})".format(
+                                         sampletc(srcpos, srcresult), orggap - srcgap, sampletc(orgpos, orgresult)))
 
-        if samplerate == 48000:
-            oneframe_bytearray_onelen = 2
-            oneframe_bytearray_twolen = 1
-        elif samplerate == 96000:
-            oneframe_bytearray_onelen = 3
-            oneframe_bytearray_twolen = 4
-        else:
-            # undefiend
-            pass
+    # v160
+    def __frametc(self, frameindex):
 
-        # Initialize two pattern 1frame bytearray length.
-        # Ex:protools sample cycle list
-        # 48khz               96khz
-        # 1frame = 2(sample), 3(sample)
-        # 2frame = 1        , 3
-        # 3frame = 2        , 4
-        # 4frame = 1        , 3
-        # 5frame = 2        , 3
-
-        # bytes
-        # 48khz=2 96khz=3
-        oneframe_bytearray_one = bytearray(oneframebyteslen + (onesamplebyteslen * oneframe_bytearray_onelen))
-        # 48khz=1 96khz=4
-        oneframe_bytearray_two = bytearray(oneframebyteslen + (onesamplebyteslen * oneframe_bytearray_twolen))
-
-        # one xxhash initialize.
-        xxhash64_muon1frame_one = xxhash.xxh3_64()
-        xxhash64_muon1frame_one.reset()
-        xxhash64_muon1frame_one.update(oneframe_bytearray_one)
-
-        # for two xxhash initialize.
-        xxhash64_muon1frame_two = xxhash.xxh3_64()
-        xxhash64_muon1frame_two.reset()
-        xxhash64_muon1frame_two.update(oneframe_bytearray_two)
-
-        xxhash64_muonframe_total = xxhash.xxh3_64()
-        xxhash64_muonframe_total.reset()
-
-        fiveframe_count = 0  # for 29.97 pattern
-        # muon 1frame bytearray work.
-        muon1frame = oneframe_bytearray_one
-        muon1frame_xxh = xxhash64_muon1frame_one
-
-
-        for i,org1framehexdigest in enumerate(framehashlist):
-            # lastframe excluded
-            if i != len(framehashlist) - 1:
-                # print("i={0} digest = {1}".format(i,muon1frame_xxh.hexdigest()))
-                xxhash64_muonframe_total.update(muon1frame)
-                self.checksumframes_muon.append(muon1frame_xxh.hexdigest())
+        # Timecode of frame index from OPDICT_STARTTC
+        tc_fpsstr = self.opdict[self.OPDICT_FPS]
+        if self.opdict[self.OPDICT_FPS] == '29.97' and self.opdict[self.OPDICT_STARTTC][-3] == ':':
+            # NDF TC treat as 30....
+            tc_fpsstr = '30'
+        basetc = timecode.Timecode(tc_fpsstr, self.opdict[self.OPDICT_STARTTC]) + frameindex
 
-                if samplerate == 48000:
-                    if fiveframe_count % 2 == 0:
-                        # 48khz next is 1
-                        muon1frame = oneframe_bytearray_two
-                        muon1frame_xxh = xxhash64_muon1frame_two
-                    else:
-                        # 48khz next is 2
-                        muon1frame = oneframe_bytearray_one
-                        muon1frame_xxh = xxhash64_muon1frame_one
-                    fiveframe_count += 1
-                    if fiveframe_count == 5:
-                        # 48khz 1lap next is 2
-                        fiveframe_count = 0
-                        muon1frame = oneframe_bytearray_one
-                        muon1frame_xxh = xxhash64_muon1frame_one
-                elif samplerate == 96000:
-                    if fiveframe_count == 1:
-                        muon1frame = oneframe_bytearray_two
-                        muon1frame_xxh = xxhash64_muon1frame_two
-                    else:
-                        muon1frame = oneframe_bytearray_one
-                        muon1frame_xxh = xxhash64_muon1frame_one
-                    fiveframe_count += 1
-                    if fiveframe_count == 5:
-                        fiveframe_count = 0
-                        muon1frame = oneframe_bytearray_one
-                        muon1frame_xxh = xxhash64_muon1frame_one
-                else:
-                    # undefined.
-                    pass
+        if self.opdict[self.OPDICT_FPS] == '29.97':
 
-        # lastframe wav data shorter than 1frame ?
-        if len(self.lastframe[0]) != len(self.lastprevframe[0]):
-            # rehash lastframe
-            xxhash64_lastframe = xxhash.xxh3_64()
-            xxhash64_lastframe.reset()
-            lastframe_bytearray = bytearray(len(self.lastframe[0]))
-            xxhash64_lastframe.update(lastframe_bytearray)
-            xxhash64_muonframe_total.update(lastframe_bytearray)
+            # is non drop ?
+            if self.opdict[self.OPDICT_STARTTC][-3] == ':':
+                # nondrop(NDF) TC same as 30....
+                return timecode.Timecode('30', start_timecode=basetc)
+            else:
+                # drop
+                return timecode.Timecode(framerate=self.opdict[self.OPDICT_FPS], start_timecode=basetc)
 
-            self.checksumframes_muon.append(xxhash64_lastframe.hexdigest())
         else:
-            # append same muon1frame
-            self.checksumframes_muon.append(muon1frame.hexdigest())
-            xxhash64_muonframe_total.update(muon1frame)
+            # other frame rate
+            return timecode.Timecode(framerate=self.opdict[self.OPDICT_FPS], start_timecode=basetc)
 
-        self.checksums[self.MODE_MUON_CHECK] = xxhash64_muonframe_total.hexdigest()
+    # v160
+    def __check_levels(self, wavworker, npaths):
 
-        return
+        # near silence and channel pair null residual(phase inversion check) of every frame,
+        # from frame analyzers of proc_wavhash4(peaks, nullpeaks), no second read.
+        # TC ranges over OPDICT_SILENCEDB / OPDICT_NULLDB are reported.
+        silencedb = self.opdict.get(WavChecker.OPDICT_SILENCEDB)
+        nulldb = self.opdict.get(WavChecker.OPDICT_NULLDB)
+
+        for i in range(npaths):
+            result = wavworker.hashresults[i]
+            if result is None or frameanalyzer.PeakAnalyzer.name not in result.analyses:
+                continue
+            peaks = result.analyses[frameanalyzer.PeakAnalyzer.name]
+            nullpeaks = result.analyses.get(frameanalyzer.NullAnalyzer.name)
+            # float pcm is float peak(full scale 1.0)
+            floatsamples = pcmreader.is_float(result.params)
+
+            checks = []  # (check name, channel name, value of every frame, threshold dBFS)
+            if silencedb is not None:
+                checks.append(("ニアサイレンス", "全チャンネル", peaks.max(axis=1, initial=0), silencedb))
+            if nulldb is not None and nullpeaks is not None:
+                for pair in range(nullpeaks.shape[1]):
+                    checks.append(("逆相ヌル残差", "ch{0}+ch{1}".format(pair * 2 + 1, pair * 2 + 2),
+                                   nullpeaks[:, pair], nulldb))
+
+            for checkname, chname, values, db in checks:
+                runs = framehash.threshold_runs(values, frameanalyzer.db_limit(db, result.sampwidth, floatsamples))
+                if not runs:
+                    self.__msgandlogging(level=logging.INFO,
+                                         msg="{0}チェック {1}: 全フレームが {2}dBFS 以下です。".format(checkname, chname, db))
+                    continue
+
+                self.__msgandlogging(level=logging.WARN,
+                                     msg="{0}チェック {1}: {2}dBFS を超える区間が {3} 箇所あります。".format(
+                                         checkname, chname, db, len(runs)))
+                for runnum, (start, end, peak) in enumerate(runs):
+                    self.__msgandlogging(level=logging.WARN,
+                                         msg="{0}区間{1}: 開始TC = {2} 終了TC = {3} 最大 = {4:.1f}dBFS".format(
+                                             checkname, runnum, self.__frametc(start), self.__frametc(end),
+                                             frameanalyzer.peak_dbfs(peak, result.sampwidth, floatsamples)))
 
     def __check_allframe2(self, chname, srcframelist, orgframelist, srclastframe, orglastframe,
-                          srclastprevframe, orglastprevframe,chindex=0):
+                          srclastprevframe, orglastprevframe,chindex=0, srcresult=None, orgresult=None):
 
         retcode = 0
 
@@ -2861,12 +3212,9 @@ class WavChecker(QThread, QObject):
         errtc_length = 0  # current error timecode object length
         errtc_sectionnum = 0  # errsection number
 
-        i = 0
-
         errtc = None
         errbasetc = None
         errtclist = []  # tc tuple (TimeCode starttc, TimeCode endtc)
-        basetc = starttc
         errtc_sectionnum = 0
 
         lasterrtc = None
@@ -2886,49 +3234,28 @@ class WavChecker(QThread, QObject):
         self.__msgandlogging("matching range: starttc = {0} endtc = {1}.".format(
             starttc, starttc + check_length))
 
-        while i < check_length:
-            if srcframelist[i] != orgframelist[i]:
+        frametc = self.__frametc
 
-                if errtc:
-                    errtc += 1
-                else:
+        # v160 vectorized compare, error section is run of differ frames.
+        # Timecode objects are made only at section start/end.
+        errsections = framehash.mismatch_runs(srcframelist, orgframelist, check_length)
+        for errstart, errend in errsections:
 
-                    if self.opdict[self.OPDICT_FPS] == '29.97':
+            errbasetc = frametc(errstart)
+            errtc = frametc(errend)
 
-                        # is non drop ?
-                        if self.opdict[self.OPDICT_STARTTC][-3] == ':':
-                            # nondrop(NDF) TC same as 30....
-                            errbasetc = timecode.Timecode('30', start_timecode=basetc)
-                            # errtc = timecode.Timecode('30', start_timecode=basetc)
-                            errtc = timecode.Timecode('30', start_timecode=basetc + 1)
-                        else:
-                            # drop
-                            errbasetc = timecode.Timecode(framerate=self.opdict[self.OPDICT_FPS], start_timecode=basetc)
-                            errtc = timecode.Timecode(framerate=self.opdict[self.OPDICT_FPS], start_timecode=basetc + 1)
-
-                    else:
-                        # other frame rate
-                        errbasetc = timecode.Timecode(framerate=self.opdict[self.OPDICT_FPS], start_timecode=basetc)
-                        errtc = timecode.Timecode(framerate=self.opdict[self.OPDICT_FPS], start_timecode=basetc + 1)
-
-            else:
-                # frame matched
-                if errtc:
-                    errtctuple = (errbasetc, errtc)
-                    errtclist.append(errtctuple)
-                    errbasetc = None
-                    errtc = None
-
-            i += 1
-            basetc += 1
-
-        # last frame process
-        if errtc:
-            errtc -= 1
-            errtctuple = (errbasetc, errtc + 1)
+            errtctuple = (errbasetc, errtc)
             errtclist.append(errtctuple)
-            errbasetc = None
-            errtc = None
+
+        # v160 sample exact position of each error section, only pcm of sections is read.
+        samplediffs = [None] * len(errsections)
+        if errsections and srcresult is not None and orgresult is not None:
+            try:
+                samplediffs = framehash.section_sample_diffs(srcresult, orgresult, errsections,
+                                                             cancelled=lambda: WavChecker.REQ_CANCEL)
+            except Exception as e:
+                self.__msgandlogging(level=logging.WARN,
+                                     msg="エラーセクションのサンプル位置を取得できませんでした。detail:" + str(e))
 
         # V110 cinex special
         if self.opdict.get(WavChecker.OPDICT_CINEXCHECK):
@@ -2951,8 +3278,31 @@ class WavChecker(QThread, QObject):
             self.__msgandlogging(level=logging.ERROR,
                                  msg="エラーセクション{0}: 検出開始TC= {1} 検出終了TC = {2}".format( \
                                      errtc_sectionnum, stc, etc))
+
+            # v160
+            samplediff = samplediffs[errtc_sectionnum]
+            if samplediff is not None:
+                sectionstart = framehash.frame_start(errsections[errtc_sectionnum][0], srcresult.cadence)
+                firstframe, firstsample = framehash.sample_frame(sectionstart + samplediff[0], srcresult.cadence)
+                lastframe, lastsample = framehash.sample_frame(sectionstart + samplediff[1], srcresult.cadence)
+                # sample index is 1 origin(same as ケツ1フレ check)
+                self.__msgandlogging(level=logging.ERROR,
+                                     msg="エラーセクション{0} 相違範囲: TC {1} の{2}サンプル目 - TC {3} の{4}サンプル目 相違サンプル数 = {5}サンプル".format(
+                                         errtc_sectionnum, frametc(firstframe), firstsample + 1,
+                                         frametc(lastframe), lastsample + 1, samplediff[2]))
+
             lasterrtc = etc
             errtc_sectionnum += 1
+
+        # v160 differ channel of interleave wav
+        if errsections and srcresult is not None and orgresult is not None:
+            self.__check_channels(srcresult, orgresult, errsections, frametc)
+
+        # v160 sample slip(insert/drop) anywhere in program
+        if self.opdict.get(WavChecker.OPDICT_SLIPCHECK) and (errsections or diff_length) \
+                and srcresult is not None and orgresult is not None:
+            self.__check_slips(srcresult, orgresult, frametc)
+
         # V122 kokokara
         if errtc_sectionnum > 0:
             self.__msgandlogging(level=logging.ERROR,
@@ -3137,7 +3487,8 @@ class WavChecker(QThread, QObject):
         except OSError as err:
             self.__msgandlogging(msg=err)
 
-    def ffprobe_command(self, filepath):
+    # v160 keep=False returns (streams, format) without overwriting ffprobe_streamsdict/ffprobe_formatdict
+    def ffprobe_command(self, filepath, keep=True):
 
         self.ffprobe_cmdlist[4] = filepath
 
@@ -3159,11 +3510,13 @@ class WavChecker(QThread, QObject):
                 pass
 
         subproc.wait()
-        self.stdout = subproc.stdout
-        self.stderr = subproc.stderr.read()
+        stderr = subproc.stderr.read()
+        if keep:
+            self.stdout = subproc.stdout
+            self.stderr = stderr
 
-        if self.stderr is not None:
-            self.__msgandlogging("stderr:" + str(self.stderr))
+        if stderr is not None:
+            self.__msgandlogging("stderr:" + str(stderr))
 
         jsondoc = QJsonDocument.fromJson(bufbytes)
         jsonobjdict = jsondoc.object()
@@ -3174,10 +3527,268 @@ class WavChecker(QThread, QObject):
         streamslist = jsonobjdict["streams"]
         formatdict = jsonobjdict["format"]
 
-        self.ffprobe_streamsdict = copy.deepcopy(streamslist)
-        self.ffprobe_formatdict = copy.deepcopy(formatdict)
+        if keep:
+            self.ffprobe_streamsdict = copy.deepcopy(streamslist)
+            self.ffprobe_formatdict = copy.deepcopy(formatdict)
+
+        return streamslist, formatdict
+
+    # v160
+    def usepipe(self):
+        # cinex preprocess needs random access(setpos) to src wav, so temp wav is required.
+        return bool(self.opdict.get(self.OPDICT_FFMPEGPIPE)) and not self.opdict.get(self.OPDICT_CINEXCHECK)
+
+    # v160
+    def usenative(self):
+        # same restriction as pipe mode(cinex preprocess needs wav path).
+        return bool(self.opdict.get(self.OPDICT_NATIVEREADER)) and not self.opdict.get(self.OPDICT_CINEXCHECK)
+
+    # v160
+    def native_sources(self, path, chmap, aformat, trim=True, honbenalone=True):
+        # Build native pcm reader sources. chmap = [(name, audio track index, channel or None(interleave)), ...]
+        # return None if the file can't be read natively(caller uses ffmpeg).
+        # honbenalone: see trim_secs
+
+        if QFileInfo(path).suffix() == "mov":
+            trackparser = qtreader.parse_tracks
+            sourceclass = qtreader.QtSource
+        elif QFileInfo(path).suffix() == "mxf":
+            trackparser = mxfreader.parse_tracks
+            sourceclass = mxfreader.MxfSource
+        else:
+            return None
 
-        return
+        try:
+            tracks = trackparser(path)
+        except Exception as e:
+            self.__msgandlogging(level=logging.WARN, msg=path + ":native reader not available, detail:" + str(e))
+            return None
+
+        sources = []
+        for name, trackindex, channel in chmap:
+
+            if trackindex >= len(tracks):
+                self.__msgandlogging(level=logging.WARN,
+                                     msg=path + ":native reader:audio track {0} not found".format(trackindex))
+                return None
+
+            track = tracks[trackindex]
+
+            # output pcm must be same as ffmpeg -acodec aformat
+            # v160 16bit conversion(OPDICT_SOURCEWAVFORCE16BIT) is done by reader
+            force16 = aformat == "pcm_s16le" and track.getcodec() in pcmreader.S16FORMATS
+            if track.getcodec() != aformat and not force16:
+                self.__msgandlogging("native reader:{0}({1}) -> {2} needs ffmpeg.".format(
+                    track.getformat(), track.getcodec(), aformat))
+                return None
+
+            if channel is not None and channel >= track.nchannels:
+                self.__msgandlogging(level=logging.WARN,
+                                     msg=path + ":native reader:channel {0} not found".format(channel))
+                return None
+
+            sourcename = QFileInfo(path).fileName() + "_" + name
+            sources.append(sourceclass(track, sourcename, channel))
+            if force16 and track.getcodec() != aformat:
+                sources[-1] = pcmreader.Force16BitSource(sources[-1], pcmreader.S16FORMATS[track.getcodec()])
+            # v160 head skip/honben is read range of reader(no ffmpeg -ss/-t)
+            if trim:
+                sources[-1] = self.trim_source(sources[-1], track.framerate, honbenalone)
+            self.__msgandlogging(name + ":native source:" + str(sources[-1]) + ":" + pprint.pformat(
+                (track.getformat(), track.nchannels, track.sampwidth, track.framerate, track.nframes)))
+
+        return sources
+
+    # v160
+    def trim_secs(self, honbenalone=True):
+        # head skip/honben seconds(1/1000 adjusted by mainwindow) of ffmpeg -ss/-t.
+        # honbenalone=False: honben is used only with head skip, same as ffmpeg command of 5.1ch/8ch multimono.
+        head_sssec = self.opdict.get(self.OPDICT_VIDEOHEADSKIPSEC)
+        tail_sssec = self.opdict.get(self.OPDICT_VIDEOHONBENSEC)
+        if not head_sssec and not honbenalone:
+            tail_sssec = None
+        return head_sssec, tail_sssec
+
+    # v160
+    def trim_source(self, source, framerate, honbenalone=True):
+        # head skip/honben -> sample range, same as ffmpeg -ss/-t(pcmreader.sec_to_frames).
+        head_sssec, tail_sssec = self.trim_secs(honbenalone)
+        if not head_sssec and not tail_sssec:
+            return source
+
+        startframe = pcmreader.sec_to_frames(head_sssec, framerate) if head_sssec else 0
+        nframes = pcmreader.sec_to_frames(tail_sssec, framerate) if tail_sssec else None
+        self.__msgandlogging("native reader:head skip {0}sample honben {1}sample".format(startframe, nframes))
+        return pcmreader.TrimSource(source, startframe, nframes)
+
+    # v160
+    def swap_org_sources(self, paths, honbenalone=True):
+        # src org swap: head skip/honben of org wav is sample range of reader(TrimSource), no temp wav.
+        # return None if wav can't be read(caller uses ffmpeg).
+        sources = []
+        for path in paths:
+            try:
+                wf = pcmreader.open_pcm(path)
+                framerate = wf.getframerate()
+                wf.close()
+            except Exception as e:
+                self.__msgandlogging(level=logging.WARN, msg=path + ":native reader not available, detail:" + str(e))
+                return None
+            sources.append(self.trim_source(path, framerate, honbenalone))
+        return sources
+
+    # v160
+    def interleave_ffmpegworker(self, path, aformat, tempwavname, trim=True, outputseek=False, honbenalone=True):
+        # ffmpeg worker which extracts first audio stream to one interleave temp wav(no channelsplit).
+        # outputseek: -ss is output option(after -i) like multimono commands, else input option like interleave mode.
+        worker = WavChecker(self.mainwin, self.SRC_FILE)
+        worker.SRCPATHS = self.SRCPATHS.copy()
+        worker.opdict = self.opdict.copy()
+        worker.mode = self.MODE_FFMPEG_INTERLEAVE
+        worker.aformat = aformat
+
+        cmdlist = worker.ffmpeg_single_interleave_cmdlist
+        cmdlist[6] = path
+        cmdlist[12] = aformat
+        cmdlist[-1] = os.path.join(WavChecker.TEMPDIR, tempwavname)
+        if trim:
+            head_sssec, tail_sssec = self.trim_secs(honbenalone)
+            if tail_sssec:
+                # "-t"
+                cmdlist[7:7] = ["-t", str(tail_sssec)]
+            if head_sssec:
+                # "-ss"
+                ssindex = 7 if outputseek else 5
+                cmdlist[ssindex:ssindex] = ["-ss", str(head_sssec)]
+        return worker
+
+    # v160
+    def channelsplit_ffmpegworker(self, chnames, trim=True, honbenalone=True):
+        # ffmpeg worker of channelsplit multimono command(5.1ch or 2ch), one temp wav per channel.
+        # used when channel layout of src is not known, channelsplit maps channels by name.
+        # return (worker, temp wav path list)
+        worker = WavChecker(self.mainwin, self.SRC_FILE)
+        worker.SRCPATHS = self.SRCPATHS.copy()
+        worker.opdict = self.opdict.copy()
+        worker.aformat = self.aformat
+        if len(chnames) == 6:
+            worker.mode = self.MODE_FFMPEG_51ch
+            cmdlist = worker.ffmpeg_51ch_multimono_cmdlist
+        else:
+            worker.mode = self.MODE_FFMPEG_2ch
+            cmdlist = worker.ffmpeg_2ch_multimono_cmdlist
+        cmdlist[4] = ""
+
+        # output k: "-acodec" None "-map" "[chname]" path, first "-acodec" is before "-stats"
+        wavpathlist = []
+        for k, chname in enumerate(chnames):
+            cmdlist[8 if k == 0 else 13 + 5 * k] = self.aformat
+            cmdlist[16 + 5 * k] = os.path.join(WavChecker.TEMPDIR, chname + ".wav")
+            wavpathlist.append(cmdlist[16 + 5 * k])
+
+        trimargs = []
+        if trim:
+            head_sssec, tail_sssec = self.trim_secs(honbenalone)
+            if tail_sssec:
+                trimargs += ["-t", str(tail_sssec)]
+            if head_sssec:
+                trimargs += ["-ss", str(head_sssec)]
+        # output options of every output, before its "-map"(from the last output, indexes don't shift)
+        for k in reversed(range(len(chnames))):
+            cmdlist[14 + 5 * k:14 + 5 * k] = trimargs
+        return worker, wavpathlist
+
+    # v160
+    def channel_layout(self, path, streamindex=0):
+        # ffprobe channel_layout of audio stream, None if it is unknown
+        try:
+            streamslist, _ = self.ffprobe_command(path, keep=False)
+        except Exception as e:
+            self.__msgandlogging(level=logging.WARN, msg=path + ":ffprobe failed. detail:" + str(e))
+            return None
+        astreams = [stream for stream in streamslist if stream.get("codec_type") == "audio"]
+        if streamindex >= len(astreams):
+            return None
+        return astreams[streamindex].get("channel_layout")
+
+    # v160
+    @staticmethod
+    def channel_sources(source, chnames):
+        # every channel of interleave source(wav path or source object),
+        # proc_wavhash4 hashes them from one read of the source.
+        return [pcmreader.ChannelSource(source, channel, chname) for channel, chname in enumerate(chnames)]
+
+    # v160
+    def pipe_sources(self, path, maplist, outchannels, aformat, trim=True, streamindex=0, inputargs=None,
+                     outputseek=False, honbenalone=True):
+        # Build ffmpeg raw pcm stdout sources. maplist = [(name, ffmpeg map args), ...]
+        # outputseek/honbenalone: same as interleave_ffmpegworker
+        # one ffmpeg process per map args, launched when wavworker opens the source,
+        # so decoding and hashing overlap and no temp wav is written.
+        # return None if pcm format can't be piped(caller uses temp wav).
+
+        if aformat not in pcmreader.RAWFORMATS:
+            self.__msgandlogging(str(aformat) + ":raw pcm pipe not supported. use temp wav.")
+            return None
+
+        rawfmt, sampwidth = pcmreader.RAWFORMATS[aformat]
+
+        # probe result of source(ffprobe_streamsdict) is kept
+        try:
+            streamslist, _ = self.ffprobe_command(path, keep=False)
+        except Exception as e:
+            self.__msgandlogging(level=logging.WARN, msg=path + ":ffprobe failed. use temp wav. detail:" + str(e))
+            return None
+        astreams = [stream for stream in streamslist if stream.get("codec_type") == "audio"]
+        if streamindex >= len(astreams):
+            self.__msgandlogging(level=logging.WARN,
+                                 msg=path + ":audio stream {0} not found. use temp wav.".format(streamindex))
+            return None
+        astream = astreams[streamindex]
+
+        samplerate = int(astream["sample_rate"])
+        if outchannels is None:
+            outchannels = int(astream["channels"])
+
+        # predict samples for progress
+        nframes = int(float(astream.get("duration", 0)) * samplerate)
+
+        head_sssec = None
+        tail_sssec = None
+        if trim:
+            head_sssec, tail_sssec = self.trim_secs(honbenalone)
+
+        if head_sssec:
+            nframes -= pcmreader.sec_to_frames(head_sssec, samplerate)
+        if tail_sssec:
+            nframes = min(nframes, pcmreader.sec_to_frames(tail_sssec, samplerate))
+
+        sources = []
+        for name, mapargs in maplist:
+
+            cmdlist = self.ffmpeg_pipe_cmdlist.copy()
+            cmdlist[5] = path
+            cmdlist[8] = aformat
+            cmdlist[10] = rawfmt
+
+            cmdlist[7:7] = mapargs
+
+            if tail_sssec:
+                # "-t"
+                cmdlist[6:6] = ["-t", str(tail_sssec)]
+            if head_sssec:
+                # "-ss"
+                ssindex = 6 if outputseek else 4
+                cmdlist[ssindex:ssindex] = ["-ss", str(head_sssec)]
+            if inputargs:
+                cmdlist[4:4] = inputargs
+
+            sourcename = QFileInfo(path).fileName() + "_" + name
+            sources.append(pcmreader.PipeSource(cmdlist, sourcename, outchannels, sampwidth, samplerate, max(nframes, 0),
+                                                rawfmt.startswith("f")))
+            self.__msgandlogging(name + ":pipe source:" + " ".join(cmdlist))
+
+        return sources
 
     def ffmpeg_div_command(self, path, modename):
 
@@ -3377,6 +3988,10 @@ if __name__ == '__main__':
     from PySide2 import QtWidgets, QtCore
     from PySide2 import QtCore
     from mainwindow import MainWindow
+    import multiprocessing
+
+    # v160 HASHPOOL_PROCESS worker of frozen(pyinstaller) app
+    multiprocessing.freeze_support()
 
     app = QtWidgets.QApplication(sys.argv)
     window = MainWindow(app)
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# Frame analyzers for WavChecker.
+# hash_source reads every block once and gives it to frame hash and to all analyzers of the task,
+# so an additional analysis doesn't add another read of the file.
+# analyzer is registered by name(register_analyzer), proc_wavhash4(analyzers=(name, ...)) runs it
+# and the value is result.analyses[name].
+# names are given to hash tasks(picklable for process pool), register at import time of this module.
+
+import math
+
+import numpy
+import xxhash
+
+import pcmalign
+
+
+class FrameBlock:
+    # one read block for analyzers.
+    # view is memoryview of reader(mmap, no copy), valid only while block() is called.
+    # offsets are byte offsets of frame slices in view(offsets[-1] is end of last frame).
+    # floatsamples=True is float pcm, samples() is float(full scale 1.0).
+    # bigendian=True is big endian pcm(QT native byte order), samples() are decoded from it.
+
+    def __init__(self, view, offsets, nchannels, sampwidth, floatsamples=False, bigendian=False):
+        self.view = view
+        self.offsets = offsets
+        self.nchannels = nchannels
+        self.sampwidth = sampwidth
+        self.floatsamples = floatsamples
+        self.bigendian = bigendian
+        self.framesize = nchannels * sampwidth
+        self._samples = None
+        self._starts = None
+        self._planes = None
+
+    def samples(self):
+        # int64(float64 if floatsamples) sample array (sample num, nchannels), decoded once for all analyzers
+        if self._samples is None:
+            samples = pcmalign.pcm_samples(self.view[:self.offsets[-1]], self.nchannels, self.sampwidth,
+                                           self.floatsamples, self.bigendian)
+            self._samples = samples if self.floatsamples else samples.astype(numpy.int64)
+        return self._samples
+
+    def planes(self):
+        # de-interleaved bytes, uint8 array (nchannels, sample num * sampwidth), made once for all analyzers
+        if self._planes is None:
+            raw = numpy.frombuffer(self.view, dtype=numpy.uint8, count=self.offsets[-1])
+            self._planes = numpy.ascontiguousarray(
+                raw.reshape(-1, self.nchannels, self.sampwidth).transpose(1, 0, 2)).reshape(self.nchannels, -1)
+        return self._planes
+
+    def starts(self):
+        # first sample index of every frame
+        if self._starts is None:
+            self._starts = [offset // self.framesize for offset in self.offsets[:-1]]
+        return self._starts
+
+
+class FrameAnalyzer:
+    # base of analyzers, one instance is made for one hash task(path or segment).
+    # block() is called for every block of frame hashing(not for total only hashing),
+    # value() is stored to result.analyses[name] after last block.
+    # stitch() joins values of segments(in segment order) of one path.
+
+    name = None
+
+    def __init__(self, nchannels, sampwidth, floatsamples=False):
+        self.nchannels = nchannels
+        self.sampwidth = sampwidth
+        self.floatsamples = floatsamples
+        self.blocks = []
+
+    def block(self, frameblock):
+        pass
+
+    def value(self):
+        return None
+
+    @staticmethod
+    def stitch(values, frameindices=None, framecount=None):
+        # frameindices(first frame index of each value) and framecount are given when segments are not
+        # continuous(coarse diff), frames which are not analyzed are 0.
+        if frameindices is None:
+            return numpy.concatenate(values)
+        stitched = numpy.zeros((framecount,) + values[0].shape[1:], dtype=values[0].dtype)
+        for index, value in zip(frameindices, values):
+            stitched[index:index + len(value)] = value
+        return stitched
+
+
+ANALYZERS = {}
+
+
+def register_analyzer(cls):
+    ANALYZERS[cls.name] = cls
+    return cls
+
+
+def make_analyzers(names, nchannels, sampwidth, floatsamples=False):
+    return [ANALYZERS[name](nchannels, sampwidth, floatsamples) for name in names]
+
+
+def reduce_peaks(samples, starts):
+    highs = numpy.maximum.reduceat(samples, starts, axis=0)
+    lows = numpy.minimum.reduceat(samples, starts, axis=0)
+    return numpy.maximum(highs, -lows)
+
+
+@register_analyzer
+class PeakAnalyzer(FrameAnalyzer):
+    # abs sample value peak of every frame and channel, numpy (frames, nchannels). 0 is digital silence.
+    # float pcm is float peak(full scale 1.0).
+
+    name = "peaks"
+
+    def block(self, frameblock):
+        self.blocks.append(reduce_peaks(frameblock.samples(), frameblock.starts()))
+
+    def value(self):
+        if not self.blocks:
+            return numpy.zeros((0, self.nchannels), dtype=numpy.float64 if self.floatsamples else numpy.int64)
+        return numpy.concatenate(self.blocks)
+
+
+@register_analyzer
+class NullAnalyzer(FrameAnalyzer):
+    # peak of null residual of channel pairs(1+2, 3+4 ...) of every frame, numpy (frames, nchannels // 2).
+    # 0 if one of pair is polarity inverted copy of the other.
+
+    name = "nullpeaks"
+
+    def block(self, frameblock):
+        samples = frameblock.samples()
+        pairs = self.nchannels // 2
+        self.blocks.append(reduce_peaks(samples[:, 0:pairs * 2:2] + samples[:, 1:pairs * 2:2], frameblock.starts()))
+
+    def value(self):
+        if not self.blocks:
+            return numpy.zeros((0, self.nchannels // 2), dtype=numpy.float64 if self.floatsamples else numpy.int64)
+        return numpy.concatenate(self.blocks)
+
+
+@register_analyzer
+class DcOffsetAnalyzer(FrameAnalyzer):
+    # mean sample value(DC offset) of every frame and channel, numpy float (frames, nchannels).
+
+    name = "dcoffset"
+
+    def block(self, frameblock):
+        starts = frameblock.starts()
+        sums = numpy.add.reduceat(frameblock.samples(), starts, axis=0)
+        lengths = numpy.diff(starts + [len(frameblock.samples())])
+        self.blocks.append(sums / lengths[:, None])
+
+    def value(self):
+        if not self.blocks:
+            return numpy.zeros((0, self.nchannels))
+        return numpy.concatenate(self.blocks)
+
+
+@register_analyzer
+class ChannelDigestAnalyzer(FrameAnalyzer):
+    # xxh3_64 intdigest of every frame of every channel of interleaved pcm, numpy uint64 (frames, nchannels).
+    # channels are de-interleaved from the same block as interleaved frame digest(no channelsplit).
+
+    name = "chdigests"
+
+    def block(self, frameblock):
+        planes = frameblock.planes()
+        # frame byte offsets in one channel
+        offsets = [offset // self.nchannels for offset in frameblock.offsets]
+        digests = numpy.empty((len(offsets) - 1, self.nchannels), dtype=numpy.uint64)
+        for ch in range(self.nchannels):
+            plane = memoryview(planes[ch])
+            digests[:, ch] = [xxhash.xxh3_64_intdigest(plane[offsets[k]:offsets[k + 1]]) for k in range(len(offsets) - 1)]
+        self.blocks.append(digests)
+
+    def value(self):
+        if not self.blocks:
+            return numpy.zeros((0, self.nchannels), dtype=numpy.uint64)
+        return numpy.concatenate(self.blocks)
+
+
+def loud_frames(peaks):
+    # frame indices which are not digital silence(any channel)
+    return numpy.flatnonzero(peaks.max(axis=1, initial=0)).tolist()
+
+
+def channel_levels(peaks):
+    # [(peak, not silent frame num), ...] of every channel
+    return list(zip(peaks.max(axis=0, initial=0).tolist(), numpy.count_nonzero(peaks, axis=0).tolist()))
+
+
+def full_scale(sampwidth, floatsamples=False):
+    # abs sample value of 0dBFS
+    return 1.0 if floatsamples else 1 << (sampwidth * 8 - 1)
+
+
+def db_limit(db, sampwidth, floatsamples=False):
+    # dBFS -> abs sample value
+    limit = full_scale(sampwidth, floatsamples) * 10 ** (db / 20)
+    return limit if floatsamples else int(limit)
+
+
+def peak_dbfs(peak, sampwidth, floatsamples=False):
+    if peak <= 0:
+        return float("-inf")
+    return 20 * math.log10(peak / full_scale(sampwidth, floatsamples))
@@ -0,0 +1,628 @@
+# -*- coding: utf-8 -*-
+# Frame hashing helpers for WavChecker.
+# proc_wavhash4 reads large blocks(several MiB) and hashes the frame slices of each block.
+# Frame boundaries of a block are precomputed from the frame size cadence(Pro Tools 23.98/29.97 pattern).
+
+import time
+from array import array
+
+import numpy
+import xxhash
+
+import frameanalyzer
+import pcmreader
+
+BLOCKBYTES = 1024 * 1024 * 8  # read size of one block(about)
+TOTALBLOCKBYTES = 1024 * 1024 * 64  # read size of total only hashing
+COARSESECONDS = 1  # coarse digest unit of total only hashing(about)
+
+
+def frame_cadence(samplerate, fps):
+    # return (oneframe_sz, frame samples list of one cadence cycle)
+    # fps is OPDICT_FPS string.
+
+    if samplerate == 44100:
+        ma_fps = 30  # force 30 = 44100/30 = 1470(sample)
+    elif fps == "23.98":
+        ma_fps = 24  # syakuchou
+    elif fps == "29.97":
+        ma_fps = 30  # syakuchou
+    else:
+        ma_fps = float(fps)
+
+    oneframe_sz = int(samplerate / ma_fps)
+
+    if fps == "23.98":
+        # 23.98s is oneframe_sz + 1000/1 sample, 48000 -> 2(2002), 96000 -> 4(4004)
+        cadence = [oneframe_sz + int(oneframe_sz / 1000)]
+
+    elif fps == "29.97":
+        # protools sample cycle list
+        # 48khz               96khz
+        # 1frame = 2(sample), 3(sample)
+        # 2frame = 1        , 3
+        # 3frame = 2        , 4
+        # 4frame = 1        , 3
+        # 5frame = 2        , 3
+        if samplerate == 48000:
+            cadence = [oneframe_sz + 2, oneframe_sz + 1, oneframe_sz + 2, oneframe_sz + 1, oneframe_sz + 2]
+        elif samplerate == 96000:
+            cadence = [oneframe_sz + 3, oneframe_sz + 3, oneframe_sz + 4, oneframe_sz + 3, oneframe_sz + 3]
+        else:
+            cadence = [oneframe_sz]  # undefined.
+    else:
+        cadence = [oneframe_sz]
+
+    return oneframe_sz, cadence
+
+
+def coarse_cadence(cadence, samplerate, seconds=COARSESECONDS):
+    # frame samples list of one coarse unit(whole cadence cycles of about seconds)
+    cycles = max(int(round(samplerate * seconds / sum(cadence))), 1)
+    return cadence * cycles
+
+
+def block_table(cadence, framesize, blockbytes=BLOCKBYTES):
+    # return (block samples, byte offset list of frames in block(frames + 1))
+    # block is whole cadence cycles, so every block starts at cycle head.
+
+    cyclebytes = sum(cadence) * framesize
+    cycles = max(blockbytes // cyclebytes, 1)
+
+    offsets = [0]
+    for _ in range(cycles):
+        for samples in cadence:
+            offsets.append(offsets[-1] + samples * framesize)
+
+    return sum(cadence) * cycles, offsets
+
+
+def hash_frames(view, offsets):
+    # intdigest(uint64) of each frame slice in block
+    return [xxhash.xxh3_64_intdigest(view[offsets[k]:offsets[k + 1]]) for k in range(len(offsets) - 1)]
+
+
+def short_offsets(offsets, nbytes):
+    # frame offsets of last(short) block
+    wk_offsets = [offset for offset in offsets if offset < nbytes]
+    wk_offsets.append(nbytes)
+    return wk_offsets
+
+
+def frame_index(pos, cadence, startpos, nframes):
+    # frame index which includes sample pos (frame start <= pos <= frame end)
+    # startpos is first frame start sample. return None if no frame includes pos.
+
+    if pos < startpos:
+        return None
+
+    cyclesamples = sum(cadence)
+    cycle, rem = divmod(pos - startpos, cyclesamples)
+    index = cycle * len(cadence)
+
+    if rem == 0 and index > 0:
+        # end of previous frame
+        index -= 1
+    else:
+        end = 0
+        for samples in cadence:
+            end += samples
+            if rem <= end:
+                break
+            index += 1
+
+    if index >= nframes:
+        return None
+    return index
+
+
+def frame_start(index, cadence, startpos=0):
+    # start sample of frame index
+    cycle, rem = divmod(index, len(cadence))
+    return startpos + cycle * sum(cadence) + sum(cadence[:rem])
+
+
+def sample_frame(pos, cadence):
+    # (frame index, sample offset in frame) of sample pos(from first frame start)
+    cycle, rem = divmod(pos, sum(cadence))
+    index = cycle * len(cadence)
+    for samples in cadence:
+        if rem < samples:
+            break
+        rem -= samples
+        index += 1
+    return index, rem
+
+
+def mismatch_runs(srcdigests, orgdigests, length):
+    # compare first length frames of two uint64 digest arrays.
+    # return error sections [(start frame, end frame(exclusive)), ...]
+
+    if length <= 0:
+        return []
+
+    src = numpy.frombuffer(srcdigests, dtype=numpy.uint64, count=length)
+    org = numpy.frombuffer(orgdigests, dtype=numpy.uint64, count=length)
+
+    return flag_runs(src != org)
+
+
+def flag_runs(flags):
+    # runs of True [(start, end(exclusive)), ...]
+    padded = numpy.zeros(len(flags) + 2, dtype=bool)
+    padded[1:-1] = flags
+
+    # rising/falling edge of flags
+    edges = numpy.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(edges[0::2].tolist(), edges[1::2].tolist()))
+
+
+def channel_mismatch_runs(srcdigests, orgdigests, sections):
+    # differ frame runs of every channel(frameanalyzer chdigests) only in sections [(start, end(exclusive)), ...]
+    length = min(len(srcdigests), len(orgdigests))
+    insections = numpy.zeros(length, dtype=bool)
+    for start, end in sections:
+        insections[start:end] = True
+    differ = (srcdigests[:length] != orgdigests[:length]) & insections[:, None]
+    return [flag_runs(differ[:, ch]) for ch in range(differ.shape[1])]
+
+
+def threshold_runs(values, limit):
+    # runs of frames whose value is over limit [(start, end(exclusive), max value of run), ...]
+    return [(start, end, values[start:end].max().item()) for start, end in flag_runs(values > limit)]
+
+
+class FrameHashResult:
+    # hash result of one path(channel) of proc_wavhash4
+
+    def __init__(self, path):
+        self.path = path
+        self.params = None
+        self.chunksize = 0
+        self.nchannels = 0
+        self.sampwidth = 0
+        self.samplerate = 0
+        self.oneframe_sz = 0
+        self.cadence = []
+        self.blocksamples = 0
+        self.blockframes = 0
+        self.progressmax = 0    # byte
+        self.progress = 0       # byte
+        self.digests = array('Q')
+        self.framecount = 0     # frame num of path(frame slices from startpos)
+        self.coarse = array('Q')  # coarse unit digests of total only hashing
+        self.coarsesamples = 0
+        self.coarseframes = 0
+        self.total = None       # xxh3_64 hexdigest of all pcm
+        self.lastframe = None
+        self.lastprevframe = None
+        self.shortframe = None  # sample num of last frame if it is shorter than 1 frame
+        self.cinexshort = False  # last frame is still short after cinex tail append
+        self.cinexindex = None  # frame index of cinex diff pos
+        self.analyses = {}      # frame analyzer name -> value(see frameanalyzer)
+        self.channels = []      # channel results of split hashing
+        self.startpos = 0       # first frame start sample
+        self.endpos = 0         # sample position after last read
+        self.elapsed = 0.0
+        self.error = None       # open error
+        self.returncode = None  # pipe returncode
+        self.pipeerrors = ""
+
+
+def hash_source(path, fps, cinexcheck=False, headbytes=0, tailbytes=b'', cinexpos=None, segment=None,
+                totalonly=False, analyzers=(), progress=None, cancelled=None, split=False):
+    # hash every frame of one path(wav path or pcmreader source).
+    # segment=(start sample, sample num or None(to end)) hashes only a part of path(see plan_segments).
+    # totalonly=True hashes total of all pcm with huge block and coarse unit(about 1 second) digests,
+    # no frame digest and no lastframe.
+    # analyzers(frameanalyzer names) get the same blocks as frame digests, values are result.analyses.
+    # split=True hashes every channel of interleaved path from the same read(no channelsplit),
+    # results of channels are result.channels(same as hashing pcmreader.ChannelSource of each channel).
+    # progress(result, readbytes) is called after open(readbytes=0) and after each block.
+    # cancelled() returns True to stop.
+
+    result = FrameHashResult(path)
+
+    try:
+        wf = pcmreader.open_pcm(path)
+    except Exception as e:
+        result.error = e
+        return result
+
+    result.params = wf.getparams()
+    result.chunksize = wf.getchunksize()
+    result.nchannels = wf.getnchannels()
+    result.sampwidth = wf.getsampwidth()
+    result.samplerate = wf.getframerate()
+    result.progressmax = wf.getnframes() * result.sampwidth * result.nchannels
+
+    framesize = result.sampwidth * result.nchannels
+    oneframe_sz, cadence = frame_cadence(result.samplerate, fps)
+    result.oneframe_sz = oneframe_sz
+    result.cadence = cadence
+
+    if totalonly:
+        coarsecadence = coarse_cadence(cadence, result.samplerate)
+        result.coarsesamples = sum(coarsecadence)
+        result.coarseframes = len(coarsecadence)
+        blocksamples, blockoffsets = block_table(coarsecadence, framesize, TOTALBLOCKBYTES)
+        coarseoffsets = blockoffsets[::len(coarsecadence)]
+    else:
+        blocksamples, blockoffsets = block_table(cadence, framesize)
+    result.blocksamples = blocksamples
+    result.blockframes = len(blockoffsets) - 1
+
+    # hashed pcm streams [(result, total hash), ...], interleave or every channel
+    if split:
+        result.channels = [channel_result(result, pcmreader.ChannelSource(path, ch, "ch" + str(ch)))
+                           for ch in range(result.nchannels)]
+        streams = [(chresult, xxhash.xxh3_64()) for chresult in result.channels]
+    else:
+        streams = [(result, xxhash.xxh3_64())]
+
+    if progress:
+        progress(result, 0)
+
+    time_start = time.perf_counter()
+    floatsamples = pcmreader.is_float(result.params)
+    bigendian = pcmreader.is_bigendian(result.params)
+    stages = [] if totalonly else frameanalyzer.make_analyzers(analyzers, result.nchannels, result.sampwidth,
+                                                               floatsamples)
+
+    remain = None
+    if segment is not None:
+        wf.setpos(segment[0])
+        remain = segment[1]
+    elif headbytes:
+        # cinex diff yomisute
+        wf.readframes(headbytes // framesize)
+    result.startpos = wf.tell()
+
+    while True:
+
+        if remain is None:
+            oneblock = wf.readframes(blocksamples)
+        else:
+            oneblock = wf.readframes(min(blocksamples, remain))
+            remain -= len(oneblock) // framesize
+        result.progress += len(oneblock)
+
+        if progress:
+            progress(result, len(oneblock))
+
+        # no read data
+        if not oneblock or (cancelled and cancelled()):
+            break
+
+        view = memoryview(oneblock)
+        offsets = blockoffsets
+        coffsets = coarseoffsets if totalonly else None
+        if len(view) < blockoffsets[-1]:
+            # last block
+            offsets = short_offsets(blockoffsets, len(view))
+            if totalonly:
+                coffsets = short_offsets(coarseoffsets, len(view))
+        result.framecount += len(offsets) - 1
+
+        frameblock = None
+        if stages or split:
+            frameblock = frameanalyzer.FrameBlock(view, offsets, result.nchannels, result.sampwidth, floatsamples,
+                                                  bigendian)
+        for stage in stages:
+            stage.block(frameblock)
+
+        if split:
+            # de-interleave once, offsets of one channel are 1/nchannels
+            planes = frameblock.planes()
+            nchannels = result.nchannels
+            choffsets = [offset // nchannels for offset in offsets]
+            chcoffsets = [offset // nchannels for offset in coffsets] if totalonly else None
+            for ch, (chresult, chtotal) in enumerate(streams):
+                hash_block(chresult, chtotal, memoryview(planes[ch]), choffsets, chcoffsets, cinexcheck, tailbytes)
+        else:
+            hash_block(result, streams[0][1], view, offsets, coffsets, cinexcheck, tailbytes)
+
+    result.endpos = wf.tell()
+    for stage in stages:
+        result.analyses[stage.name] = stage.value()
+
+    result.returncode = wf.close()
+    if pcmreader.is_pipe(path):
+        result.pipeerrors = wf.geterrors()
+    else:
+        result.returncode = None
+
+    for streamresult, streamtotal in streams:
+        # cinex diff frame index from sample position
+        if segment is None and not totalonly and cinexcheck and cinexpos and cinexpos <= result.endpos:
+            streamresult.cinexindex = frame_index(cinexpos, cadence, result.startpos, len(streamresult.digests))
+        streamresult.total = streamtotal.hexdigest()
+
+    result.elapsed = time.perf_counter() - time_start
+    for chresult in result.channels:
+        for name in ("progress", "framecount", "startpos", "endpos", "returncode", "pipeerrors", "elapsed"):
+            setattr(chresult, name, getattr(result, name))
+        chresult.progress //= result.nchannels
+    return result
+
+
+def channel_result(result, path):
+    # result of one channel of interleave result(hash_source split)
+    chresult = FrameHashResult(path)
+    for name in ("chunksize", "sampwidth", "samplerate", "oneframe_sz", "cadence", "blocksamples", "blockframes",
+                 "coarsesamples", "coarseframes"):
+        setattr(chresult, name, getattr(result, name))
+    chresult.params = (1,) + tuple(result.params[1:])
+    chresult.nchannels = 1
+    chresult.progressmax = result.progressmax // result.nchannels
+    return chresult
+
+
+def hash_block(result, total, view, offsets, coffsets, cinexcheck=False, tailbytes=b''):
+    # hash one block(frame slices offsets) of pcm stream of result.
+    # coffsets is coarse unit offsets of total only hashing(None = every frame hashing).
+
+    framesize = result.sampwidth * result.nchannels
+    oneframe_sz_byte = result.oneframe_sz * framesize
+
+    total.update(view)
+
+    lastblock = view[offsets[-2]:offsets[-1]]
+
+    if coffsets is not None:
+        coarsedigests = hash_frames(view, coffsets)
+        if len(lastblock) < oneframe_sz_byte:
+            result.shortframe = len(lastblock) / framesize
+            if cinexcheck:
+                total.update(tailbytes)
+                coarsedigests[-1] = xxhash.xxh3_64_intdigest(bytes(view[coffsets[-2]:coffsets[-1]]) + tailbytes)
+                if len(lastblock) + len(tailbytes) < oneframe_sz_byte:
+                    result.cinexshort = True
+        result.coarse.extend(coarsedigests)
+        return
+
+    framedigests = hash_frames(view, offsets)
+
+    # lastframe is not satisfyed 1frame samples?
+    if len(lastblock) < oneframe_sz_byte:
+        result.shortframe = len(lastblock) / framesize
+        if cinexcheck:
+            # cinex zure hosei from org ketsu data
+            lastblock = bytes(lastblock) + tailbytes
+            total.update(tailbytes)
+            framedigests[-1] = xxhash.xxh3_64_intdigest(lastblock)
+            if len(lastblock) < oneframe_sz_byte:
+                result.cinexshort = True
+
+    result.digests.extend(framedigests)
+
+    # memoryview of mmap is saved without copy, map is alive while lastframe refers it.
+    if len(offsets) > 2:
+        result.lastprevframe = view[offsets[-3]:offsets[-2]]
+    else:
+        result.lastprevframe = result.lastframe
+    result.lastframe = lastblock
+
+
+# cancel event of process pool worker(set by init_process)
+CANCELEVENT = None
+
+
+def init_process(cancelevent):
+    # ProcessPoolExecutor initializer, multiprocessing.Event is shared at process start(not picklable in task).
+    global CANCELEVENT
+    CANCELEVENT = cancelevent
+
+
+def hash_source_process(path, fps, cinexcheck=False, headbytes=0, tailbytes=b'', cinexpos=None, segment=None,
+                        totalonly=False, analyzers=(), split=False):
+    # hash_source for process pool, result is returned by pickle.
+    # stops at next block when CANCELEVENT is set.
+    cancelled = CANCELEVENT.is_set if CANCELEVENT is not None else None
+    result = hash_source(path, fps, cinexcheck, headbytes, tailbytes, cinexpos, segment, totalonly, analyzers,
+                         cancelled=cancelled, split=split)
+    if result.error is not None:
+        result.error = str(result.error)
+    for streamresult in [result] + result.channels:
+        if streamresult.lastframe is not None:
+            streamresult.lastframe = bytes(streamresult.lastframe)
+        if streamresult.lastprevframe is not None:
+            streamresult.lastprevframe = bytes(streamresult.lastprevframe)
+    return result
+
+
+def plan_segments(path, fps, shards, headbytes=0, totalonly=False):
+    # split path into shards segments of whole cadence cycles for hash_source(segment=).
+    # totalonly segments are whole coarse units, so coarse digests of segments are joined as they are.
+    # return [(start sample, sample num or None(last)), ...] or None if path can't seek(pipe).
+
+    if shards <= 1 or pcmreader.is_pipe(path):
+        return None
+
+    wf = pcmreader.open_pcm(path)
+    framesize = wf.getsampwidth() * wf.getnchannels()
+    nframes = wf.getnframes()
+    _, cadence = frame_cadence(wf.getframerate(), fps)
+    if totalonly:
+        cadence = coarse_cadence(cadence, wf.getframerate())
+    wf.close()
+
+    startpos = headbytes // framesize
+    cyclesamples = sum(cadence)
+    cycles = (nframes - startpos) // cyclesamples
+    if cycles < shards * 2:
+        # too short
+        return None
+
+    segsamples = -(-cycles // shards) * cyclesamples
+    segments = []
+    start = startpos
+    # last segment also reads the rest after whole cycles
+    while len(segments) < shards - 1 and start + segsamples < nframes:
+        segments.append((start, segsamples))
+        start += segsamples
+    segments.append((start, None))
+
+    return segments
+
+
+def stitch_results(results, cinexcheck=False, cinexpos=None, frameindices=None, framecount=None):
+    # join segment results of one path(in segment order) to one result
+    # frameindices(first frame index of each segment) and framecount are given when segments are not
+    # continuous(descend of coarse diff), frames which are not hashed have digest 0.
+    # total is digests_total of frame digests(coarse digests of total only hashing).
+
+    for result in results:
+        if result.error is not None:
+            return result
+
+    first = results[0]
+    last = results[-1]
+
+    stitched = FrameHashResult(first.path)
+    for name in ("params", "chunksize", "nchannels", "sampwidth", "samplerate", "oneframe_sz", "cadence",
+                 "blocksamples", "blockframes", "progressmax", "shortframe", "cinexshort", "coarsesamples",
+                 "coarseframes"):
+        setattr(stitched, name, getattr(last if name in ("shortframe", "cinexshort") else first, name))
+
+    if frameindices is not None:
+        stitched.digests = array('Q', bytes(framecount * stitched.digests.itemsize))
+
+    for k, result in enumerate(results):
+        stitched.progress += result.progress
+        stitched.framecount += result.framecount
+        stitched.coarse.extend(result.coarse)
+        if frameindices is None:
+            stitched.digests.extend(result.digests)
+        else:
+            stitched.digests[frameindices[k]:frameindices[k] + len(result.digests)] = result.digests
+        if result.lastframe is not None:
+            if result.lastprevframe is not None:
+                stitched.lastprevframe = result.lastprevframe
+            else:
+                stitched.lastprevframe = stitched.lastframe
+            stitched.lastframe = result.lastframe
+        if result.returncode and not stitched.returncode:
+            stitched.returncode = result.returncode
+            stitched.pipeerrors = result.pipeerrors
+        stitched.elapsed = max(stitched.elapsed, result.elapsed)
+
+    for name in first.analyses:
+        stitched.analyses[name] = frameanalyzer.ANALYZERS[name].stitch([result.analyses[name] for result in results],
+                                                                       frameindices, framecount)
+
+    stitched.startpos = first.startpos
+    if frameindices is not None:
+        # first segment starts at cadence cycle head
+        stitched.startpos -= frameindices[0] // len(stitched.cadence) * sum(stitched.cadence)
+    stitched.endpos = last.endpos
+    if frameindices is not None:
+        stitched.framecount = framecount
+
+    if cinexcheck and cinexpos and cinexpos <= stitched.endpos:
+        stitched.cinexindex = frame_index(cinexpos, stitched.cadence, stitched.startpos, len(stitched.digests))
+
+    stitched.total = digests_total(stitched.coarse if stitched.coarseframes else stitched.digests)
+    return stitched
+
+
+def digests_total(digests):
+    # total digest of sharded hashing, xxh3_64 of frame(or coarse) digest list(segments can't chain one stream hash)
+    return xxhash.xxh3_64_hexdigest(digests)
+
+
+def descend_runs(coarse, othercoarse):
+    # coarse unit runs [(start, end(exclusive)), ...] which must be hashed every frame.
+    # differ units and last 2 units(lastframe and lastprevframe) of both paths, clipped to own path.
+    # src and org get the same runs in common units, a frame hashed on one side is hashed on the other.
+
+    runs = mismatch_runs(coarse, othercoarse, min(len(coarse), len(othercoarse)))
+    for units in (len(coarse), len(othercoarse)):
+        if units:
+            runs.append((max(units - 2, 0), units))
+    return [(start, min(end, len(coarse))) for start, end in merge_runs(runs) if start < len(coarse)]
+
+
+def merge_runs(runs):
+    # sorted union of runs [(start, end(exclusive)), ...]
+    merged = []
+    for start, end in sorted(runs):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def keep_runs(digests, runs, coarseframes):
+    # frame digests of coarse unit runs only, other frames are 0(same as descend hashing of seekable path)
+    kept = array('Q', bytes(len(digests) * digests.itemsize))
+    for start, end in runs:
+        kept[start * coarseframes:end * coarseframes] = digests[start * coarseframes:end * coarseframes]
+    return kept
+
+
+def section_sample_diffs(srcresult, orgresult, sections, cancelled=None):
+    # sample exact diff of frame sections [(start frame, end frame(exclusive)), ...] in ascending order.
+    # only pcm of sections is read(pipe source reads forward).
+    # return [(first sample, last sample, differ sample num) or None, ...], sample is from section start frame.
+
+    framesize = srcresult.sampwidth * srcresult.nchannels
+    if framesize != orgresult.sampwidth * orgresult.nchannels:
+        return [None] * len(sections)
+
+    chunksamples = max(BLOCKBYTES // framesize, 1)
+    diffs = []
+
+    srcwf = pcmreader.open_pcm(srcresult.path)
+    try:
+        orgwf = pcmreader.open_pcm(orgresult.path)
+        try:
+            for start, end in sections:
+                if cancelled and cancelled():
+                    break
+
+                srcwf.setpos(frame_start(start, srcresult.cadence, srcresult.startpos))
+                orgwf.setpos(frame_start(start, orgresult.cadence, orgresult.startpos))
+                total = frame_start(end, srcresult.cadence) - frame_start(start, srcresult.cadence)
+
+                first = last = None
+                count = 0
+                pos = 0
+                while pos < total:
+                    n = min(chunksamples, total - pos)
+                    srcdata = srcwf.readframes(n)
+                    orgdata = orgwf.readframes(n)
+                    srcn = len(srcdata) // framesize
+                    orgn = len(orgdata) // framesize
+                    m = min(srcn, orgn)
+
+                    if m:
+                        src = numpy.frombuffer(srcdata, dtype=numpy.uint8, count=m * framesize).reshape(m, framesize)
+                        org = numpy.frombuffer(orgdata, dtype=numpy.uint8, count=m * framesize).reshape(m, framesize)
+                        index = numpy.flatnonzero((src != org).any(axis=1))
+                        if index.size:
+                            if first is None:
+                                first = pos + int(index[0])
+                            last = pos + int(index[-1])
+                            count += int(index.size)
+
+                    if srcn != orgn:
+                        # samples of only one side
+                        if first is None:
+                            first = pos + m
+                        last = pos + max(srcn, orgn) - 1
+                        count += max(srcn, orgn) - m
+
+                    if srcn < n or orgn < n:
+                        break
+                    pos += n
+
+                diffs.append((first, last, count) if count else None)
+        finally:
+            orgwf.close()
+    finally:
+        srcwf.close()
+
+    diffs.extend([None] * (len(sections) - len(diffs)))
+    return diffs
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import copy
+import os
 import pprint
 import sys
 import re
@@ -554,6 +555,7 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         # If pcm data is big endian, convert it to little endian.
         # The reason is that ffmpeg does not support bigendian WAV output using the RIFX header.
         # For Example. Baselight output QT is bigendian.
+        # v160 native reader(QT, OPDICT_NATIVEREADER) byteswaps while reading, aformat le doesn't need ffmpeg extraction.
         if self.source_audioformatdict.get("codec_name").endswith("be"):
             wk_aformat = self.source_audioformatdict.get("codec_name")
             result = wk_aformat[:-2] + "le"  # pcm_s24be -> pcm_s24le
@@ -625,6 +627,31 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         else:
             self.wavchecker.opdict[self.wavchecker.OPDICT_CINEXCHECK] = False
 
+        # v160 ffmpeg raw pcm pipe (no temporary wav)
+        self.wavchecker.opdict[self.wavchecker.OPDICT_FFMPEGPIPE] = True
+        # v160 QT/MXF pcm track is read without ffmpeg(unchecked = ffmpeg extraction)
+        self.wavchecker.opdict[self.wavchecker.OPDICT_NATIVEREADER] = self.checkBox_nativereader.isChecked()
+        # v160 big endian QT src and org are compared without byteswap(native reader only)
+        self.wavchecker.opdict[self.wavchecker.OPDICT_NATIVEBYTEORDER] = self.checkBox_nativebyteorder.isChecked()
+        # v160 channels(split wav/tracks) are hashed in parallel
+        self.wavchecker.opdict[self.wavchecker.OPDICT_HASHWORKERS] = os.cpu_count() or 1
+        self.wavchecker.opdict[self.wavchecker.OPDICT_HASHPOOL] = self.wavchecker.HASHPOOL_THREAD
+        # v160 long wav is split to segments when channels are less than workers
+        self.wavchecker.opdict[self.wavchecker.OPDICT_HASHSHARDS] = os.cpu_count() or 1
+        # v160 total hash first, frame hash only when src and org are not same
+        self.wavchecker.opdict[self.wavchecker.OPDICT_TWOPHASE] = True
+        # v160 second pass hashes frames only in differ seconds(unchecked = second pass hashes every frame)
+        self.wavchecker.opdict[self.wavchecker.OPDICT_COARSEDIFF] = self.checkBox_coarsediff.isChecked()
+        # v160 sample insert/drop is located when src and org are not same
+        self.wavchecker.opdict[self.wavchecker.OPDICT_SLIPCHECK] = True
+        # v160 cinex offset by cross correlation when src is not bit exact around insert
+        self.wavchecker.opdict[self.wavchecker.OPDICT_XCORR] = True
+        # v160 MUON check near silence and L+R null residual(phase inversion check) threshold
+        self.wavchecker.opdict[self.wavchecker.OPDICT_SILENCEDB] = -60.0
+        self.wavchecker.opdict[self.wavchecker.OPDICT_NULLDB] = -90.0
+        # v160 interleave wav is also hashed every channel(differ channel is reported)
+        self.wavchecker.opdict[self.wavchecker.OPDICT_CHANNELDIGESTS] = True
+
         # Interleave <-> Interleave
         if self.comboBox_source.currentIndex() == 0:
 
@@ -238,7 +238,7 @@ class Ui_MainWindow(object):
 
         self.groupBox_audio = QGroupBox(self.groupBox_source)
         self.groupBox_audio.setObjectName(u"groupBox_audio")
-        self.groupBox_audio.setMaximumSize(QSize(16777215, 220))
+        self.groupBox_audio.setMaximumSize(QSize(16777215, 300))
         self.groupBox_audio.setFont(font2)
         self.verticalLayout_5 = QVBoxLayout(self.groupBox_audio)
         self.verticalLayout_5.setObjectName(u"verticalLayout_5")
@@ -256,6 +256,24 @@ class Ui_MainWindow(object):
 
         self.verticalLayout_5.addWidget(self.checkBox_force16bit)
 
+        self.checkBox_nativereader = QCheckBox(self.groupBox_audio)
+        self.checkBox_nativereader.setObjectName(u"checkBox_nativereader")
+        self.checkBox_nativereader.setFont(font2)
+
+        self.verticalLayout_5.addWidget(self.checkBox_nativereader)
+
+        self.checkBox_nativebyteorder = QCheckBox(self.groupBox_audio)
+        self.checkBox_nativebyteorder.setObjectName(u"checkBox_nativebyteorder")
+        self.checkBox_nativebyteorder.setFont(font2)
+
+        self.verticalLayout_5.addWidget(self.checkBox_nativebyteorder)
+
+        self.checkBox_coarsediff = QCheckBox(self.groupBox_audio)
+        self.checkBox_coarsediff.setObjectName(u"checkBox_coarsediff")
+        self.checkBox_coarsediff.setFont(font2)
+
+        self.verticalLayout_5.addWidget(self.checkBox_coarsediff)
+
 
         self.verticalLayout_2.addWidget(self.groupBox_audio)
 
@@ -568,7 +586,10 @@ class Ui_MainWindow(object):
         QWidget.setTabOrder(self.lineEdit_videoin, self.lineEdit_videohonben)
         QWidget.setTabOrder(self.lineEdit_videohonben, self.checkBox_videoswapsrcorg)
         QWidget.setTabOrder(self.checkBox_videoswapsrcorg, self.checkBox_force16bit)
-        QWidget.setTabOrder(self.checkBox_force16bit, self.checkBox_cinex)
+        QWidget.setTabOrder(self.checkBox_force16bit, self.checkBox_nativereader)
+        QWidget.setTabOrder(self.checkBox_nativereader, self.checkBox_nativebyteorder)
+        QWidget.setTabOrder(self.checkBox_nativebyteorder, self.checkBox_coarsediff)
+        QWidget.setTabOrder(self.checkBox_coarsediff, self.checkBox_cinex)
         QWidget.setTabOrder(self.checkBox_cinex, self.pushButton_8ch_L)
         QWidget.setTabOrder(self.pushButton_8ch_L, self.lineEdit_8ch_L)
         QWidget.setTabOrder(self.lineEdit_8ch_L, self.pushButton_8ch_R)
@@ -631,6 +652,9 @@ class Ui_MainWindow(object):
         self.groupBox_audio.setTitle(QCoreApplication.translate("MainWindow", u"Audio:", None))
         self.label_sourceAudio.setText(QCoreApplication.translate("MainWindow", u"..", None))
         self.checkBox_force16bit.setText(QCoreApplication.translate("MainWindow", u"Force 16bit wav extract(for cinex insert)", None))
+        self.checkBox_nativereader.setText(QCoreApplication.translate("MainWindow", u"Read QT/MXF pcm without ffmpeg(native reader)", None))
+        self.checkBox_nativebyteorder.setText(QCoreApplication.translate("MainWindow", u"Compare big endian QT src/org without byteswap(native reader)", None))
+        self.checkBox_coarsediff.setText(QCoreApplication.translate("MainWindow", u"Second pass hashes frames only in differ seconds(coarse diff)", None))
         self.groupBox_original.setTitle(QCoreApplication.translate("MainWindow", u"Original Input/Information", None))
         self.checkBox_cinex.setText(QCoreApplication.translate("MainWindow", u"cinex insert bug check", None))
         self.lineEdit_2ch.setText("")
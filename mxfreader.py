@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+# MXF(OP1a/OP-Atom) pcm sound essence reader for WavChecker.
+# Scans KLV packets of the file once, collects sound essence elements per track
+# and reads pcm directly from the file, no ffmpeg decode and no temp wav.
+# supported essence: BWF/AES3 generic container(frame/clip wrapped), D-10 AES3 8ch(SMPTE 331M)
+# output is little endian pcm (same bytes as ffmpeg -acodec pcm_sXXle).
+
+import bisect
+import struct
+
+import pcmreader
+
+
+class MxfReaderError(pcmreader.PcmReaderError):
+    pass
+
+
+SMPTE_UL = b"\x06\x0e\x2b\x34"
+
+# essence element key: 06 0E 2B 34 01 02 01 xx 0D 01 03 01 [item type][count][element type][number]
+ESSENCE_ELEMENT_KEY = b"\x0d\x01\x03\x01"
+ITEM_CP_SOUND = 0x06    # D-10 sound
+ITEM_GC_SOUND = 0x16
+
+# header metadata local sets: 06 0E 2B 34 02 53 01 01 0D 01 01 01 01 01 [set type]
+METADATA_SET_KEY = b"\x0d\x01\x01\x01\x01\x01"
+SET_TIMELINETRACK = 0x3b
+SET_STATICTRACK = 0x3a
+SET_SOUNDDESCRIPTORS = (0x42, 0x47, 0x48)  # GenericSound, WaveAudio, AES3Audio
+
+# local tags
+TAG_TRACKID = 0x4801
+TAG_TRACKNUMBER = 0x4804
+TAG_LINKEDTRACKID = 0x3006
+TAG_AUDIOSAMPLINGRATE = 0x3d03
+TAG_CHANNELCOUNT = 0x3d07
+TAG_QUANTIZATIONBITS = 0x3d01
+
+# D-10 sound element: 4byte element header + 8 slots of 32bit AES3 subframe per sample
+D10_HEADERSIZE = 4
+D10_SLOTS = 8
+
+READBUFSIZE = 1024 * 1024
+
+
+def read_ber(f):
+    first = f.read(1)
+    if not first:
+        return None
+    if first[0] < 0x80:
+        return first[0]
+    n = first[0] & 0x7f
+    return int.from_bytes(f.read(n), "big")
+
+
+def parse_localset(value):
+    # tag(2) len(2) value... -> {tag: bytes}
+    tags = {}
+    pos = 0
+    while pos + 4 <= len(value):
+        tag, length = struct.unpack_from(">HH", value, pos)
+        tags[tag] = value[pos + 4:pos + 4 + length]
+        pos += 4 + length
+    return tags
+
+
+class MxfAudioTrack:
+    # one sound essence track(element) of MXF file
+
+    def __init__(self, path, tracknumber):
+        self.path = path
+        self.tracknumber = tracknumber  # essence element key byte 12-15
+        self.trackid = None
+        self.d10 = (tracknumber >> 24) == ITEM_CP_SOUND
+        self.nchannels = 0
+        self.sampwidth = 0
+        self.framerate = 0
+        self.elementoffsets = []   # file offset of each element value(after D-10 element header)
+        self.elementstarts = [0]   # first frame(sample) index of each element, last is total frames
+        self.nframes = 0
+
+    def getcodec(self):
+        return "pcm_s{0}le".format(self.sampwidth * 8)
+
+    def framesize(self):
+        return self.nchannels * self.sampwidth
+
+    def fileframesize(self):
+        # bytes of one sample in file
+        if self.d10:
+            return D10_SLOTS * 4
+        return self.framesize()
+
+    def getformat(self):
+        if self.d10:
+            return "D-10 AES3"
+        elif ((self.tracknumber >> 8) & 0xff) in (0x03, 0x04):
+            return "AES3"
+        else:
+            return "BWF"
+
+
+def parse_tracks(path):
+    # return MxfAudioTrack list of sound tracks(same order as ffmpeg 0:a:N)
+
+    elements = {}     # tracknumber -> [(offset, length), ...]
+    tracks = {}       # TrackNumber -> TrackID
+    descriptors = []  # sound descriptor tags
+
+    with open(path, "rb", buffering=READBUFSIZE) as f:
+        while True:
+            key = f.read(16)
+            if len(key) < 16:
+                break
+            length = read_ber(f)
+            if length is None:
+                break
+            valuepos = f.tell()
+
+            if key[:4] == SMPTE_UL and key[4] == 0x01 and key[8:12] == ESSENCE_ELEMENT_KEY \
+                    and key[12] in (ITEM_GC_SOUND, ITEM_CP_SOUND):
+                tracknumber = int.from_bytes(key[12:16], "big")
+                elements.setdefault(tracknumber, []).append((valuepos, length))
+                f.seek(length, 1)
+
+            elif key[:4] == SMPTE_UL and key[5] == 0x53 and key[8:14] == METADATA_SET_KEY:
+                settype = key[14]
+                tags = parse_localset(f.read(length))
+                if settype in (SET_TIMELINETRACK, SET_STATICTRACK) and TAG_TRACKNUMBER in tags:
+                    tracks[struct.unpack(">I", tags[TAG_TRACKNUMBER])[0]] = struct.unpack(">I", tags[TAG_TRACKID])[0]
+                elif settype in SET_SOUNDDESCRIPTORS:
+                    descriptors.append(tags)
+
+            else:
+                f.seek(length, 1)
+
+    if not elements:
+        raise MxfReaderError("sound essence not found")
+
+    # descriptor of each track(LinkedTrackID), OP-Atom has only one descriptor without link.
+    descbytrackid = {}
+    for tags in descriptors:
+        if TAG_LINKEDTRACKID in tags:
+            descbytrackid[struct.unpack(">I", tags[TAG_LINKEDTRACKID])[0]] = tags
+
+    result = []
+    for tracknumber, elementlist in elements.items():
+        track = MxfAudioTrack(path, tracknumber)
+        track.trackid = tracks.get(tracknumber)
+
+        tags = descbytrackid.get(track.trackid)
+        if tags is None:
+            if len(descriptors) == 1 and len(elements) == 1:
+                tags = descriptors[0]
+            else:
+                raise MxfReaderError("sound descriptor not found:{0:08x}".format(tracknumber))
+
+        if TAG_AUDIOSAMPLINGRATE not in tags or TAG_CHANNELCOUNT not in tags or TAG_QUANTIZATIONBITS not in tags:
+            raise MxfReaderError("sound descriptor is not complete:{0:08x}".format(tracknumber))
+
+        num, den = struct.unpack(">ii", tags[TAG_AUDIOSAMPLINGRATE])
+        track.framerate = num // den
+        track.nchannels = struct.unpack(">I", tags[TAG_CHANNELCOUNT])[0]
+        bits = struct.unpack(">I", tags[TAG_QUANTIZATIONBITS])[0]
+
+        if bits not in (16, 24, 32) or (track.d10 and (bits == 32 or track.nchannels > D10_SLOTS)):
+            raise MxfReaderError("{0}:{1}bit {2}ch not supported".format(track.getformat(), bits, track.nchannels))
+        track.sampwidth = bits // 8
+
+        fileframesize = track.fileframesize()
+        total = 0
+        for offset, length in elementlist:
+            if track.d10:
+                offset += D10_HEADERSIZE
+                length -= D10_HEADERSIZE
+            track.elementoffsets.append(offset)
+            total += length // fileframesize
+            track.elementstarts.append(total)
+        track.nframes = total
+
+        result.append(track)
+
+    # file source package track order(TrackID), unknown tracks are last.
+    result.sort(key=lambda t: (t.trackid is None, t.trackid or 0, t.tracknumber))
+
+    return result
+
+
+def unpack_d10(data, nchannels, sampwidth):
+    # D-10 AES3 subframe(32bit little endian, audio is bit 4-27) -> pcm
+    # bit shift of whole block as one integer, every slot keeps own bits in its low 24(16) bits.
+    shift = 4 if sampwidth == 3 else 12
+    shifted = (int.from_bytes(data, "little") >> shift).to_bytes(len(data), "little")
+
+    nframes = len(data) // (D10_SLOTS * 4)
+    framesize = nchannels * sampwidth
+    out = bytearray(nframes * framesize)
+    for c in range(nchannels):
+        for k in range(sampwidth):
+            out[c * sampwidth + k::framesize] = shifted[c * 4 + k:nframes * D10_SLOTS * 4:D10_SLOTS * 4]
+    return bytes(out)
+
+
+class MxfSource:
+    # one sound track(or one channel of it) of MXF file.
+    # channel=None is all channels(interleave).
+
+    def __init__(self, track, name, channel=None):
+        self.track = track
+        self.name = name
+        self.channel = channel
+
+    def open(self):
+        return MxfPcmReader(self)
+
+    def __str__(self):
+        return self.name + "(mxf track{0:08x})".format(self.track.tracknumber)
+
+
+class MxfPcmReader:
+
+    def __init__(self, source):
+        self._track = source.track
+        self._channel = source.channel
+        self._fileframesize = self._track.fileframesize()
+        if self._channel is None:
+            self._nchannels = self._track.nchannels
+        else:
+            self._nchannels = 1
+        self._sampwidth = self._track.sampwidth
+        self._soundpos = 0
+        self._file = open(self._track.path, "rb", buffering=0)
+
+    def __del__(self):
+        self.close()
+
+    def getnchannels(self):
+        return self._nchannels
+
+    def getsampwidth(self):
+        return self._sampwidth
+
+    def getframerate(self):
+        return self._track.framerate
+
+    def getnframes(self):
+        return self._track.nframes
+
+    def getchunksize(self):
+        # first essence element offset
+        return self._track.elementoffsets[0] if self._track.elementoffsets else 0
+
+    def getparams(self):
+        return (self._nchannels, self._sampwidth, self._track.framerate, self._track.nframes,
+                self._track.getformat(), "MXF sound essence")
+
+    def tell(self):
+        return self._soundpos
+
+    def rewind(self):
+        self._soundpos = 0
+
+    def setpos(self, pos):
+        if pos < 0 or pos > self._track.nframes:
+            raise MxfReaderError("position not in range")
+        self._soundpos = pos
+
+    def readframes(self, nframes):
+
+        nframes = min(nframes, self._track.nframes - self._soundpos)
+        if nframes <= 0 or self._file is None:
+            return b''
+
+        elementstarts = self._track.elementstarts
+        elementoffsets = self._track.elementoffsets
+        framesize = self._fileframesize
+
+        pos = self._soundpos
+        end = pos + nframes
+        e = bisect.bisect_right(elementstarts, pos) - 1
+
+        blocks = []
+        while pos < end and e < len(elementoffsets):
+            inelement = pos - elementstarts[e]
+            readlen = min(elementstarts[e + 1], end) - pos
+            self._file.seek(elementoffsets[e] + inelement * framesize)
+            block = self._file.read(readlen * framesize)
+            blocks.append(block)
+            pos += len(block) // framesize
+            if len(block) < readlen * framesize:
+                # truncated file
+                break
+            e += 1
+
+        data = b''.join(blocks)
+        self._soundpos = pos
+
+        if self._track.d10:
+            data = unpack_d10(data, self._track.nchannels, self._sampwidth)
+        if self._channel is not None:
+            data = pcmreader.extract_channel(data, self._track.nchannels, self._sampwidth, self._channel)
+
+        return data
+
+    def close(self):
+        if getattr(self, "_file", None) is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,409 @@
+# -*- coding: utf-8 -*-
+# PCM alignment helpers for WavChecker.
+# rsync style rolling weak checksum over sample keys(one uint64 per sample, all channels),
+# every window position of a block is computed at once with cumulative sums(numpy), no python loop per sample.
+
+import bisect
+
+import numpy
+
+KEYPRIME = numpy.uint64(0x100000001B3)
+WEAKMUL = numpy.uint64(0x9E3779B97F4A7C15)
+
+SEARCHSECONDS = 30  # src read length of one search step
+ANCHORSECONDS = 0.1  # org anchor block length(slip shorter than this between two slips is not separated)
+ANCHORCANDIDATES = 8  # org blocks verified for one src position(silence etc. has many same blocks)
+
+XCORRSECONDS = 10    # org window length of cross correlation
+XCORRMAXSECONDS = 5  # max offset of cross correlation(same as cinex differ length)
+XCORRDECIMATE = 8    # decimation of first(coarse) cross correlation
+XCORRMINCOEF = 0.5   # normalized correlation less than this is not offset
+
+
+def sample_keys(data, framesize):
+    # uint64 key of each sample(frame of all channels)
+    nframes = len(data) // framesize
+    raw = numpy.frombuffer(data, dtype=numpy.uint8, count=nframes * framesize).reshape(nframes, framesize)
+
+    words = -(-framesize // 8)
+    padded = numpy.zeros((nframes, words * 8), dtype=numpy.uint8)
+    padded[:, :framesize] = raw
+    packed = padded.view("<u8")
+
+    keys = packed[:, 0].copy()
+    for w in range(1, words):
+        keys *= KEYPRIME
+        keys += packed[:, w]
+    return keys
+
+
+def rolling_weak(keys, window):
+    # weak checksum of every window(window samples) of keys, result[i] is window starts at i.
+    # a = sum(x), b = sum((window - j) * x[i + j]), uint64 wrap around.
+    n = len(keys)
+    if n < window or window <= 0:
+        return numpy.empty(0, dtype=numpy.uint64)
+
+    with numpy.errstate(over="ignore"):
+        s = numpy.zeros(n + 1, dtype=numpy.uint64)
+        numpy.cumsum(keys, out=s[1:])
+        t = numpy.zeros(n + 1, dtype=numpy.uint64)
+        numpy.cumsum(keys * numpy.arange(n, dtype=numpy.uint64), out=t[1:])
+
+        a = s[window:] - s[:n - window + 1]
+        b = numpy.arange(window, n + 1, dtype=numpy.uint64) * a - (t[window:] - t[:n - window + 1])
+        return a + b * WEAKMUL
+
+
+def block_weaks(keys, blocksamples):
+    # weak checksum of every non overlapped block(same value as rolling_weak at block start)
+    nblocks = len(keys) // blocksamples
+    blocks = keys[:nblocks * blocksamples].reshape(nblocks, blocksamples)
+    with numpy.errstate(over="ignore"):
+        a = blocks.sum(axis=1, dtype=numpy.uint64)
+        b = (blocks * numpy.arange(blocksamples, 0, -1, dtype=numpy.uint64)).sum(axis=1, dtype=numpy.uint64)
+        return a + b * WEAKMUL
+
+
+def window_weak(keys):
+    # weak checksum of whole keys(same value as rolling_weak(keys, len(keys))[0])
+    return rolling_weak(keys, len(keys))[0]
+
+
+def first_difference(srcdata, orgdata, framesize):
+    # first differ sample index of two pcm blocks, None if same.
+    srcn = len(srcdata) // framesize
+    orgn = len(orgdata) // framesize
+    n = min(srcn, orgn)
+    src = numpy.frombuffer(srcdata, dtype=numpy.uint8, count=n * framesize).reshape(n, framesize)
+    org = numpy.frombuffer(orgdata, dtype=numpy.uint8, count=n * framesize).reshape(n, framesize)
+    index = numpy.flatnonzero((src != org).any(axis=1))
+    if index.size:
+        return int(index[0])
+    if srcn != orgn:
+        return n
+    return None
+
+
+def find_resync(srcwf, orgwf, diffpos, window, cancelled=None):
+    # cinex insert slip.
+    # return smallest k(>= 1) as src[diffpos + k:][:window] == org[diffpos:][:window], None if not found.
+    # src is searched by rolling weak checksum in one pass, only candidates are compared with bytes.
+
+    framesize = srcwf.getnchannels() * srcwf.getsampwidth()
+
+    orgwf.setpos(diffpos)
+    orgwindow = bytes(orgwf.readframes(window))
+    length = len(orgwindow) // framesize
+    if length == 0:
+        return None
+
+    target = window_weak(sample_keys(orgwindow, framesize))
+    searchsamples = srcwf.getframerate() * SEARCHSECONDS
+
+    pos = diffpos + 1
+    while pos < srcwf.getnframes():
+        if cancelled and cancelled():
+            return None
+
+        srcwf.setpos(pos)
+        data = srcwf.readframes(searchsamples + length - 1)
+        n = len(data) // framesize
+        if n < length:
+            break
+
+        for index in numpy.flatnonzero(rolling_weak(sample_keys(data, framesize), length) == target).tolist():
+            # same read length as org window, end of src must be same
+            srcwf.setpos(pos + index)
+            if bytes(srcwf.readframes(window)) == orgwindow:
+                return pos + index - diffpos
+
+        if n < searchsamples + length - 1:
+            break
+        pos += n - length + 1
+
+    return None
+
+
+def common_suffix(srcdata, orgdata, framesize):
+    # same sample num at the end of two pcm blocks
+    n = min(len(srcdata), len(orgdata)) // framesize
+    if n == 0:
+        return 0
+    src = numpy.frombuffer(srcdata, dtype=numpy.uint8, offset=len(srcdata) - n * framesize).reshape(n, framesize)
+    org = numpy.frombuffer(orgdata, dtype=numpy.uint8, offset=len(orgdata) - n * framesize).reshape(n, framesize)
+    index = numpy.flatnonzero((src != org).any(axis=1))
+    if index.size:
+        return n - 1 - int(index[-1])
+    return n
+
+
+def extend_match(srcwf, orgwf, srcpos, orgpos, limit, backward=False):
+    # same sample num from (srcpos, orgpos) forward, or before them backward, up to limit.
+    framesize = srcwf.getnchannels() * srcwf.getsampwidth()
+    chunksamples = srcwf.getframerate()
+    matched = 0
+    while matched < limit:
+        n = min(chunksamples, limit - matched)
+        if backward:
+            srcwf.setpos(srcpos - matched - n)
+            orgwf.setpos(orgpos - matched - n)
+        else:
+            srcwf.setpos(srcpos + matched)
+            orgwf.setpos(orgpos + matched)
+        srcdata = srcwf.readframes(n)
+        orgdata = orgwf.readframes(n)
+
+        if backward:
+            same = common_suffix(srcdata, orgdata, framesize)
+        else:
+            same = first_difference(srcdata, orgdata, framesize)
+            if same is None:
+                same = len(srcdata) // framesize
+        matched += same
+        if same < n:
+            break
+    return min(matched, limit)
+
+
+def match_regions(srcwf, orgwf, srcstart=0, orgstart=0, cancelled=None):
+    # rsync style alignment of src and org.
+    # org is indexed by weak checksum of ANCHORSECONDS blocks, src is scanned by rolling weak checksum,
+    # weak matches are verified with bytes and src jumps one block after anchor.
+    # return sample exact same regions [(srcpos, orgpos, length), ...] ascending in both src and org.
+    # None if canceled.
+
+    framesize = srcwf.getnchannels() * srcwf.getsampwidth()
+    blocksamples = max(int(orgwf.getframerate() * ANCHORSECONDS), 1)
+    chunksamples = blocksamples * max(int(SEARCHSECONDS / ANCHORSECONDS), 1)
+    srcend = srcwf.getnframes()
+    orgend = orgwf.getnframes()
+
+    # org index
+    orgweaks = []
+    orgwf.setpos(orgstart)
+    while True:
+        if cancelled and cancelled():
+            return None
+        data = orgwf.readframes(chunksamples)
+        if len(data) < blocksamples * framesize:
+            break
+        orgweaks.append(block_weaks(sample_keys(data, framesize), blocksamples))
+    orgweaks = numpy.concatenate(orgweaks) if orgweaks else numpy.empty(0, dtype=numpy.uint64)
+
+    index = {}
+    for block, weak in enumerate(orgweaks.tolist()):
+        index.setdefault(weak, []).append(block)
+    indexweaks = numpy.unique(orgweaks)
+
+    def orgblock(block):
+        orgwf.setpos(orgstart + block * blocksamples)
+        return bytes(orgwf.readframes(blocksamples))
+
+    # src scan
+    anchors = []  # (srcpos, orgpos)
+    nextpos = srcstart   # next anchor src position(after last anchor block)
+    nextorg = orgstart   # next anchor org position
+    offset = None        # orgpos - srcpos of last anchor
+    pos = srcstart
+    while pos + blocksamples <= srcend and indexweaks.size:
+        if cancelled and cancelled():
+            return None
+
+        srcwf.setpos(pos)
+        data = bytes(srcwf.readframes(chunksamples + blocksamples - 1))
+        n = len(data) // framesize
+        if n < blocksamples:
+            break
+        weaks = rolling_weak(sample_keys(data, framesize), blocksamples)
+        candidates = numpy.flatnonzero(numpy.isin(weaks, indexweaks))
+
+        c = int(numpy.searchsorted(candidates, nextpos - pos))
+        while c < len(candidates):
+            at = int(candidates[c])
+
+            found = None
+            if offset is not None:
+                # same offset as last anchor first(silence etc. matches many org blocks, keep last offset)
+                diag = at + (orgstart - (pos + at + offset)) % blocksamples
+                block = (pos + diag + offset - orgstart) // blocksamples
+                if diag + blocksamples <= n and pos + diag + offset >= nextorg and block < len(orgweaks) \
+                        and orgweaks[block] == weaks[diag] \
+                        and orgblock(block) == data[diag * framesize:(diag + blocksamples) * framesize]:
+                    at = diag
+                    found = block
+            if found is None:
+                srcblock = data[at * framesize:(at + blocksamples) * framesize]
+                blocks = index[int(weaks[at])]
+                first = bisect.bisect_left(blocks, -(-(nextorg - orgstart) // blocksamples))
+                for block in blocks[first:first + ANCHORCANDIDATES]:
+                    if orgblock(block) == srcblock:
+                        found = block
+                        break
+
+            if found is None:
+                c += 1
+                continue
+
+            orgpos = orgstart + found * blocksamples
+            anchors.append((pos + at, orgpos))
+            offset = orgpos - (pos + at)
+            nextpos = pos + at + blocksamples
+            nextorg = orgpos + blocksamples
+            c = int(numpy.searchsorted(candidates, nextpos - pos))
+
+        if n < chunksamples + blocksamples - 1:
+            break
+        pos += n - blocksamples + 1
+
+    # continuous anchors -> regions
+    regions = []
+    for srcpos, orgpos in anchors:
+        if regions:
+            last = regions[-1]
+            if last[0] + last[2] == srcpos and last[1] + last[2] == orgpos:
+                last[2] += blocksamples
+                continue
+        regions.append([srcpos, orgpos, blocksamples])
+
+    # sample exact region edges
+    prevsrcend = srcstart
+    prevorgend = orgstart
+    for r, region in enumerate(regions):
+        if cancelled and cancelled():
+            return None
+        srcpos, orgpos, length = region
+        back = extend_match(srcwf, orgwf, srcpos, orgpos,
+                            min(srcpos - prevsrcend, orgpos - prevorgend), backward=True)
+        if r + 1 < len(regions):
+            limit = min(regions[r + 1][0] - srcpos - length, regions[r + 1][1] - orgpos - length)
+        else:
+            limit = min(srcend - srcpos - length, orgend - orgpos - length)
+        length += extend_match(srcwf, orgwf, srcpos + length, orgpos + length, limit)
+        region[:] = [srcpos - back, orgpos - back, length + back]
+        prevsrcend = region[0] + region[2]
+        prevorgend = region[1] + region[2]
+
+    return [tuple(region) for region in regions]
+
+
+def region_slips(regions, srcstart, orgstart, srcend, orgend):
+    # gaps between same regions.
+    # return [(srcpos, orgpos, src gap sample num, org gap sample num), ...]
+    # src gap > org gap is insert to src, src gap < org gap is drop from src.
+    slips = []
+    srcpos = srcstart
+    orgpos = orgstart
+    for regionsrc, regionorg, length in regions + [(srcend, orgend, 0)]:
+        if regionsrc - srcpos or regionorg - orgpos:
+            slips.append((srcpos, orgpos, regionsrc - srcpos, regionorg - orgpos))
+        srcpos = regionsrc + length
+        orgpos = regionorg + length
+    return slips
+
+
+def pcm_samples(data, nchannels, sampwidth, floatsamples=False, bigendian=False):
+    # little endian(bigendian=True is big endian) signed pcm -> int array (sample num, nchannels)
+    # floatsamples=True is float array(full scale 1.0), otherwise 32bit float wav is read as int32 bits(zero is still zero).
+    framesize = nchannels * sampwidth
+    nframes = len(data) // framesize
+    order = ">" if bigendian else "<"
+    if floatsamples:
+        samples = numpy.frombuffer(data, dtype="{0}f{1}".format(order, sampwidth),
+                                   count=nframes * nchannels).astype(numpy.float64)
+    elif sampwidth == 3:
+        raw = numpy.frombuffer(data, dtype=numpy.uint8, count=nframes * framesize).reshape(-1, 3).astype(numpy.int32)
+        if bigendian:
+            raw = raw[:, ::-1]
+        samples = ((raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)) ^ 0x800000) - 0x800000
+    elif sampwidth == 1:
+        samples = numpy.frombuffer(data, dtype=numpy.uint8, count=nframes * framesize).astype(numpy.int32) - 128
+    else:
+        samples = numpy.frombuffer(data, dtype="{0}i{1}".format(order, sampwidth), count=nframes * nchannels)
+    return samples.reshape(nframes, nchannels)
+
+
+def pcm_mono(data, nchannels, sampwidth):
+    # little endian signed pcm -> float mono(mean of channels)
+    return pcm_samples(data, nchannels, sampwidth).mean(axis=1)
+
+
+def read_mono(wf, pos, nframes):
+    wf.setpos(pos)
+    return pcm_mono(wf.readframes(nframes), wf.getnchannels(), wf.getsampwidth())
+
+
+def decimate(x, factor):
+    # mean of every factor samples(box filter)
+    n = len(x) // factor
+    return x[:n * factor].reshape(n, factor).mean(axis=1)
+
+
+def xcorr_lag(src, org, maxlag):
+    # src = org window with maxlag margin of both side(len(org) + maxlag * 2).
+    # return (lag of src, normalized correlation), org[j] is src[maxlag + lag + j].
+    length = len(org)
+    lags = len(src) - length + 1
+    if lags <= 0 or length == 0:
+        return None, 0.0
+
+    size = 1 << (len(src) + length - 1).bit_length()
+    corr = numpy.fft.irfft(numpy.fft.rfft(src, size) * numpy.conj(numpy.fft.rfft(org, size)), size)[:lags]
+
+    energy = numpy.concatenate(([0.0], numpy.cumsum(src * src)))
+    denom = numpy.sqrt((energy[length:length + lags] - energy[:lags]) * numpy.dot(org, org))
+    coef = numpy.divide(corr, denom, out=numpy.zeros(lags), where=denom > 0)
+
+    best = int(numpy.argmax(coef))
+    return best - maxlag, float(coef[best])
+
+
+def xcorr_offset(srcwf, orgwf, cancelled=None):
+    # src - org sample offset by FFT cross correlation of head, middle and tail windows.
+    # decimated correlation first, refined in full rate around it.
+    # gain change is not matter(normalized correlation), bit exact is not required.
+    # return (offset, confidence(0-1), [(org window position, offset, correlation), ...]), offset is None if not found.
+
+    rate = orgwf.getframerate()
+    window = rate * XCORRSECONDS
+    maxlag = rate * XCORRMAXSECONDS
+    refine = rate
+    margin = XCORRDECIMATE * 2
+
+    nframes = min(srcwf.getnframes(), orgwf.getnframes())
+    positions = [maxlag, (nframes - window) // 2, nframes - window - maxlag]
+    positions = sorted(set(pos for pos in positions if maxlag <= pos <= nframes - window - maxlag))
+
+    windows = []
+    for pos in positions:
+        if cancelled and cancelled():
+            return None, 0.0, windows
+
+        org = decimate(read_mono(orgwf, pos, window), XCORRDECIMATE)
+        src = decimate(read_mono(srcwf, pos - maxlag, window + maxlag * 2), XCORRDECIMATE)
+        lag, coef = xcorr_lag(src, org, maxlag // XCORRDECIMATE)
+        if lag is None:
+            continue
+        lag *= XCORRDECIMATE
+
+        # full rate around coarse lag
+        start = pos + lag - margin
+        if 0 <= start and start + refine + margin * 2 <= srcwf.getnframes():
+            finelag, finecoef = xcorr_lag(read_mono(srcwf, start, refine + margin * 2),
+                                          read_mono(orgwf, pos, refine), margin)
+            if finelag is not None and finecoef >= XCORRMINCOEF:
+                lag += finelag
+                coef = finecoef
+
+        windows.append((pos, lag, coef))
+
+    # offset agreed by most windows(later window wins, slip is before it)
+    votes = {}
+    for pos, lag, coef in windows:
+        if coef >= XCORRMINCOEF:
+            votes[lag] = votes.get(lag, 0.0) + coef
+    if not votes:
+        return None, 0.0, windows
+
+    offset = max(reversed([lag for pos, lag, coef in windows if lag in votes]), key=lambda lag: votes[lag])
+    return offset, votes[offset] / max(len(windows), 1), windows
@@ -0,0 +1,716 @@
+# -*- coding: utf-8 -*-
+# PCM sources for WavChecker.
+# Every reader here has the same read interface as wave_bwf_rf64.Wave_read
+# (getnchannels/getsampwidth/getframerate/getnframes/tell/setpos/readframes...),
+# so proc_wavhash4 and the other hash loops can use them without knowing where the pcm comes from.
+
+import decimal
+import mmap
+import struct
+import subprocess
+import threading
+
+import numpy
+
+import wave_bwf_rf64
+
+
+class PcmReaderError(Exception):
+    pass
+
+
+# ffmpeg codec name -> (raw format name, sample width byte)
+RAWFORMATS = {
+    "pcm_s16le": ("s16le", 2),
+    "pcm_s16be": ("s16be", 2),
+    "pcm_s24le": ("s24le", 3),
+    "pcm_s24be": ("s24be", 3),
+    "pcm_s32le": ("s32le", 4),
+    "pcm_s32be": ("s32be", 4),
+    "pcm_f32le": ("f32le", 4),
+    "pcm_f32be": ("f32be", 4),
+}
+
+# ffmpeg codec name -> float or not, which can be converted to pcm_s16le while reading(Force16BitSource)
+S16FORMATS = {
+    "pcm_u8": False,
+    "pcm_s16le": False,
+    "pcm_s24le": False,
+    "pcm_s32le": False,
+    "pcm_f32le": True,
+    "pcm_f64le": True,
+}
+
+
+# wav fmt chunk format tag
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Sony Wave64 GUID
+W64_RIFF = b"riff\x2e\x91\xcf\x11\xa5\xd6\x28\xdb\x04\xc1\x00\x00"
+W64_WAVE = b"wave\xf3\xac\xd3\x11\x8c\xd1\x00\xc0\x4f\x8e\xdb\x8a"
+W64_FMT = b"fmt \xf3\xac\xd3\x11\x8c\xd1\x00\xc0\x4f\x8e\xdb\x8a"
+W64_DATA = b"data\xf3\xac\xd3\x11\x8c\xd1\x00\xc0\x4f\x8e\xdb\x8a"
+
+
+def open_pcm(path):
+
+    # path is str(wav path) or source object(PipeSource...)
+    if isinstance(path, str):
+        try:
+            return MmapWavReader(path)
+        except PcmReaderError:
+            # non-standard wav, wave_bwf_rf64 may read it.
+            return wave_bwf_rf64.open(path)
+    else:
+        return path.open()
+
+
+def extract_channel(data, nchannels, sampwidth, channel):
+    # one channel from interleaved pcm.
+    # copy byte by byte of sample with extended slice(no python loop per sample).
+    framesize = nchannels * sampwidth
+    nframes = len(data) // framesize
+    out = bytearray(nframes * sampwidth)
+    for k in range(sampwidth):
+        out[k::sampwidth] = data[channel * sampwidth + k:nframes * framesize:framesize]
+    return bytes(out)
+
+
+def byteswap(data, sampwidth):
+    # big endian <-> little endian of each sample
+    # reverse bytes of every sample at once with numpy(16/24/32bit).
+    if sampwidth == 1:
+        return data
+    samples = numpy.frombuffer(data, dtype=numpy.uint8, count=len(data) // sampwidth * sampwidth)
+    return samples.reshape(-1, sampwidth)[:, ::-1].tobytes()
+
+
+def to_s16(data, sampwidth, floatsamples=False):
+    # pcm -> 16bit pcm, same as ffmpeg -acodec pcm_s16le(swresample without dither).
+    # int is truncated(upper 16bit), float is rounded to nearest even and clipped.
+    if sampwidth == 2 and not floatsamples:
+        return data
+    if floatsamples:
+        samples = numpy.frombuffer(data, dtype="<f{0}".format(sampwidth))
+        return numpy.clip(numpy.rint(samples * 32768), -32768, 32767).astype("<i2").tobytes()
+    if sampwidth == 1:
+        # unsigned 8bit
+        samples = numpy.frombuffer(data, dtype=numpy.uint8)
+        return ((samples.astype("<i2") - 0x80) << 8).tobytes()
+    samples = numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, sampwidth)
+    return samples[:, sampwidth - 2:].tobytes()
+
+
+class PipeSource:
+    # ffmpeg command which writes raw pcm to stdout.
+    # reader(ffmpeg process) is launched at open(), not at construct.
+
+    def __init__(self, cmdlist, name, nchannels, sampwidth, framerate, nframes=0, floatsamples=False):
+        self.cmdlist = cmdlist
+        self.name = name
+        self.nchannels = nchannels
+        self.sampwidth = sampwidth
+        self.framerate = framerate
+        self.nframes = nframes  # predicted sample num(for progress only)
+        self.floatsamples = floatsamples
+
+    def open(self):
+        return PipePcmReader(self)
+
+    def __str__(self):
+        return self.name + "(pipe)"
+
+
+class PipePcmReader:
+
+    READBUFSIZE = 1024 * 1024 * 4
+
+    def __init__(self, source):
+        self._source = source
+        self._nchannels = source.nchannels
+        self._sampwidth = source.sampwidth
+        self._floatsamples = source.floatsamples
+        self._framerate = source.framerate
+        self._nframes = source.nframes
+        self._framesize = self._nchannels * self._sampwidth
+        self._soundpos = 0
+        self._eof = False
+        self._stderrlines = []
+
+        self._proc = subprocess.Popen(source.cmdlist, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                      bufsize=self.READBUFSIZE)
+
+        # ffmpeg stops if stderr pipe is full, always drain it.
+        self._stderrthread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderrthread.start()
+
+    def __del__(self):
+        self.close()
+
+    def _drain_stderr(self):
+        for line in self._proc.stderr:
+            self._stderrlines.append(line.decode(errors="replace").rstrip())
+
+    def getargs(self):
+        return self._proc.args
+
+    def getnchannels(self):
+        return self._nchannels
+
+    def getsampwidth(self):
+        return self._sampwidth
+
+    def getframerate(self):
+        return self._framerate
+
+    def getnframes(self):
+        return self._nframes
+
+    def getchunksize(self):
+        # raw pcm has no header
+        return 0
+
+    def getparams(self):
+        return (self._nchannels, self._sampwidth, self._framerate, self._nframes,
+                "NONE", "ieee float" if self._floatsamples else "raw pcm pipe")
+
+    def tell(self):
+        return self._soundpos
+
+    def rewind(self):
+        if self._soundpos != 0:
+            raise PcmReaderError("pipe source can't rewind")
+
+    def setpos(self, pos):
+        # forward only
+        if pos < self._soundpos:
+            raise PcmReaderError("pipe source can't seek backward")
+        while self._soundpos < pos:
+            if not self.readframes(min(pos - self._soundpos, self._framerate)):
+                break
+
+    def readframes(self, nframes):
+        if nframes == 0 or self._proc is None:
+            return b''
+        # BufferedReader.read(n) blocks until n bytes or EOF
+        data = self._proc.stdout.read(nframes * self._framesize)
+        if len(data) < nframes * self._framesize:
+            self._eof = True
+        self._soundpos += len(data) // self._framesize
+        return data
+
+    def close(self):
+        # return ffmpeg returncode(None = not started or already closed)
+        if getattr(self, "_proc", None) is None:
+            return None
+        proc = self._proc
+        self._proc = None
+        if not self._eof and proc.poll() is None:
+            # hashing loop end before EOF (cancel)
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+        self._stderrthread.join(timeout=3)
+        return proc.returncode
+
+    def iseof(self):
+        return self._eof
+
+    def geterrors(self):
+        return "\n".join(self._stderrlines)
+
+
+class MmapWavReader:
+    # WAV/RF64/BW64/Wave64 reader.
+    # data chunk is memory mapped, readframes() returns memoryview of the map(no read syscall, no copy).
+    # returned memoryview is valid while someone holds it, even after close().
+
+    def __init__(self, path):
+        self._path = path
+        self._file = open(path, "rb")
+        try:
+            self._read_header()
+        except (struct.error, ValueError) as e:
+            self._file.close()
+            raise PcmReaderError(path + ":broken wav header:" + str(e))
+        except PcmReaderError:
+            self._file.close()
+            raise
+
+        self._framesize = self._nchannels * self._sampwidth
+        self._nframes = self._datasize // self._framesize
+        self._soundpos = 0
+
+        if self._nframes:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap)[self._dataoffset:self._dataoffset + self._nframes * self._framesize]
+        else:
+            self._mmap = None
+            self._view = memoryview(b'')
+
+    def __del__(self):
+        self.close()
+
+    def _read_header(self):
+
+        f = self._file
+        f.seek(0, 2)
+        filesize = f.tell()
+        f.seek(0)
+
+        head = f.read(16)
+        fmt = None
+        datasize64 = None
+        self._dataoffset = None
+        self._datasize = 0
+
+        if head[:4] in (b"RIFF", b"RF64", b"BW64") and head[8:12] == b"WAVE":
+            pos = 12
+            while pos + 8 <= filesize:
+                f.seek(pos)
+                chunkid, chunksize = struct.unpack("<4sI", f.read(8))
+                if chunkid == b"ds64":
+                    # riff size(8) data size(8) sample count(8) ...
+                    datasize64 = struct.unpack("<QQ", f.read(16))[1]
+                elif chunkid == b"fmt ":
+                    fmt = f.read(chunksize)
+                elif chunkid == b"data":
+                    self._dataoffset = pos + 8
+                    if chunksize == 0xFFFFFFFF and datasize64 is not None:
+                        chunksize = datasize64
+                    self._datasize = chunksize
+                    break
+                # word align
+                pos += 8 + chunksize + (chunksize & 1)
+
+        elif head == W64_RIFF:
+            pos = 40
+            while pos + 24 <= filesize:
+                f.seek(pos)
+                guid = f.read(16)
+                chunksize = struct.unpack("<Q", f.read(8))[0]  # include guid and size
+                if chunksize < 24:
+                    break
+                if guid == W64_FMT:
+                    fmt = f.read(chunksize - 24)
+                elif guid == W64_DATA:
+                    self._dataoffset = pos + 24
+                    self._datasize = chunksize - 24
+                    break
+                # 8 byte align
+                pos += (chunksize + 7) & ~7
+
+        else:
+            raise PcmReaderError(self._path + ":not RIFF/RF64/W64 file")
+
+        if fmt is None or self._dataoffset is None:
+            raise PcmReaderError(self._path + ":fmt or data chunk not found")
+
+        formattag, self._nchannels, self._framerate, _, blockalign, bits = struct.unpack_from("<HHIIHH", fmt, 0)
+        if formattag == WAVE_FORMAT_EXTENSIBLE:
+            # SubFormat GUID first 2 byte is format tag
+            formattag = struct.unpack_from("<H", fmt, 24)[0]
+        if formattag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+            raise PcmReaderError(self._path + ":not pcm wav formattag={0}".format(formattag))
+
+        self._formattag = formattag
+        self._sampwidth = (bits + 7) // 8
+        if self._nchannels == 0 or blockalign != self._nchannels * self._sampwidth:
+            raise PcmReaderError(self._path + ":invalid blockalign")
+
+        # truncated file
+        self._datasize = max(min(self._datasize, filesize - self._dataoffset), 0)
+
+    def getnchannels(self):
+        return self._nchannels
+
+    def getsampwidth(self):
+        return self._sampwidth
+
+    def getframerate(self):
+        return self._framerate
+
+    def getnframes(self):
+        return self._nframes
+
+    def getchunksize(self):
+        # header size(data chunk offset)
+        return self._dataoffset
+
+    def getparams(self):
+        return (self._nchannels, self._sampwidth, self._framerate, self._nframes,
+                "NONE", "not compressed" if self._formattag == WAVE_FORMAT_PCM else "ieee float")
+
+    def tell(self):
+        return self._soundpos
+
+    def rewind(self):
+        self._soundpos = 0
+
+    def setpos(self, pos):
+        if pos < 0 or pos > self._nframes:
+            raise PcmReaderError("position not in range")
+        self._soundpos = pos
+
+    def readframes(self, nframes):
+        start = self._soundpos * self._framesize
+        end = min(self._soundpos + max(nframes, 0), self._nframes) * self._framesize
+        self._soundpos += (end - start) // self._framesize
+        return self._view[start:end]
+
+    def close(self):
+        if getattr(self, "_mmap", None) is not None:
+            self._view.release()
+            try:
+                self._mmap.close()
+            except BufferError:
+                # frame views are still referenced(lastframe...), map is freed with them.
+                pass
+            self._mmap = None
+        if getattr(self, "_file", None) is not None:
+            self._file.close()
+            self._file = None
+
+
+def is_float(params):
+    # float pcm(wav ieee float, QT float lpcm, ffmpeg f32) from getparams()
+    return params[5].startswith("ieee float")
+
+
+def is_bigendian(params):
+    # big endian pcm(QT track read in file byte order, qtreader.QtSource littleendian=False) from getparams()
+    return params[5].endswith("big endian")
+
+
+def source_chain(source):
+    # source and the sources wrapped by it(channel, 16bit, trim), outermost first
+    chain = [source]
+    while isinstance(chain[-1], (ChannelSource, Force16BitSource, TrimSource)):
+        chain.append(chain[-1].source)
+    return chain
+
+
+def is_pipe(path):
+    # pipe source(or one channel of it, or interleave of it) can't seek backward
+    if isinstance(path, (ChannelSource, Force16BitSource, TrimSource)):
+        return is_pipe(path.source)
+    if isinstance(path, InterleaveSource):
+        return any(is_pipe(source) for source in path.sources)
+    return isinstance(path, PipeSource)
+
+
+def reader_errors(reader):
+    # ffmpeg stderr of pipe reader(or reader on it)
+    geterrors = getattr(reader, "geterrors", None)
+    return geterrors() if geterrors else ""
+
+
+class ChannelSource:
+    # one channel of interleaved path(wav path or source object).
+    # channels of the same source are hashed from one read of it(framehash.hash_source split),
+    # open() reads the interleave and extracts the channel(sample diff, hashing without split).
+
+    def __init__(self, source, channel, name=None):
+        self.source = source
+        self.channel = channel
+        self.name = name
+
+    def open(self):
+        return ChannelPcmReader(self)
+
+    def __str__(self):
+        return "{0}(ch{1} of {2})".format(self.name, self.channel, self.source)
+
+
+class ChannelPcmReader:
+
+    def __init__(self, source):
+        self._reader = open_pcm(source.source)
+        self._channel = source.channel
+        self._nchannels = self._reader.getnchannels()
+        self._sampwidth = self._reader.getsampwidth()
+        if self._channel >= self._nchannels:
+            self._reader.close()
+            raise PcmReaderError("channel {0} not found".format(self._channel))
+
+    def getnchannels(self):
+        return 1
+
+    def getsampwidth(self):
+        return self._sampwidth
+
+    def getframerate(self):
+        return self._reader.getframerate()
+
+    def getnframes(self):
+        return self._reader.getnframes()
+
+    def getchunksize(self):
+        return self._reader.getchunksize()
+
+    def getparams(self):
+        params = self._reader.getparams()
+        return (1,) + tuple(params[1:])
+
+    def tell(self):
+        return self._reader.tell()
+
+    def rewind(self):
+        self._reader.rewind()
+
+    def setpos(self, pos):
+        self._reader.setpos(pos)
+
+    def readframes(self, nframes):
+        data = self._reader.readframes(nframes)
+        return extract_channel(data, self._nchannels, self._sampwidth, self._channel)
+
+    def close(self):
+        return self._reader.close()
+
+    def geterrors(self):
+        return reader_errors(self._reader)
+
+
+class InterleaveSource:
+    # virtual interleave of several sources(multi mono -> interleave), no ffmpeg join.
+    # channels are in source order, length is the shortest source.
+
+    def __init__(self, sources, name):
+        self.sources = sources
+        self.name = name
+
+    def open(self):
+        return InterleavePcmReader(self)
+
+    def __str__(self):
+        return self.name + "(interleave of " + ", ".join(str(source) for source in self.sources) + ")"
+
+
+class InterleavePcmReader:
+
+    def __init__(self, source):
+        self._readers = []
+        try:
+            for path in source.sources:
+                self._readers.append(open_pcm(path))
+        except Exception:
+            self.close()
+            raise
+
+        first = self._readers[0]
+        self._sampwidth = first.getsampwidth()
+        self._framerate = first.getframerate()
+        for reader in self._readers:
+            if reader.getsampwidth() != self._sampwidth or reader.getframerate() != self._framerate:
+                self.close()
+                raise PcmReaderError("sample width or sample rate of interleave sources is not same")
+        self._floatsamples = is_float(first.getparams())
+        self._channels = [reader.getnchannels() for reader in self._readers]
+        self._nchannels = sum(self._channels)
+        self._nframes = min(reader.getnframes() for reader in self._readers)
+        self._soundpos = 0
+
+    def __del__(self):
+        self.close()
+
+    def getnchannels(self):
+        return self._nchannels
+
+    def getsampwidth(self):
+        return self._sampwidth
+
+    def getframerate(self):
+        return self._framerate
+
+    def getnframes(self):
+        return self._nframes
+
+    def getchunksize(self):
+        return 0
+
+    def getparams(self):
+        return (self._nchannels, self._sampwidth, self._framerate, self._nframes,
+                "NONE", "ieee float" if self._floatsamples else "virtual interleave")
+
+    def tell(self):
+        return self._soundpos
+
+    def rewind(self):
+        self.setpos(0)
+
+    def setpos(self, pos):
+        for reader in self._readers:
+            reader.setpos(pos)
+        self._soundpos = pos
+
+    def readframes(self, nframes):
+        blocks = [reader.readframes(nframes) for reader in self._readers]
+        # shortest source
+        n = min(len(block) // (nchannels * self._sampwidth) for block, nchannels in zip(blocks, self._channels))
+        if n == 0:
+            return b''
+        self._soundpos += n
+
+        planes = [numpy.frombuffer(block, dtype=numpy.uint8, count=n * nchannels * self._sampwidth).reshape(n, -1)
+                  for block, nchannels in zip(blocks, self._channels)]
+        return numpy.concatenate(planes, axis=1).tobytes()
+
+    def close(self):
+        # first non-zero returncode of sources(pipe).
+        # longer pipe is killed at the end of shortest source, it's not error.
+        returncode = None
+        for reader in getattr(self, "_readers", []):
+            eof = not isinstance(reader, PipePcmReader) or reader.iseof()
+            code = reader.close()
+            if code and eof and not returncode:
+                returncode = code
+        return returncode
+
+    def geterrors(self):
+        errors = [reader_errors(reader) for reader in self._readers]
+        return "\n".join(error for error in errors if error)
+
+
+class Force16BitSource:
+    # source(wav path or source object) converted to 16bit pcm while reading(no ffmpeg re-encode).
+    # floatsamples=None is from wav format tag.
+
+    def __init__(self, source, floatsamples=None):
+        self.source = source
+        self.floatsamples = floatsamples
+
+    def open(self):
+        return Force16BitPcmReader(self)
+
+    def __str__(self):
+        return "{0}(16bit)".format(self.source)
+
+
+class Force16BitPcmReader:
+
+    def __init__(self, source):
+        self._reader = open_pcm(source.source)
+        self._sampwidth = self._reader.getsampwidth()
+        self._floatsamples = source.floatsamples
+        if self._floatsamples is None:
+            self._floatsamples = is_float(self._reader.getparams())
+
+    def getnchannels(self):
+        return self._reader.getnchannels()
+
+    def getsampwidth(self):
+        return 2
+
+    def getframerate(self):
+        return self._reader.getframerate()
+
+    def getnframes(self):
+        return self._reader.getnframes()
+
+    def getchunksize(self):
+        return self._reader.getchunksize()
+
+    def getparams(self):
+        params = self._reader.getparams()
+        return (params[0], 2) + tuple(params[2:5]) + ("not compressed",)
+
+    def tell(self):
+        return self._reader.tell()
+
+    def rewind(self):
+        self._reader.rewind()
+
+    def setpos(self, pos):
+        self._reader.setpos(pos)
+
+    def readframes(self, nframes):
+        return to_s16(self._reader.readframes(nframes), self._sampwidth, self._floatsamples)
+
+    def close(self):
+        return self._reader.close()
+
+    def geterrors(self):
+        return reader_errors(self._reader)
+
+
+def sec_to_frames(sec, framerate):
+    # seconds(ffmpeg -ss/-t string) -> sample num, same as ffmpeg trim:
+    # time string is parsed to microseconds(digits below 1us are dropped),
+    # microseconds -> samples is rounded half up(av_rescale_q).
+    usec = int(decimal.Decimal(str(sec)).scaleb(6))
+    return (usec * framerate + 500000) // 1000000
+
+
+class TrimSource:
+    # sample range of source(wav path or source object), same as ffmpeg -ss startframe -t nframes.
+    # reader seeks to startframe and reads only the range, nframes=None is to the end.
+
+    def __init__(self, source, startframe, nframes=None):
+        self.source = source
+        self.startframe = startframe
+        self.nframes = nframes
+
+    def open(self):
+        return TrimPcmReader(self)
+
+    def __str__(self):
+        return "{0}({1}+{2})".format(self.source, self.startframe, self.nframes)
+
+
+class TrimPcmReader:
+
+    def __init__(self, source):
+        self._reader = open_pcm(source.source)
+        srcnframes = self._reader.getnframes()
+        self._startframe = min(source.startframe, srcnframes)
+        self._nframes = srcnframes - self._startframe
+        if source.nframes is not None:
+            self._nframes = min(self._nframes, source.nframes)
+        if self._startframe:
+            try:
+                self._reader.setpos(self._startframe)
+            except Exception:
+                self._reader.close()
+                raise
+
+    def getnchannels(self):
+        return self._reader.getnchannels()
+
+    def getsampwidth(self):
+        return self._reader.getsampwidth()
+
+    def getframerate(self):
+        return self._reader.getframerate()
+
+    def getnframes(self):
+        return self._nframes
+
+    def getchunksize(self):
+        return self._reader.getchunksize()
+
+    def getparams(self):
+        params = self._reader.getparams()
+        return params[:3] + (self._nframes,) + tuple(params[4:])
+
+    def tell(self):
+        return self._reader.tell() - self._startframe
+
+    def rewind(self):
+        self.setpos(0)
+
+    def setpos(self, pos):
+        if pos < 0 or pos > self._nframes:
+            raise PcmReaderError("position not in range")
+        self._reader.setpos(self._startframe + pos)
+
+    def readframes(self, nframes):
+        return self._reader.readframes(min(max(nframes, 0), self._nframes - self.tell()))
+
+    def close(self):
+        return self._reader.close()
+
+    def geterrors(self):
+        return reader_errors(self._reader)
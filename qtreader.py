@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+# QuickTime(mov) pcm audio track reader for WavChecker.
+# Reads sample tables(stsd/stsc/stsz/stco/co64) of the sound tracks and reads pcm chunks
+# from the file directly, no ffmpeg decode and no temp wav.
+# supported sample entry: sowt, twos, lpcm, in24, in32, fl32, fl64
+# output is little endian pcm (same bytes as ffmpeg -acodec pcm_sXXle/pcm_fXXle).
+
+import bisect
+import struct
+
+import pcmreader
+
+
+class QtReaderError(pcmreader.PcmReaderError):
+    pass
+
+
+# lpcm formatSpecificFlags
+LPCMFLAG_FLOAT = 0x1
+LPCMFLAG_BIGENDIAN = 0x2
+
+
+def iter_atoms(data, pos=0, end=None):
+    # yield (atom type, body start, body end)
+    if end is None:
+        end = len(data)
+    while pos + 8 <= end:
+        size, atomtype = struct.unpack_from(">I4s", data, pos)
+        headsize = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, pos + 8)[0]
+            headsize = 16
+        elif size == 0:
+            size = end - pos
+        if size < headsize or pos + size > end:
+            raise QtReaderError("broken atom:" + str(atomtype))
+        yield atomtype, pos + headsize, pos + size
+        pos += size
+
+
+def find_atom(data, atomtype, pos=0, end=None):
+    for wk_type, start, stop in iter_atoms(data, pos, end):
+        if wk_type == atomtype:
+            return start, stop
+    return None
+
+
+def read_moov(f):
+    # moov may be placed after mdat. skip mdat without reading it.
+    f.seek(0, 2)
+    filesize = f.tell()
+    pos = 0
+    while pos + 8 <= filesize:
+        f.seek(pos)
+        head = f.read(16)
+        size, atomtype = struct.unpack_from(">I4s", head, 0)
+        if size == 1:
+            size = struct.unpack_from(">Q", head, 8)[0]
+        elif size == 0:
+            size = filesize - pos
+        if size < 8:
+            break
+        if atomtype == b"moov":
+            f.seek(pos)
+            return f.read(size)
+        pos += size
+
+    raise QtReaderError("moov atom not found")
+
+
+class QtAudioTrack:
+    # one sound track(trak) of QuickTime file
+
+    def __init__(self, path, trackid):
+        self.path = path
+        self.trackid = trackid
+        self.fourcc = None
+        self.nchannels = 0
+        self.sampwidth = 0
+        self.framerate = 0
+        self.isfloat = False
+        self.bigendian = False
+        self.chunkoffsets = []   # file offset of each chunk
+        self.chunkstarts = [0]   # first frame(sample) index of each chunk, last is total frames
+        self.editstart = 0       # edit list media start(frame)
+        self.nframes = 0         # frames after edit list
+
+    def getcodec(self):
+        # ffmpeg codec name of little endian output
+        if self.isfloat:
+            return "pcm_f{0}le".format(self.sampwidth * 8)
+        else:
+            return "pcm_s{0}le".format(self.sampwidth * 8)
+
+    def framesize(self):
+        return self.nchannels * self.sampwidth
+
+    def getformat(self):
+        return self.fourcc
+
+
+def parse_stsd(track, data, start, stop):
+
+    # stsd: version/flags(4) entry count(4) first entry
+    entrycount = struct.unpack_from(">I", data, start + 4)[0]
+    if entrycount != 1:
+        raise QtReaderError("multiple stsd entries not supported")
+
+    pos = start + 8
+    entrysize, fourcc = struct.unpack_from(">I4s", data, pos)
+    entryend = pos + entrysize
+    track.fourcc = fourcc.decode("latin-1")
+
+    # SoundDescription
+    version = struct.unpack_from(">H", data, pos + 16)[0]
+    extpos = pos + 36
+
+    if version == 2:
+        (audiosamplerate, nchannels, bitsperchannel, flags,
+         bytesperpacket, framesperpacket) = struct.unpack_from(">dI4xIIII", data, pos + 40)
+        extpos = pos + 72
+        track.framerate = int(audiosamplerate)
+        track.nchannels = nchannels
+        bits = bitsperchannel
+        framesperchunksample = framesperpacket
+    else:
+        nchannels, bits, _, _, samplerate = struct.unpack_from(">HHhHI", data, pos + 24)
+        track.nchannels = nchannels
+        track.framerate = samplerate >> 16
+        flags = 0
+        framesperchunksample = 1
+        if version == 1:
+            samplesperpacket, _, bytesperframe, _ = struct.unpack_from(">IIII", data, pos + 36)
+            extpos = pos + 52
+            framesperchunksample = samplesperpacket
+            if nchannels and bytesperframe:
+                bits = bytesperframe // nchannels * 8
+
+    # sound sample description extension(wave/enda)
+    littleendian = False
+    wave = find_atom(data, b"wave", extpos, entryend)
+    if wave:
+        enda = find_atom(data, b"enda", wave[0], wave[1])
+        if enda:
+            littleendian = struct.unpack_from(">H", data, enda[0])[0] == 1
+
+    if track.fourcc == "sowt":
+        track.bigendian = False
+    elif track.fourcc == "twos":
+        track.bigendian = True
+    elif track.fourcc in ("in24", "in32"):
+        bits = 24 if track.fourcc == "in24" else 32
+        track.bigendian = not littleendian
+    elif track.fourcc in ("fl32", "fl64"):
+        bits = 32 if track.fourcc == "fl32" else 64
+        track.isfloat = True
+        track.bigendian = not littleendian
+    elif track.fourcc == "lpcm":
+        track.isfloat = bool(flags & LPCMFLAG_FLOAT)
+        track.bigendian = bool(flags & LPCMFLAG_BIGENDIAN)
+    else:
+        raise QtReaderError(track.fourcc + ":not supported audio format")
+
+    if bits not in (16, 24, 32, 64) or (not track.isfloat and bits == 64):
+        raise QtReaderError("{0}:{1}bit not supported".format(track.fourcc, bits))
+
+    track.sampwidth = bits // 8
+
+    return framesperchunksample
+
+
+def parse_chunks(track, data, stbl, framesperchunksample):
+
+    stsc = find_atom(data, b"stsc", *stbl)
+    stsz = find_atom(data, b"stsz", *stbl)
+    stco = find_atom(data, b"stco", *stbl)
+    co64 = find_atom(data, b"co64", *stbl)
+
+    if not stsc or not stsz or not (stco or co64):
+        raise QtReaderError("sample table not found")
+
+    # chunk offsets
+    if stco:
+        count = struct.unpack_from(">I", data, stco[0] + 4)[0]
+        track.chunkoffsets = list(struct.unpack_from(">{0}I".format(count), data, stco[0] + 8))
+    else:
+        count = struct.unpack_from(">I", data, co64[0] + 4)[0]
+        track.chunkoffsets = list(struct.unpack_from(">{0}Q".format(count), data, co64[0] + 8))
+
+    # samples per chunk
+    count = struct.unpack_from(">I", data, stsc[0] + 4)[0]
+    stsctable = struct.unpack_from(">{0}I".format(count * 3), data, stsc[0] + 8)
+    chunksamples = [0] * len(track.chunkoffsets)
+    for k in range(count):
+        firstchunk = stsctable[k * 3] - 1
+        samplesperchunk = stsctable[k * 3 + 1]
+        if k + 1 < count:
+            lastchunk = stsctable[(k + 1) * 3] - 1
+        else:
+            lastchunk = len(track.chunkoffsets)
+        for c in range(firstchunk, min(lastchunk, len(chunksamples))):
+            chunksamples[c] = samplesperchunk
+
+    # sample size(constant or table)
+    samplesize, samplecount = struct.unpack_from(">II", data, stsz[0] + 4)
+    framesize = track.framesize()
+
+    chunkframes = []
+    if samplesize != 0:
+        # pcm: 1 sample = framesperchunksample frames(sample size is 1 or bytes per packet)
+        chunkframes = [n * framesperchunksample for n in chunksamples]
+    else:
+        sizes = struct.unpack_from(">{0}I".format(samplecount), data, stsz[0] + 12)
+        index = 0
+        for n in chunksamples:
+            chunkframes.append(sum(sizes[index:index + n]) // framesize)
+            index += n
+
+    total = 0
+    track.chunkstarts = [0]
+    for n in chunkframes:
+        total += n
+        track.chunkstarts.append(total)
+
+    track.nframes = total
+
+
+def parse_edits(track, data, trak, moviescale, mediascale):
+
+    edts = find_atom(data, b"edts", *trak)
+    if not edts:
+        return
+    elst = find_atom(data, b"elst", *edts)
+    if not elst:
+        return
+
+    version = data[elst[0]]
+    count = struct.unpack_from(">I", data, elst[0] + 4)[0]
+    pos = elst[0] + 8
+
+    edits = []
+    for k in range(count):
+        if version == 1:
+            duration, mediatime, rate = struct.unpack_from(">QqI", data, pos)
+            pos += 20
+        else:
+            duration, mediatime, rate = struct.unpack_from(">IiI", data, pos)
+            pos += 12
+        if mediatime == -1 and duration == 0:
+            continue
+        edits.append((duration, mediatime, rate))
+
+    if not edits:
+        return
+
+    # single normal edit only. (empty edit or multi edits are delegated to ffmpeg)
+    if len(edits) != 1 or edits[0][1] < 0 or edits[0][2] != 0x10000:
+        raise QtReaderError("edit list not supported")
+
+    duration, mediatime, rate = edits[0]
+    start = mediatime * track.framerate // mediascale
+    length = (duration * track.framerate + moviescale // 2) // moviescale
+    track.editstart = min(start, track.nframes)
+    track.nframes = min(track.nframes - track.editstart, length) if length else track.nframes - track.editstart
+
+
+def parse_tracks(path):
+    # return QtAudioTrack list of sound tracks in file order(same as ffmpeg 0:a:N)
+
+    with open(path, "rb") as f:
+        moov = read_moov(f)
+
+    mvhd = find_atom(moov, b"mvhd", 8)
+    if not mvhd:
+        raise QtReaderError("mvhd not found")
+    if moov[mvhd[0]] == 1:
+        moviescale = struct.unpack_from(">I", moov, mvhd[0] + 20)[0]
+    else:
+        moviescale = struct.unpack_from(">I", moov, mvhd[0] + 12)[0]
+
+    tracks = []
+    for atomtype, start, stop in iter_atoms(moov, 8):
+        if atomtype != b"trak":
+            continue
+
+        mdia = find_atom(moov, b"mdia", start, stop)
+        if not mdia:
+            continue
+        hdlr = find_atom(moov, b"hdlr", *mdia)
+        if not hdlr or moov[hdlr[0] + 8:hdlr[0] + 12] != b"soun":
+            continue
+
+        mdhd = find_atom(moov, b"mdhd", *mdia)
+        if moov[mdhd[0]] == 1:
+            mediascale = struct.unpack_from(">I", moov, mdhd[0] + 20)[0]
+        else:
+            mediascale = struct.unpack_from(">I", moov, mdhd[0] + 12)[0]
+
+        tkhd = find_atom(moov, b"tkhd", start, stop)
+        trackid = struct.unpack_from(">I", moov, tkhd[0] + (20 if moov[tkhd[0]] == 1 else 12))[0]
+
+        track = QtAudioTrack(path, trackid)
+        minf = find_atom(moov, b"minf", *mdia)
+        stbl = find_atom(moov, b"stbl", *minf)
+        stsd = find_atom(moov, b"stsd", *stbl)
+
+        framesperchunksample = parse_stsd(track, moov, *stsd)
+        parse_chunks(track, moov, stbl, framesperchunksample)
+        parse_edits(track, moov, (start, stop), moviescale, mediascale)
+
+        tracks.append(track)
+
+    return tracks
+
+
+class QtSource:
+    # one sound track(or one channel of it) of QuickTime file.
+    # channel=None is all channels(interleave).
+    # littleendian=False reads big endian track in file byte order(no byteswap).
+
+    def __init__(self, track, name, channel=None, littleendian=True):
+        self.track = track
+        self.name = name
+        self.channel = channel
+        self.littleendian = littleendian
+
+    def open(self):
+        return QtPcmReader(self)
+
+    def __str__(self):
+        return self.name + "(qt track{0})".format(self.track.trackid)
+
+
+class QtPcmReader:
+
+    def __init__(self, source):
+        self._track = source.track
+        self._channel = source.channel
+        self._byteswap = self._track.bigendian and source.littleendian
+        self._srcframesize = self._track.framesize()
+        if self._channel is None:
+            self._nchannels = self._track.nchannels
+        else:
+            self._nchannels = 1
+        self._sampwidth = self._track.sampwidth
+        self._soundpos = 0
+        self._file = open(self._track.path, "rb", buffering=0)
+
+    def __del__(self):
+        self.close()
+
+    def getnchannels(self):
+        return self._nchannels
+
+    def getsampwidth(self):
+        return self._sampwidth
+
+    def getframerate(self):
+        return self._track.framerate
+
+    def getnframes(self):
+        return self._track.nframes
+
+    def getchunksize(self):
+        # first pcm chunk offset
+        return self._track.chunkoffsets[0] if self._track.chunkoffsets else 0
+
+    def getparams(self):
+        compname = "ieee float" if self._track.isfloat else "QuickTime pcm track"
+        if self._track.bigendian and not self._byteswap:
+            compname += " big endian"
+        return (self._nchannels, self._sampwidth, self._track.framerate, self._track.nframes,
+                self._track.fourcc, compname)
+
+    def tell(self):
+        return self._soundpos
+
+    def rewind(self):
+        self._soundpos = 0
+
+    def setpos(self, pos):
+        if pos < 0 or pos > self._track.nframes:
+            raise QtReaderError("position not in range")
+        self._soundpos = pos
+
+    def readframes(self, nframes):
+
+        nframes = min(nframes, self._track.nframes - self._soundpos)
+        if nframes <= 0 or self._file is None:
+            return b''
+
+        chunkstarts = self._track.chunkstarts
+        chunkoffsets = self._track.chunkoffsets
+        framesize = self._srcframesize
+
+        # media frame position
+        mediapos = self._track.editstart + self._soundpos
+        mediaend = mediapos + nframes
+        c = bisect.bisect_right(chunkstarts, mediapos) - 1
+
+        blocks = []
+        while mediapos < mediaend and c < len(chunkoffsets):
+            inchunk = mediapos - chunkstarts[c]
+            readlen = min(chunkstarts[c + 1], mediaend) - mediapos
+            self._file.seek(chunkoffsets[c] + inchunk * framesize)
+            block = self._file.read(readlen * framesize)
+            blocks.append(block)
+            mediapos += len(block) // framesize
+            if len(block) < readlen * framesize:
+                # truncated file
+                break
+            c += 1
+
+        data = b''.join(blocks)
+        self._soundpos += len(data) // framesize
+
+        if self._channel is not None:
+            data = pcmreader.extract_channel(data, self._track.nchannels, self._sampwidth, self._channel)
+        if self._byteswap:
+            data = pcmreader.byteswap(data, self._sampwidth)
+
+        return data
+
+    def close(self):
+        if getattr(self, "_file", None) is not None:
+            self._file.close()
+            self._file = None
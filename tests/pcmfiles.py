@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+# Synthetic wav/mov/mxf files for reader tests.
+# pcm is written by hand(struct) from sample values, expected reader output is made from the same values.
+
+import struct
+
+import numpy
+
+
+def samples(nframes, nchannels, bits, floatsamples=False, seed=0):
+    # random sample values (nframes, nchannels), int or float(full scale 1.0, a few over full scale)
+    rng = numpy.random.default_rng(seed)
+    if floatsamples:
+        return rng.uniform(-1.1, 1.1, (nframes, nchannels))
+    if bits == 8:
+        return rng.integers(0, 256, (nframes, nchannels))
+    return rng.integers(-(1 << (bits - 1)), 1 << (bits - 1), (nframes, nchannels))
+
+
+def pcm(values, bits, floatsamples=False, bigendian=False):
+    # sample values -> interleaved pcm bytes
+    order = ">" if bigendian else "<"
+    flat = numpy.asarray(values).reshape(-1)
+    if floatsamples:
+        return flat.astype(order + "f" + str(bits // 8)).tobytes()
+    if bits == 8:
+        return flat.astype(numpy.uint8).tobytes()
+    if bits == 24:
+        raw = flat.astype("<i4").view(numpy.uint8).reshape(-1, 4)[:, :3]
+        return (raw[:, ::-1] if bigendian else raw).tobytes()
+    return flat.astype(order + "i" + str(bits // 8)).tobytes()
+
+
+# wav
+
+def write_wav(path, data, nchannels, bits, framerate, floatsamples=False, extensible=False):
+    formattag = 3 if floatsamples else 1
+    blockalign = nchannels * bits // 8
+    if extensible:
+        subformat = struct.pack("<H", formattag) + b"\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71"
+        fmt = struct.pack("<HHIIHHHHI", 0xFFFE, nchannels, framerate, framerate * blockalign, blockalign, bits,
+                          22, bits, 0) + subformat
+    else:
+        fmt = struct.pack("<HHIIHH", formattag, nchannels, framerate, framerate * blockalign, blockalign, bits)
+    chunks = b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(data)) + data
+    if len(data) % 2:
+        chunks += b"\x00"
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks)
+
+
+# QuickTime
+
+def atom(atomtype, *payloads):
+    body = b"".join(payloads)
+    return struct.pack(">I4s", 8 + len(body), atomtype) + body
+
+
+def fullatom(atomtype, version, *payloads):
+    return atom(atomtype, struct.pack(">B3x", version), *payloads)
+
+
+class MovTrack:
+    # one sound track. data is pcm in file byte order, chunks is frame num of every chunk.
+    # version: sound sample description version(0, 1, 2), enda: None(no wave/enda atom), True/False
+    # edit: None or (media time(media scale), duration(movie scale))
+
+    def __init__(self, fourcc, data, nchannels, bits, framerate, chunks, version=0, enda=None, lpcmflags=0,
+                 co64=False, stsztable=False, edit=None):
+        self.fourcc = fourcc
+        self.data = data
+        self.nchannels = nchannels
+        self.bits = bits
+        self.framerate = framerate
+        self.chunks = chunks
+        self.version = version
+        self.enda = enda
+        self.lpcmflags = lpcmflags
+        self.co64 = co64
+        self.stsztable = stsztable
+        self.edit = edit
+        self.offsets = []
+
+    def framesize(self):
+        return self.nchannels * self.bits // 8
+
+    def chunkdata(self, c):
+        start = sum(self.chunks[:c]) * self.framesize()
+        return self.data[start:start + self.chunks[c] * self.framesize()]
+
+    def stsd(self):
+        entry = b"\x00" * 6 + struct.pack(">H", 1)
+        if self.version == 2:
+            entry += struct.pack(">HH4sHHhHI", 2, 0, b"\x00" * 4, 3, 16, -2, 0, 0x10000)
+            entry += struct.pack(">IdIIIIII", 72, float(self.framerate), self.nchannels, 0x7F000000, self.bits,
+                                 self.lpcmflags, self.framesize(), 1)
+        else:
+            entry += struct.pack(">HH4sHHhHI", self.version, 0, b"\x00" * 4, self.nchannels,
+                                 16 if self.version else self.bits, -2 if self.version else 0, 0,
+                                 self.framerate << 16)
+            if self.version == 1:
+                entry += struct.pack(">IIII", 1, self.bits // 8, self.framesize(), self.bits // 8)
+        if self.enda is not None:
+            entry += atom(b"wave", atom(b"frma", self.fourcc.encode()),
+                          atom(b"enda", struct.pack(">H", 1 if self.enda else 0)), struct.pack(">I", 0) * 2)
+        entry = struct.pack(">I4s", 8 + len(entry), self.fourcc.encode()) + entry
+        return fullatom(b"stsd", 0, struct.pack(">I", 1), entry)
+
+    def stbl(self):
+        nframes = sum(self.chunks)
+        samplesize = self.framesize() if self.version == 2 else 1
+        # runs of same samples per chunk
+        runs = []
+        for c, n in enumerate(self.chunks):
+            if not runs or runs[-1][1] != n:
+                runs.append((c + 1, n))
+        stsc = fullatom(b"stsc", 0, struct.pack(">I", len(runs)),
+                        b"".join(struct.pack(">III", first, n, 1) for first, n in runs))
+        if self.stsztable:
+            stsz = fullatom(b"stsz", 0, struct.pack(">II", 0, nframes),
+                            struct.pack(">{0}I".format(nframes), *([self.framesize()] * nframes)))
+        else:
+            stsz = fullatom(b"stsz", 0, struct.pack(">II", samplesize, nframes))
+        if self.co64:
+            stco = fullatom(b"co64", 0, struct.pack(">I", len(self.offsets)),
+                            struct.pack(">{0}Q".format(len(self.offsets)), *self.offsets))
+        else:
+            stco = fullatom(b"stco", 0, struct.pack(">I", len(self.offsets)),
+                            struct.pack(">{0}I".format(len(self.offsets)), *self.offsets))
+        stts = fullatom(b"stts", 0, struct.pack(">III", 1, nframes, 1))
+        return atom(b"stbl", self.stsd(), stts, stsc, stsz, stco)
+
+    def trak(self, trackid, moviescale):
+        nframes = sum(self.chunks)
+        tkhd = fullatom(b"tkhd", 0, struct.pack(">III", 0, 0, trackid), b"\x00" * 68)
+        mdhd = fullatom(b"mdhd", 0, struct.pack(">IIII", 0, 0, self.framerate, nframes), b"\x00" * 4)
+        hdlr = fullatom(b"hdlr", 0, b"mhlr", b"soun", b"\x00" * 12)
+        minf = atom(b"minf", fullatom(b"smhd", 0, b"\x00" * 4), self.stbl())
+        trak = [tkhd]
+        if self.edit is not None:
+            mediatime, duration = self.edit
+            trak.append(atom(b"edts", fullatom(b"elst", 0, struct.pack(">IIiI", 1, duration, mediatime, 0x10000))))
+        trak.append(atom(b"mdia", mdhd, hdlr, minf))
+        return atom(b"trak", *trak)
+
+
+def write_mov(path, tracks, moviescale=600, moovfirst=False):
+    # chunks of tracks are interleaved in mdat(chunk 0 of every track, chunk 1...)
+    order = []
+    for c in range(max(len(track.chunks) for track in tracks)):
+        order.extend((track, c) for track in tracks if c < len(track.chunks))
+    mdatbody = b"".join(track.chunkdata(c) for track, c in order)
+
+    def moov():
+        mvhd = fullatom(b"mvhd", 0, struct.pack(">III", 0, 0, moviescale), b"\x00" * 84)
+        return atom(b"moov", mvhd, *[track.trak(k + 1, moviescale) for k, track in enumerate(tracks)])
+
+    ftyp = atom(b"ftyp", b"qt  ", struct.pack(">I", 0x200), b"qt  ")
+    # moov size does not depend on offset values
+    for track in tracks:
+        track.offsets = [0] * len(track.chunks)
+    start = len(ftyp) + (len(moov()) if moovfirst else 0) + 8
+    for track, c in order:
+        track.offsets[c] = start
+        start += len(track.chunkdata(c))
+
+    with open(path, "wb") as f:
+        f.write(ftyp)
+        if moovfirst:
+            f.write(moov())
+        f.write(atom(b"mdat", mdatbody))
+        if not moovfirst:
+            f.write(moov())
+
+
+# MXF
+
+def klv(key, value, berlong=True):
+    if berlong:
+        length = b"\x83" + len(value).to_bytes(3, "big")
+    else:
+        length = bytes([len(value)])
+    return key + length + value
+
+
+def localset(settype, tags):
+    key = b"\x06\x0e\x2b\x34\x02\x53\x01\x01\x0d\x01\x01\x01\x01\x01" + bytes([settype, 0x00])
+    value = b"".join(struct.pack(">HH", tag, len(data)) + data for tag, data in tags)
+    return klv(key, value)
+
+
+def essencekey(itemtype, elementtype, number, count=1):
+    return b"\x06\x0e\x2b\x34\x01\x02\x01\x01\x0d\x01\x03\x01" + bytes([itemtype, count, elementtype, number])
+
+
+class MxfTrack:
+    # one sound track, elements is pcm bytes(in file layout) of every essence element
+    # itemtype 0x16 = generic container sound(elementtype 0x01 BWF frame wrapped, 0x03 AES3), 0x06 = D-10
+
+    def __init__(self, trackid, number, elements, nchannels, bits, framerate, itemtype=0x16, elementtype=0x01,
+                 linked=True):
+        self.trackid = trackid
+        self.number = number
+        self.elements = elements
+        self.nchannels = nchannels
+        self.bits = bits
+        self.framerate = framerate
+        self.itemtype = itemtype
+        self.elementtype = elementtype
+        self.linked = linked
+
+    def key(self):
+        return essencekey(self.itemtype, self.elementtype, self.number)
+
+    def tracknumber(self):
+        return int.from_bytes(self.key()[12:16], "big")
+
+    def header(self):
+        track = localset(0x3b, [(0x4801, struct.pack(">I", self.trackid)),
+                                (0x4804, struct.pack(">I", self.tracknumber()))])
+        tags = [(0x3d03, struct.pack(">ii", self.framerate, 1)),
+                (0x3d07, struct.pack(">I", self.nchannels)),
+                (0x3d01, struct.pack(">I", self.bits))]
+        if self.linked:
+            tags.insert(0, (0x3006, struct.pack(">I", self.trackid)))
+        return track + localset(0x48, tags)
+
+
+def d10_element(values, bits):
+    # D-10 AES3 element: 4 byte header + 8 slots of 32bit subframe, audio in bit 4-27(24bit) or 12-27(16bit)
+    shift = 4 if bits == 24 else 12
+    nframes, nchannels = values.shape
+    slots = numpy.zeros((nframes, 8), dtype=numpy.uint32)
+    slots[:, :nchannels] = (values.astype(numpy.int64) & ((1 << bits) - 1)) << shift
+    # AES3 preamble/validity bits below audio are not pcm
+    slots[:, :nchannels] |= 0x5
+    return struct.pack("<HH", nframes, 0xff) + slots.astype("<u4").tobytes()
+
+
+def write_mxf(path, tracks, interleave=True):
+    # header partition pack is not read by mxfreader, only metadata sets and essence elements
+    partition = klv(b"\x06\x0e\x2b\x34\x02\x05\x01\x01\x0d\x01\x02\x01\x01\x02\x04\x00", b"\x00" * 88)
+    header = b"".join(track.header() for track in tracks)
+    fill = klv(b"\x06\x0e\x2b\x34\x01\x01\x01\x02\x03\x01\x02\x10\x01\x00\x00\x00", b"\x00" * 16, berlong=False)
+    body = []
+    if interleave:
+        for e in range(max(len(track.elements) for track in tracks)):
+            body.extend(klv(track.key(), track.elements[e]) for track in tracks if e < len(track.elements))
+    else:
+        for track in tracks:
+            body.extend(klv(track.key(), element) for element in track.elements)
+    with open(path, "wb") as f:
+        f.write(partition + header + fill + b"".join(body))
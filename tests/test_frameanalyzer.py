@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import frameanalyzer
+import framehash
+import pcmreader
+from pcmfiles import pcm, samples, write_wav
+
+NAMES = (frameanalyzer.PeakAnalyzer.name, frameanalyzer.NullAnalyzer.name, frameanalyzer.DcOffsetAnalyzer.name)
+
+
+def per_frame(values, cadence):
+    # sample values of every frame(cadence cycle from first sample, last frame may be short)
+    frames = []
+    pos = 0
+    while pos < len(values):
+        nsamples = cadence[len(frames) % len(cadence)]
+        frames.append(values[pos:pos + nsamples])
+        pos += nsamples
+    return frames
+
+
+def test_analyzers_same_as_per_frame(tmp_path, monkeypatch):
+    # analyzer values of block reads are the same as numpy of every frame
+    monkeypatch.setattr(framehash, "BLOCKBYTES", 50000)
+    for bits, floatsamples in ((16, False), (24, False), (32, False), (32, True), (64, True)):
+        values = samples(48000 * 2 + 333, 4, bits, floatsamples, seed=70 + bits)
+        # ch2 is polarity inverted ch1 for half of the frames(-full scale has no inverted value)
+        if not floatsamples:
+            values[:, 0] = numpy.maximum(values[:, 0], 1 - (1 << (bits - 1)))
+        values[:48000, 1] = -values[:48000, 0]
+        if floatsamples:
+            values = values.astype("f" + str(bits // 8)).astype(numpy.float64)
+        path = str(tmp_path / "src.wav")
+        write_wav(path, pcm(values, bits, floatsamples), 4, bits, 48000, floatsamples)
+
+        result = framehash.hash_source(path, "29.97", analyzers=NAMES)
+        frames = per_frame(values, result.cadence)
+        analyses = result.analyses
+        assert numpy.array_equal(analyses["peaks"], [numpy.abs(frame).max(axis=0) for frame in frames])
+        assert numpy.array_equal(analyses["nullpeaks"],
+                                 [numpy.abs(frame[:, 0::2] + frame[:, 1::2]).max(axis=0) for frame in frames])
+        assert numpy.allclose(analyses["dcoffset"], [frame.mean(axis=0) for frame in frames])
+        assert not analyses["nullpeaks"][:29, 0].any()
+        assert analyses["peaks"].dtype == (numpy.float64 if floatsamples else numpy.int64)
+
+
+def test_analyzers_share_one_read(tmp_path, monkeypatch):
+    # all analyzers get the blocks of the frame hash read, path is opened once
+    path = str(tmp_path / "src.wav")
+    write_wav(path, pcm(samples(48000, 2, 16, seed=75), 16), 2, 16, 48000)
+    opened = []
+    open_pcm = pcmreader.open_pcm
+
+    def counted(source):
+        opened.append(source)
+        return open_pcm(source)
+
+    monkeypatch.setattr(pcmreader, "open_pcm", counted)
+    result = framehash.hash_source(path, "25", analyzers=NAMES + (frameanalyzer.ChannelDigestAnalyzer.name,))
+    assert opened == [path]
+    assert sorted(result.analyses) == sorted(NAMES + (frameanalyzer.ChannelDigestAnalyzer.name,))
+    assert all(len(value) == 25 for value in result.analyses.values())
+
+    # total only hashing has no frame analyses
+    assert framehash.hash_source(path, "25", totalonly=True, analyzers=NAMES).analyses == {}
+
+
+def test_register_analyzer(tmp_path):
+    # analyzer registered by name is run by hash_source(analyzers=(name,))
+    @frameanalyzer.register_analyzer
+    class FrameLengthAnalyzer(frameanalyzer.FrameAnalyzer):
+        name = "test_framelengths"
+
+        def block(self, frameblock):
+            self.blocks.append(numpy.diff(frameblock.starts() + [len(frameblock.samples())]))
+
+        def value(self):
+            return numpy.concatenate(self.blocks)
+
+    try:
+        path = str(tmp_path / "src.wav")
+        write_wav(path, pcm(samples(48048 + 10, 1, 16, seed=76), 16), 1, 16, 48000)
+        result = framehash.hash_source(path, "23.98", analyzers=(FrameLengthAnalyzer.name,))
+        assert result.analyses[FrameLengthAnalyzer.name].tolist() == [2002] * 24 + [10]
+    finally:
+        del frameanalyzer.ANALYZERS[FrameLengthAnalyzer.name]
+
+
+def test_stitch_with_frameindices():
+    values = [numpy.array([[1, 2], [3, 4]]), numpy.array([[5, 6]])]
+    assert frameanalyzer.FrameAnalyzer.stitch(values).tolist() == [[1, 2], [3, 4], [5, 6]]
+    assert frameanalyzer.FrameAnalyzer.stitch(values, [1, 4], 6).tolist() == \
+        [[0, 0], [1, 2], [3, 4], [0, 0], [5, 6], [0, 0]]
@@ -0,0 +1,401 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+import os
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+import xxhash
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import frameanalyzer
+import framehash
+from pcmfiles import pcm, samples, write_wav
+
+
+def test_descend_runs_different_length():
+    # src is 1 coarse unit longer than org, same pcm in common units
+    coarseframes = 4
+    src = array('Q', range(1, 12))
+    org = array('Q', range(1, 11))
+
+    srcruns = framehash.descend_runs(src, org)
+    orgruns = framehash.descend_runs(org, src)
+    assert srcruns == [(8, 11)]
+    assert orgruns == [(8, 10)]
+
+    # frame digests of descend hashing(not hashed frames are 0) must not differ in common frames
+    srcframes = framehash.keep_runs(array('Q', range(1, 45)), srcruns, coarseframes)
+    orgframes = framehash.keep_runs(array('Q', range(1, 41)), orgruns, coarseframes)
+    assert framehash.mismatch_runs(srcframes, orgframes, len(orgframes)) == []
+
+
+def test_descend_runs_mismatch():
+    src = array('Q', [1, 2, 3, 4, 5, 6, 7, 8])
+    org = array('Q', [1, 2, 9, 4, 5, 6])
+    assert framehash.descend_runs(src, org) == [(2, 3), (4, 8)]
+    assert framehash.descend_runs(org, src) == [(2, 3), (4, 6)]
+
+
+def test_process_pool_cancel(tmp_path):
+    # pending tasks are not started after cancel and the pool exits
+    path = str(tmp_path / "src.wav")
+    write_wav(path, pcm(samples(48000 * 10, 2, 16, seed=50), 16), 2, 16, 48000)
+
+    context = multiprocessing.get_context("fork")
+    cancelevent = context.Event()
+    executor = ProcessPoolExecutor(2, mp_context=context, initializer=framehash.init_process,
+                                   initargs=(cancelevent,))
+    futures = [executor.submit(framehash.hash_source_process, path, "25") for _ in range(200)]
+    assert futures[0].result().framecount == 10 * 25
+
+    cancelevent.set()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    deadline = time.monotonic() + 30
+    while multiprocessing.active_children() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not multiprocessing.active_children()
+    assert any(future.cancelled() for future in futures)
+
+
+def test_process_cancel_event(tmp_path):
+    # running task stops at next block when cancel event is set
+    path = str(tmp_path / "src.wav")
+    write_wav(path, pcm(samples(48000 * 10, 2, 16, seed=51), 16), 2, 16, 48000)
+    cancelevent = multiprocessing.Event()
+    framehash.init_process(cancelevent)
+    try:
+        assert framehash.hash_source_process(path, "25").framecount == 10 * 25
+        cancelevent.set()
+        result = framehash.hash_source_process(path, "25")
+    finally:
+        framehash.init_process(None)
+    assert result.framecount == 0
+    assert result.digests == array('Q')
+
+
+def baseline_frames(samplerate, fps, nframes):
+    # frame sample nums of baseline proc_wavhash4(one readframes per frame, size stepped after each read)
+    if samplerate == 44100:
+        ma_fps = 30
+    elif fps == "23.98":
+        ma_fps = 24
+    elif fps == "29.97":
+        ma_fps = 30
+    else:
+        ma_fps = float(fps)
+    oneframe_sz = int(samplerate / ma_fps)
+
+    varsz = 0
+    count = 0
+    if fps == "23.98":
+        varsz = int(oneframe_sz / 1000)
+    elif fps == "29.97":
+        varsz = {48000: 2, 96000: 3}.get(samplerate, 0)
+
+    frames = []
+    for _ in range(nframes):
+        frames.append(oneframe_sz + varsz)
+        if fps == "29.97" and samplerate == 48000:
+            varsz = 1 if count % 2 == 0 else 2
+            count += 1
+            if count == 5:
+                count = 0
+                varsz = 2
+        elif fps == "29.97" and samplerate == 96000:
+            varsz = 4 if count == 1 else 3
+            count += 1
+            if count == 5:
+                count = 0
+                varsz = 3
+    return frames
+
+
+def test_frame_cadence_same_as_baseline():
+    for samplerate in (44100, 48000, 96000):
+        for fps in ("23.98", "24", "25", "29.97", "30", "59.94"):
+            _, cadence = framehash.frame_cadence(samplerate, fps)
+            assert cadence * (20 // len(cadence)) == baseline_frames(samplerate, fps, 20)
+
+    assert framehash.frame_cadence(48000, "29.97")[1] == [1602, 1601, 1602, 1601, 1602]
+    assert framehash.frame_cadence(96000, "29.97")[1] == [3203, 3203, 3204, 3203, 3203]
+    assert framehash.frame_cadence(48000, "23.98")[1] == [2002]
+    assert framehash.frame_cadence(96000, "23.98")[1] == [4004]
+
+
+def test_block_table():
+    blocksamples, offsets = framehash.block_table([1602, 1601, 1602, 1601, 1602], 6, 100000)
+    # whole cycles(8008 samples, 48048 bytes)
+    assert blocksamples == 8008 * 2
+    assert offsets == [0] + list(numpy.cumsum([1602, 1601, 1602, 1601, 1602] * 2) * 6)
+    assert framehash.block_table([2002], 4, 10) == (2002, [0, 8008])
+
+
+def test_hash_source_same_as_per_frame(tmp_path, monkeypatch):
+    # block hashing gives the same digests as baseline per frame reads(last frame short)
+    monkeypatch.setattr(framehash, "BLOCKBYTES", 64 * 1024)
+    for samplerate, fps in ((48000, "29.97"), (96000, "29.97"), (48000, "23.98"), (44100, "25")):
+        values = samples(samplerate * 3 + 777, 2, 24, seed=52)
+        data = pcm(values, 24)
+        path = str(tmp_path / "src.wav")
+        write_wav(path, data, 2, 24, samplerate)
+        result = framehash.hash_source(path, fps)
+
+        frames = []
+        pos = 0
+        for nsamples in baseline_frames(samplerate, fps, len(values)):
+            if pos >= len(data):
+                break
+            frames.append(data[pos:pos + nsamples * 6])
+            pos += nsamples * 6
+        assert list(result.digests) == [xxhash.xxh3_64_intdigest(frame) for frame in frames]
+        assert result.framecount == len(frames)
+        assert result.total == xxhash.xxh3_64_hexdigest(data)
+        assert bytes(result.lastframe) == frames[-1]
+        assert bytes(result.lastprevframe) == frames[-2]
+        assert result.shortframe == len(frames[-1]) / 6
+
+
+def baseline_sections(srcdigests, orgdigests, length):
+    # error sections of baseline __check_allframe2 frame loop [(start, end(exclusive)), ...]
+    sections = []
+    start = None
+    for i in range(length):
+        if srcdigests[i] != orgdigests[i]:
+            if start is None:
+                start = i
+        elif start is not None:
+            sections.append((start, i))
+            start = None
+    if start is not None:
+        sections.append((start, length))
+    return sections
+
+
+def test_mismatch_runs_same_as_frame_loop():
+    rng = numpy.random.default_rng(53)
+    for rate in (0.0, 0.01, 0.3, 0.9, 1.0):
+        src = array('Q', rng.integers(0, 1 << 63, 5000, dtype=numpy.uint64).tolist())
+        org = array('Q', src)
+        for i in numpy.flatnonzero(rng.random(5000) < rate):
+            org[i] ^= 1 << 63
+        # org is longer, first length frames are compared
+        org.extend([1, 2, 3])
+        for length in (0, 1, 4999, 5000):
+            assert framehash.mismatch_runs(src, org, length) == baseline_sections(src, org, length)
+
+    # runs at both ends
+    src = array('Q', [1, 2, 3, 4, 5, 6])
+    org = array('Q', [0, 0, 3, 4, 0, 0])
+    assert framehash.mismatch_runs(src, org, 6) == [(0, 2), (4, 6)]
+    assert all(type(value) is int for run in framehash.mismatch_runs(src, org, 6) for value in run)
+
+
+def test_segments_same_as_unsharded(tmp_path):
+    # stitched segment results are the same as hashing the whole path at once
+    path = str(tmp_path / "src.wav")
+    write_wav(path, pcm(samples(48000 * 12 + 1234, 2, 24, seed=54), 24), 2, 24, 48000)
+    names = (frameanalyzer.PeakAnalyzer.name, frameanalyzer.NullAnalyzer.name)
+
+    for headbytes in (0, 300 * 6):
+        full = framehash.hash_source(path, "29.97", headbytes=headbytes, analyzers=names)
+        for shards in (2, 3, 5):
+            segments = framehash.plan_segments(path, "29.97", shards, headbytes)
+            assert len(segments) == shards
+            assert segments[0][0] == headbytes // 6
+            assert all(segsamples % 8008 == 0 for _, segsamples in segments[:-1])
+            results = [framehash.hash_source(path, "29.97", segment=segment, analyzers=names)
+                       for segment in segments]
+            stitched = framehash.stitch_results(results)
+
+            assert stitched.digests == full.digests
+            assert stitched.total == framehash.digests_total(full.digests)
+            assert stitched.framecount == full.framecount
+            assert bytes(stitched.lastframe) == bytes(full.lastframe)
+            assert bytes(stitched.lastprevframe) == bytes(full.lastprevframe)
+            assert stitched.shortframe == full.shortframe
+            assert (stitched.startpos, stitched.endpos) == (full.startpos, full.endpos)
+            for name in names:
+                assert numpy.array_equal(stitched.analyses[name], full.analyses[name])
+
+        # total only: segments are whole coarse units
+        full = framehash.hash_source(path, "29.97", headbytes=headbytes, totalonly=True)
+        segments = framehash.plan_segments(path, "29.97", 4, headbytes, totalonly=True)
+        assert all(segsamples % full.coarsesamples == 0 for _, segsamples in segments[:-1])
+        stitched = framehash.stitch_results([framehash.hash_source(path, "29.97", segment=segment, totalonly=True)
+                                             for segment in segments])
+        assert stitched.coarse == full.coarse
+        assert stitched.total == framehash.digests_total(full.coarse)
+        assert stitched.shortframe == full.shortframe
+
+
+def test_plan_segments_short_or_pipe(tmp_path):
+    path = str(tmp_path / "short.wav")
+    write_wav(path, pcm(samples(8008 * 3, 1, 16, seed=55), 16), 1, 16, 48000)
+    assert framehash.plan_segments(path, "29.97", 2) is None
+    assert framehash.plan_segments(path, "29.97", 1) is None
+
+
+def descend_hash(path, firstpass, runs):
+    # second pass of two phase check(proc_wavhash4 coarse diff): only coarse unit runs are hashed every frame
+    segments = []
+    frameindices = []
+    for start, end in runs:
+        count = (end - start) * firstpass.coarsesamples if end < len(firstpass.coarse) else None
+        segments.append((firstpass.startpos + start * firstpass.coarsesamples, count))
+        frameindices.append(start * firstpass.coarseframes)
+    results = [framehash.hash_source(path, "29.97", segment=segment) for segment in segments]
+    return framehash.stitch_results(results, frameindices=frameindices, framecount=firstpass.framecount)
+
+
+def test_two_phase_same_as_full_hashing(tmp_path):
+    values = samples(48000 * 10 + 500, 2, 16, seed=56)
+    srcpath = str(tmp_path / "src.wav")
+    write_wav(srcpath, pcm(values, 16), 2, 16, 48000)
+
+    changed = values.copy()
+    changed[100000, 0] += 1
+    changed[300000:300100] = 0
+    changed[-10] = 0
+    cases = [values, changed, values[:48000 * 8], changed[:48000 * 9 + 7]]
+    for k, orgvalues in enumerate(cases):
+        orgpath = str(tmp_path / "org{0}.wav".format(k))
+        write_wav(orgpath, pcm(orgvalues, 16), 2, 16, 48000)
+
+        srcfirst = framehash.hash_source(srcpath, "29.97", totalonly=True)
+        orgfirst = framehash.hash_source(orgpath, "29.97", totalonly=True)
+        srcfull = framehash.hash_source(srcpath, "29.97")
+        orgfull = framehash.hash_source(orgpath, "29.97")
+        assert (srcfirst.total == orgfirst.total) == (srcfull.total == orgfull.total) == (k == 0)
+        assert srcfirst.framecount == srcfull.framecount
+
+        srcsecond = descend_hash(srcpath, srcfirst, framehash.descend_runs(srcfirst.coarse, orgfirst.coarse))
+        orgsecond = descend_hash(orgpath, orgfirst, framehash.descend_runs(orgfirst.coarse, srcfirst.coarse))
+        length = min(len(srcfull.digests), len(orgfull.digests))
+        assert len(srcsecond.digests) == len(srcfull.digests)
+        assert len(orgsecond.digests) == len(orgfull.digests)
+        assert framehash.mismatch_runs(srcsecond.digests, orgsecond.digests, length) == \
+            framehash.mismatch_runs(srcfull.digests, orgfull.digests, length)
+        assert bytes(srcsecond.lastframe) == bytes(srcfull.lastframe)
+        assert bytes(orgsecond.lastprevframe) == bytes(orgfull.lastprevframe)
+
+
+def test_section_sample_diffs(tmp_path, monkeypatch):
+    # sample positions of every error section against a numpy compare of the whole pcm
+    monkeypatch.setattr(framehash, "BLOCKBYTES", 10000)
+    values = samples(48000 * 4, 2, 24, seed=57)
+    changed = values.copy()
+    changed[5000, 1] += 1
+    changed[20000:26000:7] = 0
+    changed[100000] += 3
+    changed = changed[:48000 * 4 - 1000]
+    # src has 300 samples before the first frame(cinex head skip)
+    srcpath = str(tmp_path / "src.wav")
+    orgpath = str(tmp_path / "org.wav")
+    write_wav(srcpath, pcm(numpy.concatenate([samples(300, 2, 24, seed=58), values]), 24), 2, 24, 48000)
+    write_wav(orgpath, pcm(changed, 24), 2, 24, 48000)
+
+    srcresult = framehash.hash_source(srcpath, "29.97", headbytes=300 * 6)
+    orgresult = framehash.hash_source(orgpath, "29.97")
+    sections = framehash.mismatch_runs(srcresult.digests, orgresult.digests, len(orgresult.digests))
+    assert len(sections) == 4
+
+    diffs = framehash.section_sample_diffs(srcresult, orgresult, sections)
+    for (start, end), diff in zip(sections, diffs):
+        first = framehash.frame_start(start, srcresult.cadence)
+        last = min(framehash.frame_start(end, srcresult.cadence), len(values))
+        differ = (values[first:last] != numpy.pad(changed, ((0, len(values) - len(changed)), (0, 0)),
+                                                   constant_values=1 << 30)[first:last]).any(axis=1)
+        index = numpy.flatnonzero(differ)
+        assert diff == (int(index[0]), int(index[-1]), int(index.size))
+
+    # one changed sample in first section
+    assert diffs[0] == (5000 - framehash.frame_start(sections[0][0], srcresult.cadence),) * 2 + (1,)
+    assert framehash.section_sample_diffs(srcresult, orgresult, sections, cancelled=lambda: True) == [None] * 4
+
+
+def test_silence_map(tmp_path):
+    # peaks of every frame and channel, runs over threshold against a per frame loop
+    values = numpy.zeros((48000 * 2, 2), dtype=numpy.int64)
+    values[1000, 0] = 40
+    values[10000:20000, 1] = samples(10000, 1, 24, seed=59)[:, 0]
+    values[50000:50010, 0] = -(1 << 23)
+    path = str(tmp_path / "src.wav")
+    write_wav(path, pcm(values, 24), 2, 24, 48000)
+
+    result = framehash.hash_source(path, "25", analyzers=(frameanalyzer.PeakAnalyzer.name,))
+    peaks = result.analyses[frameanalyzer.PeakAnalyzer.name]
+    expected = numpy.array([numpy.abs(values[k:k + 1920]).max(axis=0) for k in range(0, len(values), 1920)])
+    assert numpy.array_equal(peaks, expected)
+
+    loud = [k for k in range(len(expected)) if expected[k].any()]
+    assert frameanalyzer.loud_frames(peaks) == loud
+    assert frameanalyzer.channel_levels(peaks) == [(1 << 23, 2), (int(expected[:, 1].max()), 6)]
+
+    limit = frameanalyzer.db_limit(-60, 3)
+    assert limit == int((1 << 23) * 10 ** -3)
+    framepeaks = peaks.max(axis=1)
+    runs = []
+    for k, peak in enumerate(framepeaks):
+        if peak > limit:
+            if runs and runs[-1][1] == k:
+                runs[-1] = (runs[-1][0], k + 1, max(runs[-1][2], peak))
+            else:
+                runs.append((k, k + 1, peak))
+    assert framehash.threshold_runs(framepeaks, limit) == runs
+    assert frameanalyzer.peak_dbfs(1 << 23, 3) == 0.0
+    assert frameanalyzer.peak_dbfs(0, 3) == float("-inf")
+
+
+def test_split_same_as_mono_files(tmp_path):
+    # channels hashed from one interleave read are the same as hashing channelsplit mono wavs
+    values = samples(48000 * 3 + 999, 6, 24, seed=63)
+    path = str(tmp_path / "51ch.wav")
+    write_wav(path, pcm(values, 24), 6, 24, 48000)
+    monos = []
+    for ch in range(6):
+        monos.append(str(tmp_path / "ch{0}.wav".format(ch)))
+        write_wav(monos[ch], pcm(values[:, ch:ch + 1], 24), 1, 24, 48000)
+
+    split = framehash.hash_source(path, "29.97", split=True, analyzers=(frameanalyzer.ChannelDigestAnalyzer.name,))
+    splittotal = framehash.hash_source(path, "29.97", split=True, totalonly=True)
+    chdigests = split.analyses[frameanalyzer.ChannelDigestAnalyzer.name]
+    for ch in range(6):
+        mono = framehash.hash_source(monos[ch], "29.97")
+        assert split.channels[ch].digests == mono.digests
+        assert split.channels[ch].total == mono.total
+        assert bytes(split.channels[ch].lastframe) == bytes(mono.lastframe)
+        assert bytes(split.channels[ch].lastprevframe) == bytes(mono.lastprevframe)
+        assert (split.channels[ch].framecount, split.channels[ch].shortframe) == (mono.framecount, mono.shortframe)
+        assert chdigests[:, ch].tolist() == list(mono.digests)
+        monototal = framehash.hash_source(monos[ch], "29.97", totalonly=True)
+        assert splittotal.channels[ch].coarse == monototal.coarse
+        assert splittotal.channels[ch].total == monototal.total
+
+
+def test_channel_mismatch_runs(tmp_path):
+    # differ frames of every channel, only in error sections of interleave frames
+    values = samples(48000 * 2, 4, 16, seed=64)
+    changed = values.copy()
+    changed[10000, 2] += 1
+    changed[30000:40000, 0] = 0
+    changed[30000:31000, 3] = 0
+    srcpath = str(tmp_path / "src.wav")
+    orgpath = str(tmp_path / "org.wav")
+    write_wav(srcpath, pcm(values, 16), 4, 16, 48000)
+    write_wav(orgpath, pcm(changed, 16), 4, 16, 48000)
+
+    names = (frameanalyzer.ChannelDigestAnalyzer.name,)
+    src = framehash.hash_source(srcpath, "25", analyzers=names)
+    org = framehash.hash_source(orgpath, "25", analyzers=names)
+    sections = framehash.mismatch_runs(src.digests, org.digests, len(org.digests))
+    assert sections == [(5, 6), (15, 21)]
+    runs = framehash.channel_mismatch_runs(src.analyses[names[0]], org.analyses[names[0]], sections)
+    assert runs == [[(15, 21)], [], [(5, 6)], [(15, 17)]]
+    assert framehash.channel_mismatch_runs(src.analyses[names[0]], org.analyses[names[0]], sections[1:]) == \
+        [[(15, 21)], [], [], [(15, 17)]]
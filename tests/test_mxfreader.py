@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mxfreader
+import pcmreader
+from pcmfiles import MxfTrack, d10_element, pcm, samples, write_mxf
+
+
+def read_all(source):
+    reader = pcmreader.open_pcm(source)
+    try:
+        return reader.readframes(reader.getnframes() + 1)
+    finally:
+        reader.close()
+
+
+def read_range(source, pos, nframes):
+    reader = pcmreader.open_pcm(source)
+    try:
+        reader.setpos(pos)
+        return reader.readframes(nframes)
+    finally:
+        reader.close()
+
+
+def elements(values, bits, sizes):
+    # pcm of every element(edit unit)
+    starts = [sum(sizes[:k]) for k in range(len(sizes))]
+    return [pcm(values[start:start + size], bits) for start, size in zip(starts, sizes)]
+
+
+def test_bwf_aes3_tracks(tmp_path):
+    # 2 tracks interleaved by edit unit, ffmpeg order is TrackID(not file order)
+    sizes = [1920, 1920, 1600, 1920]
+    stereo = samples(sum(sizes), 2, 24, seed=50)
+    mono = samples(sum(sizes), 1, 16, seed=51)
+    path = str(tmp_path / "op1a.mxf")
+    write_mxf(path, [MxfTrack(3, 1, elements(stereo, 24, sizes), 2, 24, 48000),
+                     MxfTrack(2, 2, elements(mono, 16, sizes), 1, 16, 48000, elementtype=0x03)])
+
+    tracks = mxfreader.parse_tracks(path)
+    assert [track.trackid for track in tracks] == [2, 3]
+    assert [track.getformat() for track in tracks] == ["AES3", "BWF"]
+    assert [(track.nchannels, track.sampwidth, track.nframes) for track in tracks] == [(1, 2, 7360), (2, 3, 7360)]
+    assert tracks[1].getcodec() == "pcm_s24le"
+
+    assert read_all(mxfreader.MxfSource(tracks[0], "AES3")) == pcm(mono, 16)
+    assert read_all(mxfreader.MxfSource(tracks[1], "BWF")) == pcm(stereo, 24)
+    assert read_all(mxfreader.MxfSource(tracks[1], "BWF", 1)) == pcm(stereo[:, 1:], 24)
+    # read across elements
+    assert read_range(mxfreader.MxfSource(tracks[1], "BWF"), 1800, 2200) == pcm(stereo[1800:4000], 24)
+
+
+@pytest.mark.parametrize("bits", [16, 24])
+def test_d10(tmp_path, bits):
+    # D-10 AES3 element: 8 slots of 32bit subframe, 4 channels used
+    sizes = [1920, 1920, 1920]
+    values = samples(sum(sizes), 4, bits, seed=52)
+    path = str(tmp_path / "d10.mxf")
+    d10elements = [d10_element(values[k * 1920:(k + 1) * 1920], bits) for k in range(3)]
+    write_mxf(path, [MxfTrack(2, 1, d10elements, 4, bits, 48000, itemtype=0x06, elementtype=0x10)])
+
+    track = mxfreader.parse_tracks(path)[0]
+    assert track.getformat() == "D-10 AES3"
+    assert (track.nchannels, track.sampwidth, track.nframes) == (4, bits // 8, 5760)
+    assert read_all(mxfreader.MxfSource(track, "D-10")) == pcm(values, bits)
+    assert read_all(mxfreader.MxfSource(track, "D-10", 3)) == pcm(values[:, 3:], bits)
+    assert read_range(mxfreader.MxfSource(track, "D-10"), 1900, 100) == pcm(values[1900:2000], bits)
+
+
+def test_op_atom(tmp_path):
+    # one track, descriptor without LinkedTrackID, all elements after header
+    sizes = [48000, 24000]
+    values = samples(sum(sizes), 1, 24, seed=53)
+    path = str(tmp_path / "opatom.mxf")
+    write_mxf(path, [MxfTrack(2, 1, elements(values, 24, sizes), 1, 24, 48000, linked=False)], interleave=False)
+
+    track = mxfreader.parse_tracks(path)[0]
+    assert track.nframes == 72000
+    assert read_all(mxfreader.MxfSource(track, "atom")) == pcm(values, 24)
+
+    # 2 tracks without link can't be matched to descriptors
+    path = str(tmp_path / "unlinked.mxf")
+    write_mxf(path, [MxfTrack(2, 1, elements(values, 24, sizes), 1, 24, 48000, linked=False),
+                     MxfTrack(3, 2, elements(values, 24, sizes), 1, 24, 48000, linked=False)])
+    with pytest.raises(mxfreader.MxfReaderError):
+        mxfreader.parse_tracks(path)
+
+
+def test_force16bit(tmp_path):
+    values = samples(3840, 2, 24, seed=54)
+    path = str(tmp_path / "force16.mxf")
+    write_mxf(path, [MxfTrack(2, 1, elements(values, 24, [1920, 1920]), 2, 24, 48000)])
+    track = mxfreader.parse_tracks(path)[0]
+    source = pcmreader.Force16BitSource(mxfreader.MxfSource(track, "BWF"), pcmreader.S16FORMATS[track.getcodec()])
+    assert read_all(source) == pcm(values >> 8, 16)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pcmalign
+import pcmreader
+from pcmfiles import pcm, samples, write_wav
+
+
+def open_wav(tmp_path, name, values, framerate=8000):
+    path = str(tmp_path / name)
+    write_wav(path, pcm(values, 16), values.shape[1], 16, framerate)
+    return pcmreader.open_pcm(path)
+
+
+def brute_weak(keys):
+    # a = sum(x), b = sum((window - j) * x[j]) in python int, uint64 wrap around
+    a = sum(int(key) for key in keys)
+    b = sum((len(keys) - j) * int(key) for j, key in enumerate(keys))
+    return (a + b * int(pcmalign.WEAKMUL)) % (1 << 64)
+
+
+def test_rolling_weak_same_as_brute_force():
+    values = samples(300, 2, 24, seed=10)
+    keys = pcmalign.sample_keys(pcm(values, 24), 6)
+    assert len(keys) == 300
+
+    for window in (1, 7, 64, 300):
+        weaks = pcmalign.rolling_weak(keys, window)
+        assert weaks.tolist() == [brute_weak(keys[i:i + window]) for i in range(300 - window + 1)]
+    assert pcmalign.rolling_weak(keys, 301).size == 0
+
+    blocks = pcmalign.block_weaks(keys, 64)
+    assert blocks.tolist() == pcmalign.rolling_weak(keys, 64)[::64].tolist()
+    assert pcmalign.window_weak(keys[:64]) == blocks[0]
+
+
+def test_find_resync_known_offset(tmp_path, monkeypatch):
+    # src is searched in 1 second steps, 12000 inserted samples are found after step boundaries
+    monkeypatch.setattr(pcmalign, "SEARCHSECONDS", 1)
+    org = samples(40000, 2, 16, seed=11)
+    for inserted in (1, 357, 12000):
+        src = numpy.concatenate((org[:5000], samples(inserted, 2, 16, seed=12), org[5000:]))
+        srcwf = open_wav(tmp_path, "src.wav", src)
+        orgwf = open_wav(tmp_path, "org.wav", org)
+        try:
+            assert pcmalign.find_resync(srcwf, orgwf, 5000, 800) == inserted
+        finally:
+            srcwf.close()
+            orgwf.close()
+
+    # org window is not in src after diffpos
+    srcwf = open_wav(tmp_path, "src.wav", org[:5000])
+    orgwf = open_wav(tmp_path, "org.wav", org)
+    try:
+        assert pcmalign.find_resync(srcwf, orgwf, 100, 800) is None
+        assert pcmalign.find_resync(srcwf, orgwf, 0, 800, cancelled=lambda: True) is None
+    finally:
+        srcwf.close()
+        orgwf.close()
+
+
+def test_match_regions_insert_and_drop(tmp_path):
+    # src: 7 samples inserted at 10000, org 25000-25003 dropped
+    org = samples(40000, 2, 16, seed=13)
+    src = numpy.concatenate((org[:10000], samples(7, 2, 16, seed=14), org[10000:25000], org[25003:]))
+    srcwf = open_wav(tmp_path, "src.wav", src)
+    orgwf = open_wav(tmp_path, "org.wav", org)
+    try:
+        regions = pcmalign.match_regions(srcwf, orgwf)
+        assert regions == [(0, 0, 10000), (10007, 10000, 15000), (25007, 25003, 14997)]
+        assert pcmalign.region_slips(regions, 0, 0, len(src), len(org)) == [(10000, 10000, 7, 0),
+                                                                          (25007, 25000, 0, 3)]
+        assert pcmalign.match_regions(srcwf, orgwf, cancelled=lambda: True) is None
+    finally:
+        srcwf.close()
+        orgwf.close()
+
+
+def test_match_regions_one_sample_slips(tmp_path):
+    # one sample insert and one sample drop, shorter than anchor block
+    org = samples(40000, 1, 16, seed=15)
+    src = numpy.concatenate((org[:12345], samples(1, 1, 16, seed=16), org[12345:30000], org[30001:]))
+    srcwf = open_wav(tmp_path, "src.wav", src)
+    orgwf = open_wav(tmp_path, "org.wav", org)
+    try:
+        regions = pcmalign.match_regions(srcwf, orgwf)
+        assert pcmalign.region_slips(regions, 0, 0, len(src), len(org)) == [(12345, 12345, 1, 0),
+                                                                          (30001, 30000, 0, 1)]
+    finally:
+        srcwf.close()
+        orgwf.close()
+
+
+def lowpass_noise(nframes, seed):
+    # band limited noise(moving average of white noise), not periodic
+    rng = numpy.random.default_rng(seed)
+    noise = numpy.convolve(rng.normal(0, 1, nframes + 15), numpy.ones(16) / 16, mode="valid")
+    return noise / numpy.abs(noise).max()
+
+
+def test_xcorr_offset_not_bit_exact(tmp_path):
+    # src = org delayed 123 samples, gain 0.8, dither noise and 16bit rounding, no sample is bit exact
+    rate = 8000
+    signal = lowpass_noise(rate * 30, seed=17)
+    rng = numpy.random.default_rng(18)
+    org = numpy.round(signal * 20000).astype(numpy.int64)
+    src = numpy.round(numpy.concatenate((numpy.zeros(123), signal[:-123])) * 20000 * 0.8 +
+                      rng.normal(0, 30, len(signal))).astype(numpy.int64)
+    assert not (src[123:] == org[:-123]).all()
+
+    srcwf = open_wav(tmp_path, "src.wav", numpy.stack((src, src), axis=1), rate)
+    orgwf = open_wav(tmp_path, "org.wav", numpy.stack((org, org), axis=1), rate)
+    try:
+        offset, confidence, windows = pcmalign.xcorr_offset(srcwf, orgwf)
+        assert offset == 123
+        assert confidence > 0.9
+        assert [lag for pos, lag, coef in windows] == [123] * len(windows)
+
+        # not correlated
+        noisewf = open_wav(tmp_path, "noise.wav", samples(rate * 30, 2, 16, seed=19), rate)
+        try:
+            assert pcmalign.xcorr_offset(noisewf, orgwf)[0] is None
+        finally:
+            noisewf.close()
+    finally:
+        srcwf.close()
+        orgwf.close()
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import subprocess
+import sys
+
+import numpy
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pcmreader
+from pcmfiles import pcm, samples, write_wav
+
+
+def read_all(source):
+    reader = pcmreader.open_pcm(source)
+    try:
+        return reader.readframes(reader.getnframes() + 1)
+    finally:
+        reader.close()
+
+
+def ffmpeg_samples(timestr, framerate):
+    # ffmpeg trim start/duration samples of -ss/-t time string:
+    # av_parse_time(up to 6 fraction digits) and av_rescale_q(AV_ROUND_NEAR_INF)
+    sec, _, fraction = timestr.partition(".")
+    usec = int(sec) * 1000000 + int((fraction + "000000")[:6])
+    return (usec * framerate + 500000) // 1000000
+
+
+@pytest.mark.parametrize("timestr,framerate", [
+    ("0.0000105", 48000), ("1.00001", 48000), ("0.005", 44100), ("0.015", 44100),
+    ("12.345678912", 96000), ("3599.999", 48000), ("0.041708333333333333", 48000), ("10", 44100)])
+def test_sec_to_frames_same_as_ffmpeg(timestr, framerate):
+    assert pcmreader.sec_to_frames(timestr, framerate) == ffmpeg_samples(timestr, framerate)
+
+
+def test_trim_source_range(tmp_path):
+    values = samples(48000, 2, 16, seed=4)
+    path = str(tmp_path / "src.wav")
+    write_wav(path, pcm(values, 16), 2, 16, 48000)
+
+    for head, honben in (("0.005", "0.5"), ("0.0000105", None), ("0.123456789", "0.1"), ("0.9", "0.5")):
+        start = ffmpeg_samples(head, 48000)
+        stop = start + ffmpeg_samples(honben, 48000) if honben else None
+        nframes = pcmreader.sec_to_frames(honben, 48000) if honben else None
+        trimmed = pcmreader.TrimSource(path, pcmreader.sec_to_frames(head, 48000), nframes)
+        assert read_all(trimmed) == pcm(values[start:stop], 16)
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not found")
+@pytest.mark.parametrize("outputseek", [False, True])
+def test_trim_source_same_as_ffmpeg(tmp_path, outputseek):
+    values = samples(96000, 2, 24, seed=5)
+    path = str(tmp_path / "src.wav")
+    write_wav(path, pcm(values, 24), 2, 24, 48000)
+
+    for head, honben in (("0.005", "0.5"), ("0.123456789", "1.0000105"), ("1.2", None)):
+        cmdlist = ["ffmpeg", "-v", "error", "-i", path, "-y", "-vn", "-acodec", "pcm_s24le", "-f", "s24le", "-"]
+        if honben:
+            cmdlist[5:5] = ["-t", honben]
+        # output seek is after -i path, input seek before -i
+        ssindex = 5 if outputseek else 3
+        cmdlist[ssindex:ssindex] = ["-ss", head]
+        expected = subprocess.run(cmdlist, stdout=subprocess.PIPE, check=True).stdout
+
+        nframes = pcmreader.sec_to_frames(honben, 48000) if honben else None
+        trimmed = pcmreader.TrimSource(path, pcmreader.sec_to_frames(head, 48000), nframes)
+        assert read_all(trimmed) == expected
+
+
+def expected_s16(values, bits, floatsamples):
+    # ffmpeg -acodec pcm_s16le(swresample): int is upper 16bit, u8 is centered, float is rounded and clipped
+    if floatsamples:
+        return numpy.clip(numpy.rint(values.astype("f" + str(bits // 8)) * 32768), -32768, 32767)
+    if bits == 8:
+        return (values - 128) << 8
+    return values >> (bits - 16)
+
+
+@pytest.mark.parametrize("bits,floatsamples,extensible", [
+    (8, False, False), (16, False, False), (24, False, False), (24, False, True), (32, False, False),
+    (32, True, False), (32, True, True), (64, True, False)])
+def test_wav_force16bit(tmp_path, bits, floatsamples, extensible):
+    values = samples(3000, 2, bits, floatsamples, seed=bits)
+    path = str(tmp_path / "src.wav")
+    write_wav(path, pcm(values, bits, floatsamples), 2, bits, 48000, floatsamples, extensible)
+
+    reader = pcmreader.open_pcm(path)
+    try:
+        assert reader.getparams()[:4] == (2, bits // 8, 48000, 3000)
+        assert pcmreader.is_float(reader.getparams()) == floatsamples
+        assert bytes(reader.readframes(3000)) == pcm(values, bits, floatsamples)
+    finally:
+        reader.close()
+
+    # format of wav from format tag, trim and channel of 16bit source
+    assert bytes(read_all(pcmreader.Force16BitSource(path))) == pcm(expected_s16(values, bits, floatsamples), 16)
+    trimmed = pcmreader.TrimSource(pcmreader.Force16BitSource(path), 1000, 500)
+    assert bytes(read_all(trimmed)) == pcm(expected_s16(values[1000:1500], bits, floatsamples), 16)
+    channel = pcmreader.ChannelSource(pcmreader.Force16BitSource(path), 1, "R")
+    assert bytes(read_all(channel)) == pcm(expected_s16(values[:, 1:], bits, floatsamples), 16)
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import frameanalyzer
+import framehash
+import pcmalign
+import pcmreader
+import qtreader
+from pcmfiles import MovTrack, pcm, samples, write_mov
+
+
+def read_all(source):
+    reader = pcmreader.open_pcm(source)
+    try:
+        return reader.readframes(reader.getnframes() + 1)
+    finally:
+        reader.close()
+
+
+def test_bigendian_native_byteorder(tmp_path):
+    values = samples(3000, 2, 24, seed=1)
+    path = str(tmp_path / "in24.mov")
+    write_mov(path, [MovTrack("in24", pcm(values, 24, bigendian=True), 2, 24, 48000, [1000, 1000, 1000],
+                              version=1, enda=False)])
+    track = qtreader.parse_tracks(path)[0]
+
+    swapped = qtreader.QtSource(track, "LE")
+    native = qtreader.QtSource(track, "BE", littleendian=False)
+    assert read_all(swapped) == pcm(values, 24)
+    assert read_all(native) == pcm(values, 24, bigendian=True)
+    assert not pcmreader.is_bigendian(swapped.open().getparams())
+    assert pcmreader.is_bigendian(native.open().getparams())
+
+    # byte order is of the innermost QT source under head skip/honben
+    trimmed = pcmreader.TrimSource(native, 100, 2500)
+    assert pcmreader.source_chain(trimmed)[-1] is native
+    assert pcmreader.is_bigendian(trimmed.open().getparams())
+    assert read_all(trimmed) == pcm(values[100:2600], 24, bigendian=True)
+
+
+def test_bigendian_analyzers(tmp_path):
+    # levels of big endian pcm read in file byte order are the same as of little endian pcm
+    values = samples(48000, 2, 16, seed=2)
+    values[1000:3000] = 0
+    path = str(tmp_path / "twos.mov")
+    write_mov(path, [MovTrack("twos", pcm(values, 16, bigendian=True), 2, 16, 48000, [24000, 24000])])
+    track = qtreader.parse_tracks(path)[0]
+
+    names = (frameanalyzer.PeakAnalyzer.name, frameanalyzer.NullAnalyzer.name, frameanalyzer.DcOffsetAnalyzer.name)
+    littleresult = framehash.hash_source(qtreader.QtSource(track, "LE"), "25", analyzers=names)
+    bigresult = framehash.hash_source(qtreader.QtSource(track, "BE", littleendian=False), "25", analyzers=names)
+
+    for name in names:
+        assert numpy.array_equal(littleresult.analyses[name], bigresult.analyses[name])
+    assert pcmalign.pcm_samples(pcm(values, 16, bigendian=True), 2, 2, bigendian=True).tolist() == values.tolist()
+
+
+def test_bigendian_sample_diffs(tmp_path):
+    # sample diffs compare frames byte by byte, same result in both byte orders
+    values = samples(20000, 2, 24, seed=3)
+    changed = values.copy()
+    changed[5000, 1] += 1
+    changed[5001:5003] = 0
+    srcpath = str(tmp_path / "src.mov")
+    orgpath = str(tmp_path / "org.mov")
+    write_mov(srcpath, [MovTrack("in24", pcm(values, 24, bigendian=True), 2, 24, 48000, [20000], version=1)])
+    write_mov(orgpath, [MovTrack("in24", pcm(changed, 24, bigendian=True), 2, 24, 48000, [20000], version=1)])
+    srctrack = qtreader.parse_tracks(srcpath)[0]
+    orgtrack = qtreader.parse_tracks(orgpath)[0]
+
+    diffs = []
+    for littleendian in (True, False):
+        srcresult = framehash.hash_source(qtreader.QtSource(srctrack, "src", littleendian=littleendian), "25")
+        orgresult = framehash.hash_source(qtreader.QtSource(orgtrack, "org", littleendian=littleendian), "25")
+        sections = framehash.mismatch_runs(srcresult.digests, orgresult.digests, len(orgresult.digests))
+        assert sections == [(2, 3)]
+        diffs.append(framehash.section_sample_diffs(srcresult, orgresult, sections))
+    assert diffs[0] == diffs[1] == [(5000 - 3840, 5002 - 3840, 3)]
+
+
+def read_range(source, pos, nframes):
+    reader = pcmreader.open_pcm(source)
+    try:
+        reader.setpos(pos)
+        return reader.readframes(nframes)
+    finally:
+        reader.close()
+
+
+# fourcc, bits, float, file byte order, MovTrack options
+FORMATS = [
+    ("sowt", 16, False, False, {}),
+    ("twos", 16, False, True, {}),
+    ("in24", 24, False, True, {"version": 1}),
+    ("in24", 24, False, False, {"version": 1, "enda": True}),
+    ("in32", 32, False, True, {"version": 1, "enda": False}),
+    ("in32", 32, False, False, {"version": 1, "enda": True}),
+    ("fl32", 32, True, True, {"version": 1}),
+    ("fl64", 64, True, False, {"version": 1, "enda": True}),
+    ("lpcm", 24, False, False, {"version": 2}),
+    ("lpcm", 32, True, True, {"version": 2, "lpcmflags": qtreader.LPCMFLAG_FLOAT | qtreader.LPCMFLAG_BIGENDIAN}),
+]
+
+
+def test_formats(tmp_path):
+    for k, (fourcc, bits, floatsamples, bigendian, options) in enumerate(FORMATS):
+        values = samples(2500, 2, bits, floatsamples, seed=20 + k)
+        path = str(tmp_path / "{0}.mov".format(k))
+        write_mov(path, [MovTrack(fourcc, pcm(values, bits, floatsamples, bigendian), 2, bits, 48000,
+                                  [1024, 1024, 452], **options)])
+        track = qtreader.parse_tracks(path)[0]
+
+        assert (track.nchannels, track.sampwidth, track.framerate, track.nframes) == (2, bits // 8, 48000, 2500)
+        assert track.getcodec() == "pcm_{0}{1}le".format("f" if floatsamples else "s", bits)
+        assert read_all(qtreader.QtSource(track, fourcc)) == pcm(values, bits, floatsamples)
+        assert read_all(qtreader.QtSource(track, fourcc, 1)) == pcm(values[:, 1:], bits, floatsamples)
+        assert read_range(qtreader.QtSource(track, fourcc), 1000, 100) == pcm(values[1000:1100], bits, floatsamples)
+
+
+def test_sample_tables(tmp_path):
+    # stsc runs(same chunk sizes in one entry), sample size table, co64, moov before mdat, two tracks
+    values = samples(6000, 2, 24, seed=30)
+    mono = samples(6000, 1, 16, seed=31)
+    chunks = [1000, 1000, 500, 700, 700, 700, 1400]
+    for co64 in (False, True):
+        for moovfirst in (False, True):
+            path = str(tmp_path / "tables.mov")
+            write_mov(path, [MovTrack("in24", pcm(values, 24, bigendian=True), 2, 24, 48000, chunks, version=1,
+                                      co64=co64),
+                             MovTrack("sowt", pcm(mono, 16), 1, 16, 48000, chunks[::-1], stsztable=True)],
+                      moovfirst=moovfirst)
+            tracks = qtreader.parse_tracks(path)
+            assert [track.nframes for track in tracks] == [6000, 6000]
+            assert tracks[0].chunkstarts == [0, 1000, 2000, 2500, 3200, 3900, 4600, 6000]
+            assert read_all(qtreader.QtSource(tracks[0], "in24")) == pcm(values, 24)
+            assert read_all(qtreader.QtSource(tracks[1], "sowt")) == pcm(mono, 16)
+            # read across chunks
+            assert read_range(qtreader.QtSource(tracks[0], "in24"), 2400, 900) == pcm(values[2400:3300], 24)
+
+
+def test_edit_list(tmp_path):
+    # media starts at 480 sample, 1 second(600 movie scale)
+    values = samples(60000, 2, 16, seed=32)
+    path = str(tmp_path / "edit.mov")
+    write_mov(path, [MovTrack("sowt", pcm(values, 16), 2, 16, 48000, [24000, 24000, 12000], edit=(480, 600))])
+    track = qtreader.parse_tracks(path)[0]
+    assert (track.editstart, track.nframes) == (480, 48000)
+    assert read_all(qtreader.QtSource(track, "edit")) == pcm(values[480:48480], 16)
+    assert read_range(qtreader.QtSource(track, "edit"), 23000, 2000) == pcm(values[23480:25480], 16)
+
+
+def test_force16bit(tmp_path):
+    # same as ffmpeg -acodec pcm_s16le: int is upper 16bit, float is rounded and clipped
+    for k, (fourcc, bits, floatsamples, bigendian, options) in enumerate(FORMATS[2:]):
+        values = samples(2000, 2, bits, floatsamples, seed=40 + k)
+        path = str(tmp_path / "{0}.mov".format(k))
+        write_mov(path, [MovTrack(fourcc, pcm(values, bits, floatsamples, bigendian), 2, bits, 48000, [2000],
+                                  **options)])
+        track = qtreader.parse_tracks(path)[0]
+        if floatsamples:
+            expected = numpy.clip(numpy.rint(values.astype("f" + str(bits // 8)) * 32768), -32768, 32767)
+        else:
+            expected = values >> (bits - 16)
+        source = pcmreader.Force16BitSource(qtreader.QtSource(track, fourcc), pcmreader.S16FORMATS[track.getcodec()])
+        assert read_all(source) == pcm(expected, 16)
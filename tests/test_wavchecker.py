@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+import ctypes
+import json
+import logging
+import os
+import sys
+import threading
+
+import numpy
+import pytest
+import xxhash
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+pytest.importorskip("PySide2")
+
+import frameanalyzer
+import framehash
+from pcmfiles import pcm, samples, write_wav
+from WavChecker import WavChecker
+
+WAVCHECKER_FILE = sys.modules[WavChecker.__module__].__file__
+
+
+def type_modified():
+    # PySide2 5.13 type on python 3.11 doesn't invalidate type attribute cache,
+    # WavChecker.X = value is not seen after X was read once(and the cached old value may be freed).
+    ctypes.pythonapi.PyType_Modified(ctypes.py_object(WavChecker))
+
+
+def set_class_attr(name, value):
+    setattr(WavChecker, name, value)
+    type_modified()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def tempdir(tmp_path_factory):
+    set_class_attr("TEMPDIR", str(tmp_path_factory.mktemp("temp")))
+
+
+@pytest.fixture(autouse=True)
+def fresh_class_attrs():
+    # class attributes written by WavChecker(PROGRESS_SRCWAV etc.) are read again in the same run,
+    # type attribute cache is invalidated before every line of WavChecker.py(also in hash threads).
+    def line(frame, event, arg):
+        if event == "line":
+            type_modified()
+        return line
+
+    def call(frame, event, arg):
+        if frame.f_code.co_filename != WAVCHECKER_FILE:
+            return None
+        type_modified()
+        return line
+
+    sys.settrace(call)
+    threading.settrace(call)
+    yield
+    sys.settrace(None)
+    threading.settrace(None)
+
+
+@pytest.fixture
+def checker():
+    WavChecker.LOGGER = logging.getLogger("WavChecker")
+    worker = WavChecker(None, WavChecker.SRC_FILE)
+    worker.opdict = {}
+    # messages are kept by worker, not INFOBUF/ERRBUF class attributes(see type_modified)
+    worker.messages = []
+    worker._WavChecker__msglockandwrite = lambda msg, toerrbuf=False: worker.messages.append(msg)
+    return worker
+
+
+def fake_ffprobe(tmp_path, streams):
+    # ffprobe which prints streams json
+    path = tmp_path / "ffprobe"
+    path.write_text("#!/bin/sh\necho '" + json.dumps({"streams": streams, "format": {}}) + "'\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+def test_pipe_sources_keeps_source_probe(tmp_path, checker):
+    checker.ffprobe_cmdlist[0] = fake_ffprobe(tmp_path, [
+        {"codec_type": "video"},
+        {"codec_type": "audio", "sample_rate": "48000", "channels": 2, "duration": "10.0"}])
+    checker.ffprobe_streamsdict = [{"codec_type": "audio", "source": True}]
+
+    sources = checker.pipe_sources("src.mov", [("SRC", ["-map", "0:a:0"])], None, "pcm_s24le")
+    assert len(sources) == 1
+    assert sources[0].nchannels == 2
+    assert checker.ffprobe_streamsdict == [{"codec_type": "audio", "source": True}]
+
+    # no audio stream 1, temp wav is used
+    assert checker.pipe_sources("src.mov", [("R", ["-map", "0:a:1"])], 1, "pcm_s24le", streamindex=1) is None
+
+
+def test_interleave_trim_args(checker):
+    checker.opdict = {checker.OPDICT_VIDEOHEADSKIPSEC: "12.5", checker.OPDICT_VIDEOHONBENSEC: "60.0"}
+
+    # interleave mode: -ss input option, -t output option
+    cmdlist = checker.interleave_ffmpegworker("src.mov", "pcm_s24le", "SRC.wav").ffmpeg_single_interleave_cmdlist
+    assert cmdlist[5:10] == ["-ss", "12.5", "-i", "src.mov", "-t"]
+
+    # multimono: -ss/-t output options
+    cmdlist = checker.interleave_ffmpegworker("src.mov", "pcm_s24le", "SRC.wav",
+                                              outputseek=True).ffmpeg_single_interleave_cmdlist
+    assert cmdlist[5:11] == ["-i", "src.mov", "-ss", "12.5", "-t", "60.0"]
+
+
+def test_honben_without_head_skip(checker):
+    checker.opdict = {checker.OPDICT_VIDEOHONBENSEC: "0.005"}
+
+    cmdlist = checker.interleave_ffmpegworker("src.mov", "pcm_s24le", "SRC.wav", outputseek=True,
+                                              honbenalone=False).ffmpeg_single_interleave_cmdlist
+    assert "-t" not in cmdlist
+    assert checker.trim_source("src.wav", 44100, honbenalone=False) == "src.wav"
+    assert checker.trim_source("src.wav", 44100).nframes == 221
+
+
+def test_pipe_trim_args(tmp_path, checker):
+    checker.ffprobe_cmdlist[0] = fake_ffprobe(tmp_path, [
+        {"codec_type": "audio", "sample_rate": "48000", "channels": 6, "duration": "100.0"}])
+    checker.opdict = {checker.OPDICT_VIDEOHEADSKIPSEC: "12.5", checker.OPDICT_VIDEOHONBENSEC: "60.0"}
+
+    source = checker.pipe_sources("src.mov", [("51ch", ["-map", "0:a:0"])], None, "pcm_s24le")[0]
+    assert source.cmdlist[4:10] == ["-ss", "12.5", "-i", "src.mov", "-t", "60.0"]
+    assert source.nframes == 60 * 48000
+
+    source = checker.pipe_sources("src.mov", [("51ch", ["-map", "0:a:0"])], None, "pcm_s24le",
+                                  outputseek=True)[0]
+    assert source.cmdlist[4:10] == ["-i", "src.mov", "-ss", "12.5", "-t", "60.0"]
+
+
+def test_channel_layout(tmp_path, checker):
+    checker.ffprobe_cmdlist[0] = fake_ffprobe(tmp_path, [
+        {"codec_type": "audio", "channels": 6, "channel_layout": "5.1(side)"}, {"codec_type": "audio", "channels": 6}])
+    assert checker.channel_layout("src.mov") == "5.1(side)"
+    assert checker.channel_layout("src.mov", 1) is None
+    assert checker.channel_layout("src.mov", 2) is None
+
+
+def test_channelsplit_trim_args(checker):
+    checker.aformat = "pcm_s24le"
+    checker.opdict = {checker.OPDICT_VIDEOHEADSKIPSEC: "12.5", checker.OPDICT_VIDEOHONBENSEC: "60.0"}
+
+    worker, wavpathlist = checker.channelsplit_ffmpegworker(["FL", "FR"])
+    assert worker.mode == checker.MODE_FFMPEG_2ch
+    assert wavpathlist == [os.path.join(WavChecker.TEMPDIR, "FL.wav"), os.path.join(WavChecker.TEMPDIR, "FR.wav")]
+    assert worker.ffmpeg_2ch_multimono_cmdlist[3:] == [
+        "-i", "", "-y", "-vn", "-acodec", "pcm_s24le", "-stats", "-stats_period", "1",
+        "-filter_complex", "channelsplit=channel_layout=stereo[FL][FR]",
+        "-t", "60.0", "-ss", "12.5", "-map", "[FL]", wavpathlist[0],
+        "-acodec", "pcm_s24le", "-t", "60.0", "-ss", "12.5", "-map", "[FR]", wavpathlist[1]]
+
+    # 5.1ch: honben without head skip is not used
+    checker.opdict = {checker.OPDICT_VIDEOHONBENSEC: "60.0"}
+    worker, wavpathlist = checker.channelsplit_ffmpegworker(["FL", "FR", "FC", "LFE", "BL", "BR"],
+                                                            honbenalone=False)
+    cmdlist = worker.ffmpeg_51ch_multimono_cmdlist
+    assert worker.mode == checker.MODE_FFMPEG_51ch
+    assert "-t" not in cmdlist
+    assert [cmdlist[cmdlist.index(path) - 1] for path in wavpathlist] == \
+        ["[FL]", "[FR]", "[FC]", "[LFE]", "[BL]", "[BR]"]
+    assert cmdlist.count("pcm_s24le") == 6
+
+
+def test_hash_cancel_no_partial_result(tmp_path, checker, monkeypatch):
+    # cancel while segments are hashed on thread pool, partial results are not stitched or saved
+    path = str(tmp_path / "src.wav")
+    write_wav(path, pcm(samples(48000 * 20, 2, 16, seed=60), 16), 2, 16, 48000)
+    monkeypatch.setattr(framehash, "BLOCKBYTES", 64 * 1024)
+    checker.opdict = {checker.OPDICT_FPS: "25", checker.OPDICT_HASHWORKERS: 2,
+                      checker.OPDICT_HASHPOOL: checker.HASHPOOL_THREAD, checker.OPDICT_HASHSHARDS: 4}
+
+    results = []
+    hash_source = framehash.hash_source
+
+    def cancel_midway(*args, **kwargs):
+        progress = kwargs["progress"]
+
+        def progress_and_cancel(result, readbytes):
+            progress(result, readbytes)
+            if result.progress > 256 * 1024:
+                set_class_attr("REQ_CANCEL", True)
+
+        kwargs["progress"] = progress_and_cancel
+        results.append(hash_source(*args, **kwargs))
+        return results[-1]
+
+    monkeypatch.setattr(framehash, "hash_source", cancel_midway)
+    try:
+        checksums = checker.proc_wavhash4([path])
+    finally:
+        set_class_attr("REQ_CANCEL", False)
+
+    assert len(results) == 4
+    assert sum(result.framecount for result in results) < 20 * 25
+    assert checksums == {}
+    assert checker.hashresults[0] is None
+    assert not checker.checksumframes_org[0]
+    assert any("canceled" in msg for msg in checker.messages)
+
+
+def test_frame_checksums_uint64(tmp_path, checker):
+    # frame checksums are uint64 intdigest array, same value as hexdigest str of each frame
+    path = str(tmp_path / "src.wav")
+    data = pcm(samples(48000 * 2 + 100, 2, 16, seed=61), 16)
+    write_wav(path, data, 2, 16, 48000)
+    checker.opdict = {checker.OPDICT_FPS: "25"}
+
+    checksums = checker.proc_wavhash4([path])
+    digests = checker.checksumframes_org[0]
+    frames = [data[pos:pos + 1920 * 4] for pos in range(0, len(data), 1920 * 4)]
+    assert digests.typecode == "Q"
+    assert list(digests) == [xxhash.xxh3_64_intdigest(frame) for frame in frames]
+    assert ["{0:016x}".format(digest) for digest in digests] == [xxhash.xxh3_64_hexdigest(frame) for frame in frames]
+    assert checksums[WavChecker.MODE_INTERLEAVE] == xxhash.xxh3_64_hexdigest(data)
+    assert bytes(checker.lastframe[0]) == frames[-1]
+
+
+def test_muon_same_as_zero_frames(tmp_path, checker):
+    # muon frame digests are the same as digests of zero filled frames(baseline synthetic muon frames)
+    values = numpy.zeros((48000 * 3 + 500, 2), dtype=numpy.int64)
+    values[5000, 1] = 1
+    values[60000:70000] = samples(10000, 2, 16, seed=62)
+    values[-1, 0] = -3
+    data = pcm(values, 16)
+    path = str(tmp_path / "src.wav")
+    write_wav(path, data, 2, 16, 48000)
+    checker.opdict = {checker.OPDICT_FPS: "29.97"}
+
+    checker.proc_wavhash4([path], analyzers=(frameanalyzer.PeakAnalyzer.name, frameanalyzer.NullAnalyzer.name))
+    checker.proc_wavhash_muon(checker.checksumframes_org[0], [path])
+
+    frames = []
+    pos = 0
+    while pos < len(data):
+        nbytes = [1602, 1601, 1602, 1601, 1602][len(frames) % 5] * 4
+        frames.append(data[pos:pos + nbytes])
+        pos += nbytes
+    assert list(checker.checksumframes_muon) == [xxhash.xxh3_64_intdigest(bytes(len(frame))) for frame in frames]
+    loud = [k for k, frame in enumerate(frames) if any(frame)]
+    assert framehash.mismatch_runs(checker.checksumframes_org[0], checker.checksumframes_muon, len(frames)) == \
+        [(start, end) for start, end in framehash.flag_runs(numpy.isin(numpy.arange(len(frames)), loud))]
+    assert checker.checksums[WavChecker.MODE_MUON_CHECK] == framehash.digests_total(checker.checksumframes_muon)
+
+    # all silent: same as interleave total
+    write_wav(path, bytes(len(data)), 2, 16, 48000)
+    checker.checksums = {}
+    checker.proc_wavhash4([path], analyzers=(frameanalyzer.PeakAnalyzer.name,))
+    checker.proc_wavhash_muon(checker.checksumframes_org[0], [path])
+    assert checker.checksums[WavChecker.MODE_MUON_CHECK] == checker.checksums[WavChecker.MODE_INTERLEAVE]